@@ -0,0 +1,127 @@
+"""
+Catalog Backend Benchmark
+Builds a synthetic offers catalog and compares query latency and memory of the storage backends
+
+Run from the backend directory:
+    python -m benchmarks.bench_catalog --offers 1000000 --backends sqlite
+    python -m benchmarks.bench_catalog --offers 100000
+"""
+import argparse
+import gc
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from typing import Iterator
+from benchmarks.common import percentile
+from models.benefits import BenefitCategory
+from services.benefits_service import BENEFITS_DATABASE
+from services.catalog_store import MemoryCatalogStore, SqliteCatalogStore, write_sqlite_catalog
+from services.geo import DEFAULT_LOCATION
+from services.search_service import OFFER, tokenize
+
+CATEGORIES = [c.value for c in BenefitCategory]
+
+
+def synthetic_offers(count: int, seed: int = 7, spread_deg: float = 0.5) -> Iterator[dict]:
+    """Offers scattered around Chennai; about 1% are online (no coordinates)"""
+    rng = random.Random(seed)
+    lat0, lon0 = DEFAULT_LOCATION
+    for i in range(count):
+        online = rng.random() < 0.01
+        yield {
+            "id": f"s{i:07d}",
+            "merchant_name": f"Merchant {i % 5000}",
+            "offer_title": f"Offer {i}",
+            "discount": f"{rng.randint(5, 50)}% Off",
+            "description": "Synthetic benchmark offer",
+            "location": None if online else "Chennai",
+            "latitude": None if online else lat0 + rng.uniform(-spread_deg, spread_deg),
+            "longitude": None if online else lon0 + rng.uniform(-spread_deg, spread_deg),
+            "valid_until": f"2026-{rng.randint(1, 12):02d}-28",
+            "terms": f"Terms variant {i % 200}.",
+            "category": rng.choice(CATEGORIES),
+        }
+
+
+QUERIES = {
+    "nearby_5km": dict(max_distance=5.0),
+    "k20": dict(limit=20),
+    "k20_dining": dict(limit=20, category="dining"),
+    "default": dict(),
+}
+
+
+# Full-text searches: a rare term, a rare plus a common term, and a filtered common term
+SEARCHES = {
+    "search_rare": ("offer 12345", {}),
+    "search_mixed": ("merchant 4321 variant", {}),
+    "search_near": ("synthetic", dict(kind=OFFER, max_distance=2.0)),
+}
+
+
+def bench_store(store, iterations: int) -> None:
+    rng = random.Random(1)
+    lat0, lon0 = DEFAULT_LOCATION
+    for name, kwargs in QUERIES.items():
+        latencies = []
+        for _ in range(iterations):
+            lat, lon = lat0 + rng.uniform(-0.2, 0.2), lon0 + rng.uniform(-0.2, 0.2)
+            started = time.perf_counter()
+            offers = store.offers.query(lat, lon, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+        print(
+            f"  {name:<12} p50 {percentile(latencies, 50):8.2f} ms  p95 {percentile(latencies, 95):8.2f} ms"
+            f"  ({len(offers)} offers)"
+        )
+    for name, (text, kwargs) in SEARCHES.items():
+        latencies = []
+        for _ in range(iterations):
+            lat, lon = lat0 + rng.uniform(-0.2, 0.2), lon0 + rng.uniform(-0.2, 0.2)
+            started = time.perf_counter()
+            result = store.search.search(tokenize(text), latitude=lat, longitude=lon, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+        print(
+            f"  {name:<12} p50 {percentile(latencies, 50):8.2f} ms  p95 {percentile(latencies, 95):8.2f} ms"
+            f"  ({len(result.kinds)} hits)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--offers", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--backends", nargs="*", default=["sqlite", "memory"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.sqlite3")
+        started = time.perf_counter()
+        write_sqlite_catalog(path, BENEFITS_DATABASE, synthetic_offers(args.offers))
+        print(f"Built {args.offers} offers in {time.perf_counter() - started:.1f}s "
+              f"({os.path.getsize(path) / 2 ** 20:.0f} MiB on disk)")
+
+        for backend in args.backends:
+            records = list(synthetic_offers(args.offers)) if backend == "memory" else None
+            gc.collect()
+            tracemalloc.start()
+            started = time.perf_counter()
+            if backend == "sqlite":
+                store = SqliteCatalogStore(path, max_results=1000)
+            else:
+                store = MemoryCatalogStore(BENEFITS_DATABASE, records, "synthetic")
+            load_seconds = time.perf_counter() - started
+            del records
+            resident, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{backend}: loaded in {load_seconds:.2f}s, {resident / 2 ** 20:.1f} MiB held in Python objects")
+            bench_store(store, args.iterations)
+            store.close()
+
+    print(f"Peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Shared Ollama Client Benchmark
+Compares /api/ai/summarize latency with a per-request client vs the pooled client
+
+Run from the backend directory:
+    python -m benchmarks.bench_ollama_client --requests 500 --concurrency 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+import httpx
+import config
+from benchmarks.common import percentile
+from benchmarks.stub_ollama import StubOllama, StubOllamaServer
+from services import llm_service
+from services.llm_cache import llm_cache
+
+
+async def run_mode(app, shared: bool, requests: int, concurrency: int) -> List[float]:
+    """Drive the summarize route and return per-request latencies in milliseconds"""
+    if shared:
+        await llm_service.start_client()
+
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                # Unique text per request so the completion cache never answers
+                response = await client.post("/api/ai/summarize", json={"text": f"Benchmark terms {i}"})
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.json()["source"] == "llm", response.text
+
+        await asyncio.gather(*(one(i) for i in range(requests)))
+
+    await llm_service.close_client()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    from main import app
+
+    llm_cache.enabled = False
+    with StubOllamaServer(StubOllama(model=config.OLLAMA_MODEL, token_delay=args.token_delay)) as stub:
+        config.OLLAMA_BASE_URL = stub.url
+        # Warm up imports and the event loop before measuring
+        asyncio.run(run_mode(app, shared=True, requests=20, concurrency=args.concurrency))
+
+        print(f"{'mode':<20}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+        for label, shared in (("per-request client", False), ("shared client", True)):
+            latencies = asyncio.run(run_mode(app, shared, args.requests, args.concurrency))
+            print(
+                f"{label:<20}{percentile(latencies, 50):>10.2f}{percentile(latencies, 99):>10.2f}"
+                f"{statistics.mean(latencies):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Startup Benchmark
+Profiles `import main` with -X importtime and times the startup warm-up until /api/ready would pass
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup --runs 5 --save startup.json
+    python -m benchmarks.bench_startup --compare startup.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Startup in a fresh interpreter: import, run the lifespan, wait for every warm-up step
+READY_SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+from services.startup import STEPS, readiness
+imported = time.perf_counter()
+
+async def run():
+    async with main.app.router.lifespan_context(main.app):
+        listening = time.perf_counter()
+        for step in STEPS:
+            try:
+                await readiness.wait(step)
+            except RuntimeError:
+                pass
+        ready = time.perf_counter()
+    return listening, ready
+
+listening, ready = asyncio.run(run())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "listening_ms": (listening - started) * 1000,
+    "ready_ms": (ready - started) * 1000,
+    "steps_ms": {step: seconds * 1000 for step, seconds in readiness.seconds.items()},
+    "errors": readiness.errors,
+}))
+"""
+
+
+class ImportTime(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str, module: str) -> List[ImportTime]:
+    """Every import made by `import module`, from -X importtime output (children before parents)"""
+    pending: List[ImportTime] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name_field = line[len("import time:"):].split("|")
+        entry = ImportTime(name_field.strip(), int(self_us), int(cumulative_us))
+        # Nesting is two spaces per level after the separator's own space
+        if len(name_field) - len(name_field.lstrip()) > 1:
+            pending.append(entry)
+        elif entry.name == module:
+            return pending + [entry]
+        else:
+            pending = []
+    raise RuntimeError(f"No -X importtime entry for {module!r}:\n{stderr[-2000:]}")
+
+
+def _python(args: List[str], env: Dict[str, str]) -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=600
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args[:3])} failed:\n{result.stderr[-2000:]}")
+    return result
+
+
+def profile_imports(module: str, env: Dict[str, str]) -> dict:
+    """Import time of one fresh `import module`, in total and per top-level package"""
+    entries = parse_importtime(_python(["-X", "importtime", "-c", f"import {module}"], env).stderr, module)
+    packages: Dict[str, int] = defaultdict(int)
+    for entry in entries:
+        packages[entry.name.split(".")[0]] += entry.self_us
+    return {
+        "total_ms": entries[-1].cumulative_us / 1000,
+        "packages": {name: us / 1000 for name, us in packages.items()},
+        "modules": {entry.name: entry.self_us / 1000 for entry in entries},
+    }
+
+
+def measure_startup(env: Dict[str, str]) -> dict:
+    return json.loads(_python(["-c", READY_SCRIPT], env).stdout.strip().splitlines()[-1])
+
+
+def median(values) -> float:
+    return round(statistics.median(values), 1)
+
+
+def run(args) -> dict:
+    env = dict(
+        os.environ,
+        # No Ollama: the warm-up still starts the client and prober, but nothing waits on a model
+        OLLAMA_BASE_URL=args.ollama_url,
+        OLLAMA_BACKENDS="",
+        OLLAMA_PRELOAD="false",
+        CATALOG_PATH=args.catalog,
+        CATALOG_WATCH_INTERVAL="0",
+    )
+    # One untimed run so every run reads warm bytecode caches
+    _python(["-c", "import main"], env)
+
+    profiles = [profile_imports("main", env) for _ in range(args.runs)]
+    startups = [measure_startup(env) for _ in range(args.runs)]
+    packages = {name for profile in profiles for name in profile["packages"]}
+    errors = {step: error for startup in startups for step, error in startup["errors"].items()}
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "catalog": args.catalog or "built-in",
+            "created_at": time.time(),
+        },
+        "results": {
+            "import_ms": median(p["total_ms"] for p in profiles),
+            "listening_ms": median(s["listening_ms"] for s in startups),
+            "ready_ms": median(s["ready_ms"] for s in startups),
+            "steps_ms": {
+                step: median(s["steps_ms"].get(step, 0.0) for s in startups) for step in startups[0]["steps_ms"]
+            },
+            "packages_ms": dict(sorted(
+                ((name, median(p["packages"].get(name, 0.0) for p in profiles)) for name in packages),
+                key=lambda item: -item[1],
+            )),
+            "modules_ms": dict(sorted(profiles[0]["modules"].items(), key=lambda item: -item[1])[:args.top]),
+            "errors": errors,
+        },
+    }
+
+
+def report(results: dict, top: int) -> None:
+    print(f"{'import main':<24}{results['import_ms']:>10.1f} ms")
+    print(f"{'serving (lifespan up)':<24}{results['listening_ms']:>10.1f} ms")
+    print(f"{'ready':<24}{results['ready_ms']:>10.1f} ms")
+    for step, ms in results["steps_ms"].items():
+        print(f"  {step:<22}{ms:>10.1f} ms")
+    for step, error in results["errors"].items():
+        print(f"  {step} failed: {error}")
+    print(f"\n{'package':<24}{'self ms':>10}")
+    for name, ms in list(results["packages_ms"].items())[:top]:
+        print(f"{name:<24}{ms:>10.1f}")
+    print(f"\n{'module':<44}{'self ms':>10}")
+    for name, ms in results["modules_ms"].items():
+        print(f"{name:<44}{ms:>10.1f}")
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_package_ms: float) -> List[str]:
+    """Regressions beyond the tolerance, plus packages newly imported at startup"""
+    regressions = []
+    now, base = current["results"], baseline.get("results", {})
+    for key in ("import_ms", "ready_ms"):
+        if key in base and now[key] > base[key] * (1 + tolerance):
+            regressions.append(f"{key}: {base[key]:.1f} -> {now[key]:.1f} ms")
+    # A heavy dependency pulled into the import path shows up as a new package, whatever the noise
+    for name, ms in now["packages_ms"].items():
+        if ms >= min_package_ms and name not in base.get("packages_ms", {}):
+            regressions.append(f"new import at startup: {name} ({ms:.1f} ms)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement (median)")
+    parser.add_argument("--catalog", default="", help="CATALOG_PATH to start with (default: built-in data)")
+    parser.add_argument("--ollama-url", default="http://127.0.0.1:9", help="Ollama URL for the warm-up")
+    parser.add_argument("--top", type=int, default=15, help="Packages and modules to list")
+    parser.add_argument("--save", help="Write results to this JSON baseline")
+    parser.add_argument("--compare", help="Fail if results regress against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-package-ms", type=float, default=5.0, help="Smallest new package that counts")
+    args = parser.parse_args()
+
+    current = run(args)
+    report(current["results"], args.top)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance, args.min_package_ms)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Benchmark Helpers
+Shared statistics and app setup for the benchmark scripts
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@asynccontextmanager
+async def app_client(app) -> AsyncIterator[httpx.AsyncClient]:
+    """In-process client for the ASGI app with its lifespan (startup/shutdown) running"""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
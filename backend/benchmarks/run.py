@@ -0,0 +1,202 @@
+"""
+API Benchmark Suite
+Drives every API route against the in-process ASGI app and a stub Ollama server
+
+Run from the backend directory:
+    python -m benchmarks.run --requests 500 --concurrency 20 --save baseline.json
+    python -m benchmarks.run --compare baseline.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional
+import httpx
+import config
+from benchmarks.common import app_client, percentile
+from benchmarks.stub_ollama import StubOllama, StubOllamaServer
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    path: str
+    body: Optional[Callable[[int], dict]] = None
+
+
+LONG_TERMS = " ".join(
+    f"Clause {i}: cashback of up to Rs {i * 50} is credited within 30 days of a qualifying purchase." for i in range(400)
+)
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("cards_validate", "POST", "/api/cards/validate", lambda i: {"card_number": "4000 0000 0000 2000"}),
+    Scenario("benefits", "GET", "/api/benefits/signature"),
+    Scenario("benefits_category", "GET", "/api/benefits/signature?category=dining"),
+    Scenario("offers", "GET", "/api/offers/?location=IIT%20Chennai"),
+    Scenario("offers_nearby", "GET", "/api/offers/nearby?max_distance=5"),
+    Scenario("offers_page", "GET", "/api/offers/?limit=5&fields=id,offer_title,discount,distance_km"),
+    Scenario("search", "GET", "/api/search/?q=lounge%20access&card_type=gold"),
+    # Unique text per request so the AI routes measure generation, not the cache
+    Scenario("ai_summarize", "POST", "/api/ai/summarize", lambda i: {"text": f"Valid up to ₹500. Offer {i}."}),
+    Scenario("ai_summarize_stream", "POST", "/api/ai/summarize/stream", lambda i: {"text": f"Stream offer {i}."}),
+    # Over the summarize chunk budget: map-reduce over a few chunks
+    Scenario("ai_summarize_long", "POST", "/api/ai/summarize", lambda i: {"text": f"Offer {i}. " + LONG_TERMS}),
+    Scenario("ai_translate", "POST", "/api/ai/translate", lambda i: {"text": f"Cashback credited in {i} days"}),
+    Scenario("ai_recommend", "POST", "/api/ai/recommend", lambda i: {"card_type": "gold", "interests": [f"topic{i}"]}),
+]
+
+
+async def _send(client: httpx.AsyncClient, scenario: Scenario, i: int) -> None:
+    body = scenario.body(i) if scenario.body else None
+    response = await client.request(scenario.method, scenario.path, json=body)
+    await response.aread()
+    if response.status_code >= 400:
+        raise RuntimeError(f"{scenario.name}: HTTP {response.status_code} {response.text[:200]}")
+
+
+async def measure(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    """Latency percentiles and throughput for one scenario at a fixed concurrency"""
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            await _send(client, scenario, i)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+async def measure_allocations(client: httpx.AsyncClient, scenario: Scenario, samples: int) -> dict:
+    """Allocations per request under tracemalloc (sequential, separate from the latency run)"""
+    gc.collect()
+    tracemalloc.start()
+    peaks = []
+    blocks = []
+    offset = 10 ** 6  # keep request bodies distinct from the latency run
+    for i in range(samples):
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        await _send(client, scenario, offset + i)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        peaks.append(peak - base)
+        blocks.append(sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0))
+    tracemalloc.stop()
+
+    return {
+        "alloc_peak_kib": round(sum(peaks) / len(peaks) / 1024, 1),
+        "alloc_blocks": round(sum(blocks) / len(blocks), 1),
+    }
+
+
+async def run_suite(args) -> dict:
+    from main import app
+    from services.llm_cache import llm_cache
+
+    llm_cache.enabled = args.llm_cache
+    results: Dict[str, dict] = {}
+
+    async with app_client(app) as client:
+        for scenario in SCENARIOS:
+            if args.only and scenario.name not in args.only:
+                continue
+            # Warm up code paths and pools before measuring
+            await measure(client, scenario, min(20, args.requests), args.concurrency)
+            result = await measure(client, scenario, args.requests, args.concurrency)
+            if args.alloc_samples:
+                result.update(await measure_allocations(client, scenario, args.alloc_samples))
+            results[scenario.name] = result
+            print(
+                f"{scenario.name:<22}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result.get('alloc_peak_kib', 0):>12.1f}{result.get('alloc_blocks', 0):>10.1f}"
+            )
+
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "stub_tokens": args.tokens,
+            "stub_token_delay": args.token_delay,
+            "created_at": time.time(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions beyond the tolerance (e.g. 0.25 = 25% slower p95 or lower throughput)"""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {base['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--tokens", type=int, default=40, help="Tokens the stub Ollama generates per reply")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Stub Ollama seconds per token")
+    parser.add_argument("--alloc-samples", type=int, default=20, help="Requests traced for allocations (0 = skip)")
+    parser.add_argument("--llm-cache", action="store_true", help="Leave the completion cache enabled")
+    parser.add_argument("--only", nargs="*", help="Scenario names to run")
+    parser.add_argument("--save", help="Write results to this JSON baseline")
+    parser.add_argument("--compare", help="Fail if results regress against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    stub = StubOllama(model=config.OLLAMA_MODEL, tokens=args.tokens, token_delay=args.token_delay)
+    with StubOllamaServer(stub) as server:
+        config.OLLAMA_BASE_URL = server.url
+        print(f"{'scenario':<22}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>12}{'blocks':>10}")
+        report = asyncio.run(run_suite(args))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
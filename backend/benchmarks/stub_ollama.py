@@ -0,0 +1,173 @@
+"""
+Stub Ollama Server
+Minimal stand-in for the Ollama HTTP API with configurable token and model-load latency
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import Optional
+import uvicorn
+
+
+class StubOllama:
+    """ASGI app answering /api/chat and /api/tags like a local Ollama"""
+
+    def __init__(self, model: str = "llama3.2", tokens: int = 20, token_delay: float = 0.0, load_delay: float = 0.0):
+        self.model = model
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.load_delay = load_delay
+        self.requests = 0
+        self.loaded = False
+        self.loads = 0
+        self.pings = 0  # chats without messages, which only load the model
+        self.keep_alive = None  # keep_alive of the last chat
+        self._loading: Optional[asyncio.Task] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        path = scope["path"]
+        if path == "/api/tags":
+            await self._send_json(send, {"models": [{"name": f"{self.model}:latest"}]})
+        elif path == "/api/ps":
+            running = [{"name": f"{self.model}:latest", "expires_at": "2099-01-01T00:00:00Z"}] if self.loaded else []
+            await self._send_json(send, {"models": running})
+        elif path == "/api/chat":
+            payload = json.loads(body or b"{}")
+            self.keep_alive = payload.get("keep_alive")
+            load_duration = await self._load()
+            if not payload.get("messages"):
+                # No messages: Ollama only loads the model
+                self.pings += 1
+                await self._send_json(send, {
+                    "model": self.model,
+                    "message": {"role": "assistant", "content": ""},
+                    "done_reason": "load",
+                    "done": True,
+                })
+                return
+            self.requests += 1
+            await self._chat(send, payload, load_duration)
+        else:
+            await self._send_json(send, {"error": "not found"}, status=404)
+
+    async def _load(self) -> int:
+        """Load the model on first use (concurrent requests share one load); nanoseconds spent waiting"""
+        if self.loaded:
+            return 0
+        started = time.perf_counter_ns()
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(asyncio.sleep(self.load_delay))
+        await self._loading
+        if not self.loaded:
+            self.loaded = True
+            self.loads += 1
+        return time.perf_counter_ns() - started
+
+    def unload(self) -> None:
+        """Drop the model, as Ollama does when keep_alive expires"""
+        self.loaded = False
+        self._loading = None
+
+    async def _chat(self, send, payload: dict, load_duration: int = 0) -> None:
+        started = time.perf_counter_ns()
+        words = [f"token{i} " for i in range(self.tokens)]
+
+        if payload.get("stream", True):
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            })
+            for word in words:
+                if self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                chunk = {"model": self.model, "message": {"role": "assistant", "content": word}, "done": False}
+                await send({"type": "http.response.body", "body": json.dumps(chunk).encode() + b"\n", "more_body": True})
+            final = self._final(started, load_duration)
+            await send({"type": "http.response.body", "body": json.dumps(final).encode() + b"\n"})
+            return
+
+        if self.token_delay:
+            await asyncio.sleep(self.token_delay * self.tokens)
+        final = self._final(started, load_duration)
+        final["message"]["content"] = "".join(words).strip()
+        await self._send_json(send, final)
+
+    def _final(self, started: int, load_duration: int = 0) -> dict:
+        elapsed = time.perf_counter_ns() - started
+        return {
+            "model": self.model,
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            "eval_count": self.tokens,
+            "eval_duration": max(elapsed, 1),
+            "total_duration": max(elapsed, 1),
+            "load_duration": load_duration,
+        }
+
+    @staticmethod
+    async def _send_json(send, data: dict, status: int = 200) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": json.dumps(data).encode()})
+
+
+def free_port() -> int:
+    """Ask the OS for an unused localhost port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubOllamaServer:
+    """Run a StubOllama app under uvicorn in a background thread"""
+
+    def __init__(self, app: Optional[StubOllama] = None, port: Optional[int] = None):
+        self.app = app or StubOllama()
+        self.port = port or free_port()
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "StubOllamaServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a stub Ollama server")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds per generated token")
+    parser.add_argument("--load-delay", type=float, default=0.0, help="Seconds the first request waits for the model")
+    args = parser.parse_args()
+
+    uvicorn.run(StubOllama(tokens=args.tokens, token_delay=args.token_delay, load_delay=args.load_delay), host="127.0.0.1", port=args.port)
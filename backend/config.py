@@ -8,6 +8,19 @@ HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", 8000))
 DEBUG = os.getenv("DEBUG", "true").lower() == "true"
 
+# Worker processes when served by gunicorn (see gunicorn.conf.py); 0 = one per CPU core
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", 1)) or os.cpu_count() or 1
+WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+# Catalog and AI requests arriving during the startup warm-up wait this long for it, then get 503
+STARTUP_WAIT_TIMEOUT = float(os.getenv("STARTUP_WAIT_TIMEOUT", 30.0))
+
+# State shared by worker processes (breaker, in-flight completions, semantic cache); on with >1 worker
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "shared_state.sqlite3")
+SHARED_STATE_ENABLED = os.getenv("SHARED_STATE_ENABLED", str(WEB_WORKERS > 1)).lower() == "true"
+# How long a worker waits for another worker's identical in-flight completion before running its own
+SHARED_FLIGHT_WAIT = float(os.getenv("SHARED_FLIGHT_WAIT", 120.0))
+SHARED_FLIGHT_POLL_INTERVAL = float(os.getenv("SHARED_FLIGHT_POLL_INTERVAL", 0.25))
+
 # CORS Origins
 CORS_ORIGINS = [
     "http://localhost:5173",
@@ -15,10 +28,94 @@ CORS_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 
+# Benefits/offers catalog storage: "memory" (JSON file or the built-in mock data) or "sqlite"
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "memory").lower()
+CATALOG_PATH = os.getenv("CATALOG_PATH", "")  # empty = built-in mock data (memory backend only)
+CATALOG_WATCH_INTERVAL = float(os.getenv("CATALOG_WATCH_INTERVAL", 5.0))  # 0 disables hot reload
+CATALOG_MAX_QUERY_OFFERS = int(os.getenv("CATALOG_MAX_QUERY_OFFERS", 1000))
+CATALOG_HIDE_EXPIRED = os.getenv("CATALOG_HIDE_EXPIRED", "false").lower() == "true"
+# Offer rows kept across cached rankings of paginated queries
+OFFERS_RANKING_CACHE_ROWS = int(os.getenv("OFFERS_RANKING_CACHE_ROWS", 2_000_000))
+
+# HTTP response cache for catalog routes (ETag/304, Cache-Control, pre-compressed bodies)
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 60))  # seconds; catalogs can hot reload
+HTTP_CACHE_STATIC_MAX_AGE = int(os.getenv("HTTP_CACHE_STATIC_MAX_AGE", 3600))  # data that only changes on deploy
+
+# Recommendation engine: items phrased by the LLM, and how far to look for offers
+RECOMMEND_TOP_K = int(os.getenv("RECOMMEND_TOP_K", 4))
+RECOMMEND_RADIUS_KM = float(os.getenv("RECOMMEND_RADIUS_KM", 15.0))
+
+# Bulk card validation: CSV BIN-range table (start,end,card_type; empty = every Visa is classic)
+CARD_BIN_TABLE_PATH = os.getenv("CARD_BIN_TABLE_PATH", "")
+# Single-card /validate: false accepts any 16-digit Visa number (classic outside the BIN table), true applies the batch's Luhn and BIN-range checks
+CARD_VALIDATE_STRICT = os.getenv("CARD_VALIDATE_STRICT", "false").lower() == "true"
+CARD_BATCH_CHUNK = int(os.getenv("CARD_BATCH_CHUNK", 10_000))  # NDJSON lines validated per vectorized step
+CARD_BATCH_SPOOL_BYTES = int(os.getenv("CARD_BATCH_SPOOL_BYTES", 16 * 1024 * 1024))  # results kept in memory, then disk
+
 # Ollama Configuration
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
 
+# Ollama replicas: comma-separated "url [weight=N]" entries, all serving OLLAMA_MODEL; empty = OLLAMA_BASE_URL alone
+OLLAMA_BACKENDS = os.getenv("OLLAMA_BACKENDS", "")
+OLLAMA_BALANCER = os.getenv("OLLAMA_BALANCER", "ewma")  # "ewma" (latency x load) or "least_outstanding"
+OLLAMA_HEDGE_FACTOR = float(os.getenv("OLLAMA_HEDGE_FACTOR", 2.0))  # hedge summaries this many x the fastest replica's latency; 0 disables
+OLLAMA_HEDGE_MIN_DELAY = float(os.getenv("OLLAMA_HEDGE_MIN_DELAY", 0.5))
+OLLAMA_HEDGE_BUDGET = float(os.getenv("OLLAMA_HEDGE_BUDGET", 0.1))  # at most this fraction of calls are hedged
+
+# Ollama HTTP connection pool
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", 20))
+OLLAMA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OLLAMA_MAX_KEEPALIVE_CONNECTIONS", 10))
+OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", 30.0))
+OLLAMA_HTTP2 = os.getenv("OLLAMA_HTTP2", "false").lower() == "true"
+
+# Ollama model residency: preload at startup, keep loaded while there is traffic
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # sent with every request; "-1" keeps the model loaded
+OLLAMA_PRELOAD = os.getenv("OLLAMA_PRELOAD", "true").lower() == "true"
+OLLAMA_LOAD_TIMEOUT = float(os.getenv("OLLAMA_LOAD_TIMEOUT", 300.0))  # a cold load can take minutes on CPU
+OLLAMA_WARMUP_INTERVAL = float(os.getenv("OLLAMA_WARMUP_INTERVAL", 60.0))  # 0 disables warm-up pings
+OLLAMA_WARMUP_WINDOW = float(os.getenv("OLLAMA_WARMUP_WINDOW", 3600.0))  # ping only this long after the last AI request
+
+# Ollama circuit breaker and health probing
+OLLAMA_BREAKER_FAILURES = int(os.getenv("OLLAMA_BREAKER_FAILURES", 3))
+OLLAMA_BREAKER_BACKOFF = float(os.getenv("OLLAMA_BREAKER_BACKOFF", 2.0))
+OLLAMA_BREAKER_MAX_BACKOFF = float(os.getenv("OLLAMA_BREAKER_MAX_BACKOFF", 60.0))
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", 10.0))
+
+# LLM admission control; each worker admits its own share of the concurrency budget, and the shares
+# add up to at most LLM_MAX_CONCURRENCY unless there are more workers than slots (every worker gets one)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 2))
+LLM_WORKER_CONCURRENCY = max(1, LLM_MAX_CONCURRENCY // WEB_WORKERS)
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", 32))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", 15.0))
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", 4))
+
+# Prompt budgets, in (approximate) tokens; every request uses the same context size
+LLM_NUM_CTX = int(os.getenv("LLM_NUM_CTX", 4096))
+LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", 1500))  # longer texts are split and summarized map-reduce
+LLM_SUMMARY_MAX_TOKENS = int(os.getenv("LLM_SUMMARY_MAX_TOKENS", 320))
+LLM_TRANSLATE_MAX_TOKENS = int(os.getenv("LLM_TRANSLATE_MAX_TOKENS", 1536))
+LLM_RECOMMEND_MAX_TOKENS = int(os.getenv("LLM_RECOMMEND_MAX_TOKENS", 400))
+LLM_MAX_INPUT_CHARS = int(os.getenv("LLM_MAX_INPUT_CHARS", 100_000))  # per text; longer requests are rejected
+
+# LLM Response Cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+LLM_CACHE_MAX_DISK_ENTRIES = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", 50000))
+
+# Semantic (near-duplicate) cache; thresholds are cosine similarities in [0, 1]
+LLM_SEMANTIC_CACHE_ENABLED = os.getenv("LLM_SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+LLM_SEMANTIC_RECOMMEND_THRESHOLD = float(os.getenv("LLM_SEMANTIC_RECOMMEND_THRESHOLD", 0.9))
+# Total across all partitions (card tier, lifestyle, ...), not per partition
+LLM_SEMANTIC_MAX_ENTRIES = int(os.getenv("LLM_SEMANTIC_MAX_ENTRIES", 2048))
+
+# Pre-generated summaries/translations loaded at startup (see jobs/pregenerate.py)
+LLM_ARTIFACT_PATH = os.getenv("LLM_ARTIFACT_PATH", "llm_artifact.json")
+
 # Visa API Configuration (for future use)
 VISA_API_BASE_URL = os.getenv("VISA_API_BASE_URL", "https://sandbox.api.visa.com")
 VISA_API_USER_ID = os.getenv("VISA_API_USER_ID", "")
@@ -0,0 +1,18 @@
+"""
+Gunicorn Configuration
+Multi-worker serving with uvicorn workers; `kill -HUP <master pid>` reloads them gracefully
+
+Run from the backend directory:
+    WEB_WORKERS=4 gunicorn -c gunicorn.conf.py main:app
+"""
+# Imported by name: a module-level `config` would be read as gunicorn's own setting
+from config import HOST, PORT, WEB_GRACEFUL_TIMEOUT, WEB_WORKERS
+
+bind = f"{HOST}:{PORT}"
+workers = WEB_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Old workers finish in-flight requests (including streams) for this long on reload/shutdown
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+timeout = 120
+keepalive = 5
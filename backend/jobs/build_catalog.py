@@ -0,0 +1,38 @@
+"""
+Catalog Build Job
+Writes the benefits and offers catalog as JSON (memory backend) or indexed SQLite (sqlite backend)
+
+Run from the backend directory; the output is replaced atomically, so a running
+server with CATALOG_PATH pointing at it picks up the new catalog on its next poll:
+    python -m jobs.build_catalog --output catalog.sqlite3
+    python -m jobs.build_catalog --input catalog.json --output catalog.sqlite3
+"""
+import argparse
+import time
+from services.benefits_service import BENEFITS_DATABASE
+from services.catalog_store import load_catalog_json, write_json_catalog, write_sqlite_catalog
+from services.offers_service import OFFERS_DATABASE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", help="JSON catalog to convert (default: the built-in mock data)")
+    parser.add_argument("--output", required=True, help="*.json for the memory backend, anything else is SQLite")
+    args = parser.parse_args()
+
+    if args.input:
+        benefits, offers = load_catalog_json(args.input)
+    else:
+        benefits, offers = BENEFITS_DATABASE, OFFERS_DATABASE
+
+    started = time.perf_counter()
+    if args.output.endswith(".json"):
+        write_json_catalog(args.output, benefits, offers)
+        count = len(offers)
+    else:
+        count = write_sqlite_catalog(args.output, benefits, offers)
+    print(f"Wrote {count} offers to {args.output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Catalog Summary Pre-generation Job
+Warms summaries and Tamil translations for every benefit and offer T&C
+
+Run from the backend directory (re-running resumes from the existing artifact):
+    python -m jobs.pregenerate --parallelism 4 --output llm_artifact.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Tuple
+import config
+from services import llm_service
+from services.catalog_store import get_catalog_store
+from services.llm_artifact import read_artifact, write_artifact
+
+
+class PregenTask(NamedTuple):
+    key: str
+    label: str
+    run: Callable[[], Awaitable[Tuple[str, str]]]  # (result, source)
+
+
+def catalog_terms() -> List[str]:
+    """Every unique T&C string in the configured benefits and offers catalogs"""
+    return list(dict.fromkeys(get_catalog_store().iter_terms()))
+
+
+def catalog_hash(terms: List[str]) -> str:
+    """Short digest recorded in the artifact to tell which catalog it was built from"""
+    return hashlib.sha256(json.dumps(terms, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def build_tasks(terms: List[str]) -> List[PregenTask]:
+    """English and Tamil summaries plus a Tamil translation for each T&C"""
+    tasks = []
+    for text in terms:
+        for language in ("en", "ta"):
+            tasks.append(PregenTask(
+                llm_service.summary_cache_key(text, language),
+                f"summary[{language}]",
+                lambda text=text, language=language: llm_service.summarize_terms(text, language),
+            ))
+
+        tasks.append(PregenTask(
+            llm_service.translation_cache_key(text),
+            "translation[ta]",
+            lambda text=text: llm_service.translate_to_tamil(text),
+        ))
+    return tasks
+
+
+async def pregenerate(output: str, parallelism: int, checkpoint_every: int) -> Dict[str, int]:
+    """Generate every missing entry, checkpointing the artifact as results arrive"""
+    terms = catalog_terms()
+    digest = catalog_hash(terms)
+    tasks = build_tasks(terms)
+
+    # Resume from a previous run against the same model
+    entries: Dict[str, str] = {}
+    existing = read_artifact(output)
+    if existing and existing.get("model") == config.OLLAMA_MODEL:
+        entries = existing.get("entries", {})
+
+    # Keep only entries the current catalog still needs
+    wanted = {task.key for task in tasks}
+    entries = {key: value for key, value in entries.items() if key in wanted}
+    todo = [task for task in tasks if task.key not in entries]
+    counts = {"total": len(tasks), "skipped": len(tasks) - len(todo), "generated": 0, "failed": 0}
+
+    # The job is the only client, so let it use the full parallelism; a long T&C fans out into
+    # many chunk prompts, and with no one to shed for, all of them queue for as long as it takes
+    admission = llm_service.llm_admission
+    admission.max_concurrency = parallelism
+    admission.max_queue = float("inf")
+    admission.queue_timeout = None
+    semaphore = asyncio.Semaphore(parallelism)
+    since_checkpoint = 0
+
+    async def run(task: PregenTask) -> None:
+        nonlocal since_checkpoint
+        async with semaphore:
+            started = time.perf_counter()
+            result, source = await task.run()
+
+        if source == "fallback":
+            counts["failed"] += 1
+            print(f"  failed  {task.label} {task.key[:12]}")
+            return
+
+        entries[task.key] = result
+        counts["generated"] += 1
+        since_checkpoint += 1
+        print(f"  done    {task.label} {task.key[:12]} ({time.perf_counter() - started:.1f}s)")
+        if since_checkpoint >= checkpoint_every:
+            since_checkpoint = 0
+            write_artifact(output, entries, digest)
+
+    await llm_service.start_client()
+    try:
+        await asyncio.gather(*(run(task) for task in todo))
+    finally:
+        await llm_service.close_client()
+        write_artifact(output, entries, digest)
+
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default=config.LLM_ARTIFACT_PATH)
+    parser.add_argument("--parallelism", type=int, default=config.LLM_MAX_CONCURRENCY)
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Write the artifact after this many results")
+    args = parser.parse_args()
+
+    urls = ", ".join(backend.url for backend in llm_service.ollama_pool.backends)
+    print(f"Pre-generating with {config.OLLAMA_MODEL} at {urls} -> {args.output}")
+    counts = asyncio.run(pregenerate(args.output, args.parallelism, args.checkpoint_every))
+    print(
+        f"{counts['generated']} generated, {counts['skipped']} already done, "
+        f"{counts['failed']} failed, {counts['total']} total"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Card Validation Job
+Validates an NDJSON file of card numbers offline, writing NDJSON results (same format as /api/cards/validate/batch)
+
+Run from the backend directory; "-" reads stdin / writes stdout:
+    python -m jobs.validate_cards --input cards.ndjson --output results.ndjson
+    python -m jobs.validate_cards --input cards.ndjson --output - --bins bin_ranges.csv
+"""
+import argparse
+import sys
+import time
+from services.card_service import get_bin_table, load_bin_table, validate_ndjson
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", required=True, help="NDJSON lines of {\"card_number\": ..., \"id\": ...}")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--bins", help="CSV BIN table (default: CARD_BIN_TABLE_PATH or the built-in table)")
+    args = parser.parse_args()
+
+    table = load_bin_table(args.bins) if args.bins else get_bin_table()
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    started = time.perf_counter()
+    last = ""
+    with source, target:
+        # Large reads; the validator splits lines itself
+        for text in validate_ndjson(iter(lambda: source.read(1 << 20), b""), table):
+            target.write(text)
+            last = text
+    print(f"{last.strip()} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,27 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import cards, benefits, offers, ai
+from fastapi.responses import JSONResponse, PlainTextResponse
+from routers import cards, benefits, offers, search, ai
+from services.metrics import MetricsMiddleware, render_metrics
+from services.startup import CATALOG, LLM, readiness, requires, start_warmup, stop_warmup
 import config
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Listen right away; heavy modules, the catalog and the Ollama client load in the background
+    # (see /api/ready), and catalog/AI requests arriving meanwhile wait for what they need
+    await start_warmup()
+    yield
+    await stop_warmup()
+
+
 app = FastAPI(
     title="Visa Benefits AI Agent",
     description="Proactive AI agent for Visa card benefits with GenAI-powered insights",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Middleware
@@ -18,22 +33,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request counts and latency histograms
+app.add_middleware(MetricsMiddleware)
+
 # Include Routers
 app.include_router(cards.router, prefix="/api/cards", tags=["Cards"])
-app.include_router(benefits.router, prefix="/api/benefits", tags=["Benefits"])
-app.include_router(offers.router, prefix="/api/offers", tags=["Offers"])
-app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
+app.include_router(benefits.router, prefix="/api/benefits", tags=["Benefits"], dependencies=[Depends(requires(CATALOG))])
+app.include_router(offers.router, prefix="/api/offers", tags=["Offers"], dependencies=[Depends(requires(CATALOG))])
+app.include_router(search.router, prefix="/api/search", tags=["Search"], dependencies=[Depends(requires(CATALOG))])
+app.include_router(ai.router, prefix="/api/ai", tags=["AI"], dependencies=[Depends(requires(LLM))])
 
 
 @app.get("/api/health")
 async def health_check():
+    """Liveness: the process is up and serving"""
     return {"status": "healthy", "service": "Visa Benefits AI Agent"}
 
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness: 503 until the startup warm-up has loaded the catalog and the LLM client"""
+    return JSONResponse(readiness.stats(), status_code=200 if readiness.ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     return {
         "message": "Welcome to Visa Benefits AI Agent API",
         "docs": "/docs",
-        "health": "/api/health"
+        "health": "/api/health",
+        "ready": "/api/ready"
     }
@@ -1,6 +1,16 @@
 # Models package
 from .card import CardInput, CardValidationResponse, CardInfo, TEST_CARDS
-from .benefits import Benefit, BenefitCategory, BenefitsResponse, MerchantOffer, OffersResponse
+from .benefits import (
+    Benefit,
+    BenefitCategory,
+    BenefitsResponse,
+    MerchantOffer,
+    OffersResponse,
+    RankedRecommendation,
+    RecommendationsResponse,
+    SearchHit,
+    SearchResponse,
+)
 
 __all__ = [
     "CardInput",
@@ -12,4 +22,8 @@ __all__ = [
     "BenefitsResponse",
     "MerchantOffer",
     "OffersResponse",
+    "RankedRecommendation",
+    "RecommendationsResponse",
+    "SearchHit",
+    "SearchResponse",
 ]
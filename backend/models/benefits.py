@@ -30,6 +30,7 @@ class BenefitsResponse(BaseModel):
     total_benefits: int
     benefits: List[Benefit]
     categories: List[str]
+    next_cursor: Optional[str] = None  # set when more pages follow
 
 
 class MerchantOffer(BaseModel):
@@ -39,6 +40,8 @@ class MerchantOffer(BaseModel):
     discount: str
     description: str
     location: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     distance_km: Optional[float] = None
     valid_until: str
     terms: str
@@ -50,3 +53,44 @@ class OffersResponse(BaseModel):
     location: str
     total_offers: int
     offers: List[MerchantOffer]
+    next_cursor: Optional[str] = None  # set when more pages follow
+
+
+class RankedRecommendation(BaseModel):
+    kind: str  # "benefit" or "offer"
+    id: str
+    title: str
+    category: BenefitCategory
+    value: Optional[str] = None  # benefit value or offer discount
+    merchant: Optional[str] = None
+    distance_km: Optional[float] = None
+    valid_until: Optional[str] = None
+    score: float
+    reasons: List[str]
+
+
+class RecommendationsResponse(BaseModel):
+    card_type: str
+    location: str
+    total_candidates: int
+    recommendations: List[RankedRecommendation]
+
+
+class SearchHit(BaseModel):
+    kind: str  # "benefit" or "offer"
+    id: str
+    title: str
+    category: BenefitCategory
+    merchant: Optional[str] = None
+    value: Optional[str] = None  # benefit value or offer discount
+    tier: Optional[str] = None  # lowest card tier with the benefit
+    distance_km: Optional[float] = None
+    valid_until: Optional[str] = None
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    total_hits: int
+    hits: List[SearchHit]
+    next_cursor: Optional[str] = None  # set when more pages follow
@@ -1,4 +1,4 @@
 # Routers package
-from . import cards, benefits, offers, ai
+from . import cards, benefits, offers, search, ai
 
-__all__ = ["cards", "benefits", "offers", "ai"]
+__all__ = ["cards", "benefits", "offers", "search", "ai"]
@@ -1,63 +1,144 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Optional, List
-from services.llm_service import (
-    summarize_terms, 
-    translate_to_tamil, 
-    generate_recommendations,
-    check_ollama_status
-)
+import json
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Annotated, AsyncIterator, Dict, Optional, List
+import config
+from models.benefits import RecommendationsResponse
+from services.benefits_service import get_benefit_by_id
+from services.prompt_budget import BUDGETS
 
 router = APIRouter()
 
+# Handlers import the LLM service on first use: it pulls in httpx and the recommendation ranker,
+# which the startup warm-up loads in the background instead of at import
+
+# Longer inputs are summarized/translated in chunks; this caps the number of chunk requests
+InputText = Annotated[str, Field(max_length=config.LLM_MAX_INPUT_CHARS)]
+
 
 class SummarizeRequest(BaseModel):
-    text: str
+    text: InputText
+    language: str = "en"  # "en" or "ta" for Tamil
+
+
+class BatchSummarizeRequest(BaseModel):
+    texts: List[InputText] = Field(default_factory=list, max_length=100)
+    benefit_ids: List[str] = Field(default_factory=list, max_length=100)
     language: str = "en"  # "en" or "ta" for Tamil
 
 
 class TranslateRequest(BaseModel):
-    text: str
+    text: InputText
 
 
 class RecommendRequest(BaseModel):
     card_type: str
-    location: str = "IIT Chennai"
-    lifestyle: str = "student"
-    interests: List[str] = ["technology", "food", "entertainment"]
+    location: str = Field("IIT Chennai", max_length=200)
+    lifestyle: str = Field("student", max_length=50)
+    interests: List[Annotated[str, Field(max_length=50)]] = Field(
+        ["technology", "food", "entertainment"], max_length=20
+    )
 
 
 class AIResponse(BaseModel):
     result: str
-    source: str  # "llm" or "fallback"
+    source: str  # "llm", "cache" or "fallback"
+
+
+async def _sse(events: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """Encode completion events as Server-Sent Events"""
+    async for event in events:
+        name = "done" if event.get("done") else "delta"
+        yield f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def _event_stream(events: AsyncIterator[dict]) -> StreamingResponse:
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/summarize", response_model=AIResponse)
 async def summarize_tc(request: SummarizeRequest):
     """Summarize terms and conditions in plain language"""
+    from services.llm_service import summarize_terms
     
-    result = await summarize_terms(request.text, request.language)
-    source = "fallback" if result.startswith("**Quick Summary:**") else "llm"
+    result, source = await summarize_terms(request.text, request.language)
     
     return AIResponse(result=result, source=source)
 
 
+@router.post("/summarize/stream")
+async def summarize_tc_stream(request: SummarizeRequest):
+    """Stream a plain-language T&C summary as Server-Sent Events"""
+    from services.llm_service import stream_summarize_terms
+    
+    return _event_stream(stream_summarize_terms(request.text, request.language))
+
+
+@router.post("/summarize/batch")
+async def summarize_tc_batch(request: BatchSummarizeRequest):
+    """Summarize many T&Cs in one request, streaming NDJSON lines as each finishes"""
+    from services.llm_service import summarize_batch
+    
+    # Map every unique text back to the items that asked for it
+    items: Dict[str, List[dict]] = {}
+    unknown: List[str] = []
+    for i, text in enumerate(request.texts):
+        items.setdefault(text, []).append({"index": i})
+    for benefit_id in request.benefit_ids:
+        benefit = get_benefit_by_id(benefit_id)
+        if benefit is None:
+            unknown.append(benefit_id)
+        else:
+            items.setdefault(benefit.terms_and_conditions, []).append({"benefit_id": benefit_id})
+    
+    async def lines() -> AsyncIterator[str]:
+        for benefit_id in unknown:
+            yield json.dumps({"benefit_id": benefit_id, "error": "Benefit not found"}) + "\n"
+        
+        async for text, result, source in summarize_batch(
+            items, request.language, config.LLM_BATCH_CONCURRENCY
+        ):
+            for item in items[text]:
+                line = {**item, "result": result, "source": source}
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+        
+        yield json.dumps({"done": True, "total": len(items), "unknown": len(unknown)}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/translate")
 async def translate(request: TranslateRequest):
     """Translate English text to Tamil"""
+    from services.llm_service import translate_to_tamil
     
-    result = await translate_to_tamil(request.text)
+    result, source = await translate_to_tamil(request.text)
     
     return {
         "original": request.text,
         "translated": result,
-        "target_language": "Tamil"
+        "target_language": "Tamil",
+        "source": source
     }
 
 
+@router.post("/translate/stream")
+async def translate_stream(request: TranslateRequest):
+    """Stream an English to Tamil translation as Server-Sent Events"""
+    from services.llm_service import stream_translate_to_tamil
+    
+    return _event_stream(stream_translate_to_tamil(request.text))
+
+
 @router.post("/recommend", response_model=AIResponse)
 async def get_recommendations(request: RecommendRequest):
     """Generate personalized benefit recommendations"""
+    from services.llm_service import generate_recommendations
     
     user_context = {
         "location": request.location,
@@ -65,21 +146,74 @@ async def get_recommendations(request: RecommendRequest):
         "interests": request.interests
     }
     
-    result = await generate_recommendations(request.card_type, user_context)
-    source = "fallback" if "Error" in result else "llm"
+    result, source = await generate_recommendations(request.card_type, user_context)
     
     return AIResponse(result=result, source=source)
 
 
+@router.post("/recommend/ranked", response_model=RecommendationsResponse)
+async def get_ranked_recommendations(
+    request: RecommendRequest,
+    limit: int = Query(config.RECOMMEND_TOP_K, ge=1, le=50, description="How many picks to return")
+):
+    """Rank the benefits and nearby offers for a user, without the LLM"""
+    from services.catalog_store import run_catalog_query
+    from services.recommendation_service import rank_recommendations
+    
+    user_context = {
+        "location": request.location,
+        "lifestyle": request.lifestyle,
+        "interests": request.interests
+    }
+    
+    return await run_catalog_query(lambda: rank_recommendations(request.card_type, user_context, k=limit))
+
+
+@router.post("/recommend/stream")
+async def get_recommendations_stream(request: RecommendRequest):
+    """Stream personalized benefit recommendations as Server-Sent Events"""
+    from services.llm_service import stream_recommendations
+    
+    user_context = {
+        "location": request.location,
+        "lifestyle": request.lifestyle,
+        "interests": request.interests
+    }
+    
+    return _event_stream(stream_recommendations(request.card_type, user_context))
+
+
 @router.get("/status")
 async def get_ai_status():
     """Check AI/LLM service status"""
+    from services.llm_cache import llm_cache
+    from services.llm_service import (
+        check_ollama_status,
+        completion_flights,
+        stream_flights,
+        shared_flights,
+        llm_admission,
+        ollama_pool,
+        recommend_semantic_cache
+    )
     
     status = await check_ollama_status()
     
     return {
         "ai_enabled": status["ollama_running"] and status["model_available"],
         "ollama_status": status,
+        "pool": ollama_pool.stats(),
+        "cache": llm_cache.stats(),
+        "coalescing": completion_flights.stats(),
+        "stream_coalescing": stream_flights.stats(),
+        "shared_coalescing": shared_flights.stats(),
+        "admission": llm_admission.stats(),
+        "semantic_cache": {
+            "recommend": recommend_semantic_cache.stats(),
+        },
+        "budgets": {
+            route: {"num_ctx": config.LLM_NUM_CTX, **budget._asdict()} for route, budget in BUDGETS.items()
+        },
         "message": "AI features fully available" if status["model_available"] 
                    else "Using fallback mode (Ollama not running)"
     }
@@ -1,25 +1,46 @@
-from fastapi import APIRouter, Query
-from services.benefits_service import get_benefits_by_card_type, get_all_categories
-from models.benefits import BenefitsResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+import config
+from services.benefits_service import get_benefits_index, get_benefits_page, get_all_categories
+from services.http_cache import cached_response, json_bytes
+from services.pagination import parse_fields, project
+from models.benefits import Benefit, BenefitsResponse
 
 router = APIRouter()
 
 
 @router.get("/{card_type}", response_model=BenefitsResponse)
 async def get_benefits(
+    request: Request,
     card_type: str,
-    category: str = Query(None, description="Filter by benefit category")
+    category: str = Query(None, description="Filter by benefit category"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated benefit fields, e.g. id,title,value,icon")
 ):
     """Get all benefits for a specific card type"""
+    # Imported here: the catalog store (numpy, search index) loads in the startup warm-up, not at import
+    from services.catalog_store import get_catalog_store
     
-    response = get_benefits_by_card_type(card_type)
+    def build() -> bytes:
+        if limit is None and cursor is None and fields is None:
+            # Precomputed view, already serialized
+            return get_benefits_index().view(card_type, category).body
+        try:
+            selected = parse_fields(fields, Benefit)
+            page = get_benefits_page(card_type, category, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return json_bytes(project(page, "benefits", selected))
     
-    # Filter by category if specified
-    if category:
-        response.benefits = [b for b in response.benefits if b.category.value == category]
-        response.total_benefits = len(response.benefits)
-    
-    return response
+    return await cached_response(
+        request,
+        "benefits",
+        (card_type.lower(), category, limit, cursor, fields),
+        get_catalog_store().version,
+        build,
+        config.HTTP_CACHE_MAX_AGE
+    )
 
 
 @router.get("/")
@@ -1,16 +1,43 @@
-from fastapi import APIRouter, HTTPException
+import hashlib
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
+import config
 from models.card import CardInput, CardValidationResponse, TEST_CARDS
+from services.http_cache import cached_response, json_bytes
 
 router = APIRouter()
 
+# Static demo data, serialized once; the version changes whenever the content does
+TEST_CARDS_BODY = json_bytes({
+    "test_cards": [
+        {"number": "4000 0000 0000 0000", "type": "Visa Classic", "tier": "Standard"},
+        {"number": "4000 0000 0000 1000", "type": "Visa Gold", "tier": "Premium"},
+        {"number": "4000 0000 0000 2000", "type": "Visa Platinum", "tier": "Elite"},
+        {"number": "4000 0000 0000 3000", "type": "Visa Signature", "tier": "Luxury"},
+    ],
+    "note": "Use these test card numbers to explore different benefit tiers"
+})
+TEST_CARDS_VERSION = hashlib.sha256(TEST_CARDS_BODY).hexdigest()[:12]
+
 
 @router.post("/validate", response_model=CardValidationResponse)
 async def validate_card(card_input: CardInput):
     """Validate a Visa card number and return card type"""
     
+    # Imported here: the BIN table (numpy) loads in the startup warm-up, not at import
+    from services.card_service import check_card_number, lookup_card_type
+    
     card_number = card_input.card_number
     
+    # Opt-in: the same Luhn and BIN-range checks as a batch
+    if config.CARD_VALIDATE_STRICT:
+        card_type, error = check_card_number(card_number)
+        if error is not None:
+            raise HTTPException(status_code=400, detail=error)
+    else:
+        card_type = None
+    
     # Check if it's a known test card
     if card_number in TEST_CARDS:
         card_info = TEST_CARDS[card_number]
@@ -21,30 +48,40 @@ async def validate_card(card_input: CardInput):
             message=f"Valid {card_info['name']} detected"
         )
     
-    # For other valid-format cards, default to classic
-    if card_number.startswith("4"):
+    # Other valid-format cards take their tier from the BIN table, defaulting to classic
+    card_type = card_type or lookup_card_type(card_number)
+    if card_type is not None and card_type != "classic":
         return CardValidationResponse(
             valid=True,
-            card_type="classic",
+            card_type=card_type,
             last_four=card_number[-4:],
-            message="Valid Visa card detected (defaulting to Classic tier for demo)"
+            message=f"Valid Visa {card_type.title()} card detected"
         )
-    
-    raise HTTPException(
-        status_code=400,
-        detail="Invalid card number. Only Visa cards (starting with 4) are accepted."
+    return CardValidationResponse(
+        valid=True,
+        card_type="classic",
+        last_four=card_number[-4:],
+        message="Valid Visa card detected (defaulting to Classic tier for demo)"
     )
 
 
+@router.post("/validate/batch")
+async def validate_card_batch(request: Request):
+    """Validate many cards: NDJSON in ({"card_number": ..., "id": ...} per line), NDJSON results out"""
+    from services.card_service import read_spool, spool_validate_ndjson
+    
+    results = await spool_validate_ndjson(request.stream())
+    return StreamingResponse(read_spool(results), media_type="application/x-ndjson")
+
+
 @router.get("/test-cards")
-async def get_test_cards():
+async def get_test_cards(request: Request):
     """Get list of available test card numbers for demo"""
-    return {
-        "test_cards": [
-            {"number": "4000 0000 0000 0000", "type": "Visa Classic", "tier": "Standard"},
-            {"number": "4000 0000 0000 1000", "type": "Visa Gold", "tier": "Premium"},
-            {"number": "4000 0000 0000 2000", "type": "Visa Platinum", "tier": "Elite"},
-            {"number": "4000 0000 0000 3000", "type": "Visa Signature", "tier": "Luxury"},
-        ],
-        "note": "Use these test card numbers to explore different benefit tiers"
-    }
+    return await cached_response(
+        request,
+        "test_cards",
+        (),
+        TEST_CARDS_VERSION,
+        lambda: TEST_CARDS_BODY,
+        config.HTTP_CACHE_STATIC_MAX_AGE
+    )
@@ -1,35 +1,114 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional
-from services.offers_service import get_offers_by_location, get_offers_by_category
-from models.benefits import OffersResponse
+import config
+from services.http_cache import cached_response, json_bytes
+from services.pagination import parse_fields, project
+from models.benefits import MerchantOffer, OffersResponse
 
 router = APIRouter()
 
 
 @router.get("/", response_model=OffersResponse)
 async def get_offers(
+    request: Request,
     location: str = Query("IIT Chennai", description="User location"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    max_distance: Optional[float] = Query(None, description="Maximum distance in km")
+    max_distance: Optional[float] = Query(None, ge=0, description="Maximum distance in km"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="User latitude"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="User longitude"),
+    k: Optional[int] = Query(None, ge=1, le=500, description="Return only the k nearest offers"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated offer fields, e.g. id,offer_title,discount")
 ):
     """Get merchant offers near a location (simulates VMORC API)"""
+    # Imported here: the offers index (numpy) loads in the startup warm-up, not at import
+    from services.offers_service import get_offers_by_location, get_offers_version
+    from services.catalog_store import run_catalog_query
     
-    return get_offers_by_location(
-        location=location,
-        category=category,
-        max_distance=max_distance
+    def build() -> bytes:
+        try:
+            selected = parse_fields(fields, MerchantOffer)
+            response = get_offers_by_location(
+                location=location,
+                category=category,
+                max_distance=max_distance,
+                latitude=lat,
+                longitude=lon,
+                limit=k,
+                page_size=limit,
+                cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if selected is None:
+            return response.model_dump_json().encode("utf-8")
+        return json_bytes(project(response, "offers", selected))
+    
+    return await cached_response(
+        request,
+        "offers",
+        (location, category, max_distance, lat, lon, k, limit, cursor, fields),
+        get_offers_version(),
+        build,
+        config.HTTP_CACHE_MAX_AGE,
+        run_catalog_query
     )
 
 
 @router.get("/nearby")
 async def get_nearby_offers(
-    max_distance: float = Query(5.0, description="Maximum distance in km")
+    request: Request,
+    max_distance: float = Query(5.0, ge=0, description="Maximum distance in km"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="User latitude"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="User longitude"),
+    k: Optional[int] = Query(None, ge=1, le=500, description="Return only the k nearest offers"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated offer fields, e.g. id,offer_title,discount")
 ):
-    """Get offers within walking/short commute distance"""
+    """Get offers within walking/short commute distance (max_distance=0 means no limit)"""
+    from services.offers_service import get_offers_by_location, get_offers_version
+    from services.catalog_store import run_catalog_query
+    from services.geo import resolve_location
+    
+    # Echo the point actually searched around: the coordinates if given, else the campus
+    location = "IIT Chennai Campus" if lat is None or lon is None else None
+    latitude, longitude = resolve_location(location) if location else (lat, lon)
     
-    response = get_offers_by_location(max_distance=max_distance)
-    return {
-        "location": "IIT Chennai Campus",
-        "radius_km": max_distance,
-        "offers": response.offers
-    }
+    def build() -> bytes:
+        try:
+            selected = parse_fields(fields, MerchantOffer)
+            response = get_offers_by_location(
+                location=location or "IIT Chennai Campus",
+                max_distance=max_distance,
+                latitude=latitude,
+                longitude=longitude,
+                limit=k,
+                page_size=limit,
+                cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        page = project(response, "offers", selected)
+        return json_bytes({
+            "location": location,
+            "latitude": latitude,
+            "longitude": longitude,
+            "radius_km": max_distance,
+            "offers": page["offers"],
+            "total_offers": response.total_offers,
+            "next_cursor": response.next_cursor
+        })
+    
+    return await cached_response(
+        request,
+        "offers_nearby",
+        (max_distance, lat, lon, k, limit, cursor, fields),
+        get_offers_version(),
+        build,
+        config.HTTP_CACHE_MAX_AGE,
+        run_catalog_query
+    )
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+import config
+from services.http_cache import cached_response
+from models.benefits import SearchResponse
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Search text, e.g. 'airport lounge'"),
+    card_type: Optional[str] = Query(None, description="Only benefits this card tier has"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    kind: Optional[str] = Query(None, description="'benefit' or 'offer'"),
+    location: Optional[str] = Query(None, description="User location, for offer distances"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="User latitude"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="User longitude"),
+    max_distance: Optional[float] = Query(None, ge=0, description="Only offers within this many km"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Full-text search over benefits and offers, best match first (BM25)"""
+    # Imported here: the search index (numpy) loads in the startup warm-up, not at import
+    from services.offers_service import get_offers_version
+    from services.search_service import search_catalog
+    from services.catalog_store import run_catalog_query
+    
+    def build() -> bytes:
+        try:
+            response = search_catalog(
+                query=q,
+                card_type=card_type,
+                category=category,
+                kind=kind,
+                location=location,
+                latitude=lat,
+                longitude=lon,
+                max_distance=max_distance,
+                page_size=limit,
+                cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return response.model_dump_json().encode("utf-8")
+    
+    return await cached_response(
+        request,
+        "search",
+        (q, card_type, category, kind, location, lat, lon, max_distance, limit, cursor),
+        get_offers_version(),
+        build,
+        config.HTTP_CACHE_MAX_AGE,
+        run_catalog_query
+    )
@@ -1,15 +1,34 @@
 # Services package
-from .benefits_service import get_benefits_by_card_type, get_all_categories
-from .offers_service import get_offers_by_location, get_offers_by_category
-from .llm_service import summarize_terms, translate_to_tamil, generate_recommendations, check_ollama_status
-
-__all__ = [
-    "get_benefits_by_card_type",
-    "get_all_categories",
-    "get_offers_by_location",
-    "get_offers_by_category",
-    "summarize_terms",
-    "translate_to_tamil",
-    "generate_recommendations",
-    "check_ollama_status",
-]
+# Exports resolve on first access, so importing one service module doesn't import them all
+# (numpy, httpx and the catalogs load only when something needs them)
+from importlib import import_module
+
+_EXPORTS = {
+    "get_benefits_by_card_type": "benefits_service",
+    "get_all_categories": "benefits_service",
+    "get_benefits_index": "benefits_service",
+    "get_benefit_by_id": "benefits_service",
+    "get_catalog_store": "catalog_store",
+    "load_catalog": "catalog_store",
+    "get_offers_by_location": "offers_service",
+    "get_offers_by_category": "offers_service",
+    "search_catalog": "search_service",
+    "summarize_terms": "llm_service",
+    "translate_to_tamil": "llm_service",
+    "generate_recommendations": "llm_service",
+    "summarize_batch": "llm_service",
+    "stream_summarize_terms": "llm_service",
+    "stream_translate_to_tamil": "llm_service",
+    "stream_recommendations": "llm_service",
+    "check_ollama_status": "llm_service",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f".{module}", __name__), name)
+
+
+__all__ = list(_EXPORTS)
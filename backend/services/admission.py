@@ -0,0 +1,137 @@
+"""
+LLM Admission Control
+Bounds concurrent Ollama calls with a priority wait queue and deadline-based load shedding
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, List, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first"""
+    INTERACTIVE = 0  # summarize, translate
+    BACKGROUND = 1   # recommendations, batch jobs
+
+
+class AdmissionController:
+    """Concurrency limit plus a bounded priority queue; waiters past their deadline are shed"""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._active = 0
+        self._queued = 0
+        self._heap: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.shed_evicted = 0
+        self.max_queue_depth = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """Wait for a slot; False means the request was shed and should fall back"""
+        if self._active < self.max_concurrency and self._queued == 0:
+            self._active += 1
+            self.admitted += 1
+            self._record_wait(0.0)
+            return True
+
+        if self._queued >= self.max_queue and not self._evict_lower(priority):
+            self.shed_queue_full += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (int(priority), next(self._sequence), future))
+        self._queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queued)
+
+        started = time.perf_counter()
+        deadline = self.queue_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait({future}, timeout=deadline)
+        except asyncio.CancelledError:
+            # The caller went away; pass on a slot granted in the meantime
+            if future.done() and not future.cancelled() and future.result():
+                self.release()
+            elif not future.done():
+                future.cancel()
+                self._queued -= 1
+            raise
+
+        if not future.done():
+            # Deadline passed: leave the heap entry for release() to skip
+            future.cancel()
+            self._queued -= 1
+            self.shed_deadline += 1
+            return False
+
+        if not future.result():
+            self.shed_evicted += 1
+            return False
+
+        self.admitted += 1
+        self._record_wait(time.perf_counter() - started)
+        return True
+
+    def release(self) -> None:
+        """Hand the slot to the best live waiter, or free it"""
+        while self._heap:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                self._queued -= 1
+                future.set_result(True)
+                return
+        self._active -= 1
+
+    def _evict_lower(self, priority: Priority) -> bool:
+        """Make room for a higher-priority request by shedding the worst queued waiter"""
+        live = [entry for entry in self._heap if not entry[2].done()]
+        if not live:
+            return False
+        worst = max(live, key=lambda entry: (entry[0], entry[1]))
+        if worst[0] <= int(priority):
+            return False
+        worst[2].set_result(False)
+        self._queued -= 1
+        return True
+
+    def _record_wait(self, waited: float) -> None:
+        self.wait_count += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[bool]:
+        """Hold a slot for the duration of the block; yields whether the request was admitted"""
+        admitted = await self.acquire(priority)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release()
+
+    def stats(self) -> dict:
+        """Queue depth, shedding counters and wait-time summary"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_deadline": self.shed_deadline,
+            "shed_evicted": self.shed_evicted,
+            "avg_wait_ms": round(self.wait_total / self.wait_count * 1000, 2) if self.wait_count else 0.0,
+            "max_wait_ms": round(self.wait_max * 1000, 2),
+        }
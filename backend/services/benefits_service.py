@@ -2,8 +2,10 @@
 Mock Benefits Service
 Simulates Visa Digital Benefits Platform (VDBP) API responses
 """
-from typing import List, Dict
+from types import MappingProxyType
+from typing import List, Dict, NamedTuple, Optional, Tuple
 from models.benefits import Benefit, BenefitCategory, BenefitsResponse
+from services.pagination import decode_cursor, next_cursor, query_fingerprint
 
 
 # Mock benefits data structured like Visa VDBP API
@@ -210,33 +212,125 @@ BENEFITS_DATABASE: Dict[str, List[Dict]] = {
 }
 
 
-def get_benefits_by_card_type(card_type: str) -> BenefitsResponse:
-    """Retrieve benefits for a specific card type (simulates VDBP API)"""
-    card_type = card_type.lower()
-    
-    if card_type not in BENEFITS_DATABASE:
-        card_type = "classic"  # Default to classic
-    
-    benefits_data = BENEFITS_DATABASE[card_type]
-    benefits = [Benefit(**b) for b in benefits_data]
-    
-    # Include benefits from lower tiers
-    tier_order = ["classic", "gold", "platinum", "signature"]
-    current_index = tier_order.index(card_type)
-    
-    for i in range(current_index):
-        lower_tier = tier_order[i]
-        for b in BENEFITS_DATABASE[lower_tier]:
-            benefits.append(Benefit(**b))
-    
-    categories = list(set(b.category.value for b in benefits))
-    
-    return BenefitsResponse(
+# Tiers from lowest to highest; each tier also gets every lower tier's benefits
+TIER_ORDER = ["classic", "gold", "platinum", "signature"]
+
+
+class BenefitsView(NamedTuple):
+    """A precomputed benefits response with its serialized body"""
+    response: BenefitsResponse
+    body: bytes
+
+
+def _make_view(card_type: str, benefits: List[Benefit], categories: List[str]) -> BenefitsView:
+    response = BenefitsResponse(
         card_type=card_type,
         total_benefits=len(benefits),
         benefits=benefits,
         categories=categories
     )
+    return BenefitsView(response, response.model_dump_json().encode("utf-8"))
+
+
+class BenefitsIndex:
+    """Immutable tier -> benefits, tier+category -> benefits and tier -> categories views"""
+
+    def __init__(self, database: Dict[str, List[Dict]]):
+        views: Dict[Tuple[str, Optional[str]], BenefitsView] = {}
+        categories: Dict[str, Tuple[str, ...]] = {}
+        empty: Dict[str, BenefitsView] = {}
+        by_id: Dict[str, Benefit] = {}
+        tiers: Dict[str, str] = {}
+        
+        for index, tier in enumerate(TIER_ORDER):
+            for b in database.get(tier, []):
+                tiers.setdefault(b["id"], tier)
+
+            # Requested tier first, then lower tiers in ascending order
+            benefits = [Benefit(**b) for b in database.get(tier, [])]
+            for lower_tier in TIER_ORDER[:index]:
+                benefits.extend(Benefit(**b) for b in database.get(lower_tier, []))
+            
+            for benefit in benefits:
+                by_id.setdefault(benefit.id, benefit)
+            
+            tier_categories = list(dict.fromkeys(b.category.value for b in benefits))
+            categories[tier] = tuple(tier_categories)
+            views[(tier, None)] = _make_view(tier, benefits, tier_categories)
+            empty[tier] = _make_view(tier, [], tier_categories)
+            
+            for category in BenefitCategory:
+                matching = [b for b in benefits if b.category == category]
+                views[(tier, category.value)] = _make_view(tier, matching, tier_categories)
+        
+        self._views = MappingProxyType(views)
+        self._categories = MappingProxyType(categories)
+        self._empty = MappingProxyType(empty)
+        self._by_id = MappingProxyType(by_id)
+        self._tiers = MappingProxyType(tiers)
+
+    def view(self, card_type: str, category: Optional[str] = None) -> BenefitsView:
+        """Precomputed view for a card type, optionally filtered by category"""
+        card_type = card_type.lower()
+        if card_type not in self._categories:
+            card_type = "classic"  # Default to classic
+        
+        view = self._views.get((card_type, category or None))
+        if view is None:
+            # Unknown categories match nothing
+            view = self._empty[card_type]
+        return view
+
+    def benefit(self, benefit_id: str) -> Optional[Benefit]:
+        """Look up a single benefit by id"""
+        return self._by_id.get(benefit_id)
+
+    def tier_of(self, benefit_id: str) -> Optional[str]:
+        """Tier a benefit is defined in (higher tiers inherit it)"""
+        return self._tiers.get(benefit_id)
+
+    def categories(self, card_type: str) -> Tuple[str, ...]:
+        """Categories available to a card type"""
+        return self._categories.get(card_type.lower(), self._categories["classic"])
+
+
+def get_benefits_index() -> BenefitsIndex:
+    """Benefits index of the currently loaded catalog"""
+    # Imported here: the catalog store builds on BenefitsIndex from this module
+    from services.catalog_store import get_catalog_store
+    return get_catalog_store().benefits
+
+
+def get_benefits_by_card_type(card_type: str) -> BenefitsResponse:
+    """Retrieve benefits for a specific card type (simulates VDBP API)"""
+    # Deep copy: a shallow one would still share the benefits list and Benefit objects with the index
+    return get_benefits_index().view(card_type).response.model_copy(deep=True)
+
+
+def get_benefits_page(
+    card_type: str,
+    category: Optional[str] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> BenefitsResponse:
+    """One page of a precomputed benefits view (a bad cursor raises ValueError)"""
+    index = get_benefits_index()
+    view = index.view(card_type, category)
+    fingerprint = query_fingerprint(view.response.card_type, category or None)
+    offset = decode_cursor(cursor, fingerprint)
+    benefits = view.response.benefits
+    end = offset + page_size if page_size is not None else len(benefits)
+    
+    # The view is already in tier order, so pages are plain slices
+    return view.response.model_copy(update={
+        "benefits": benefits[offset:end],
+        "next_cursor": next_cursor(offset, page_size, len(benefits), fingerprint),
+    })
+
+
+def get_benefit_by_id(benefit_id: str) -> Optional[Benefit]:
+    """Retrieve a single benefit by id, or None if it doesn't exist (shared with the index: don't mutate)"""
+    return get_benefits_index().benefit(benefit_id)
 
 
 def get_all_categories() -> List[str]:
@@ -0,0 +1,289 @@
+"""
+Card Service
+Bulk card validation: Luhn checksums and tier lookup through a sorted BIN-range table, vectorized with NumPy
+"""
+import asyncio
+import csv
+import itertools
+import json
+import json.scanner
+import tempfile
+from typing import AsyncIterable, BinaryIO, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import config
+from models.card import TEST_CARDS
+from services.benefits_service import TIER_ORDER
+
+
+CARD_DIGITS = 16
+_POWERS_OF_TEN = 10 ** np.arange(CARD_DIGITS - 1, -1, -1, dtype=np.int64)
+
+# Longest accepted NDJSON input line; longer lines are cut short and fail to parse
+MAX_LINE_BYTES = 1024
+
+# Error codes of a validated batch, and their messages
+OK, BAD_FORMAT, NOT_VISA, BAD_CHECKSUM, NO_RANGE = range(5)
+ERRORS = {
+    BAD_FORMAT: "Card number must be 16 digits",
+    NOT_VISA: "Only Visa cards (starting with 4) are accepted",
+    BAD_CHECKSUM: "Card number fails the Luhn checksum",
+    NO_RANGE: "Card number is not in any BIN range",
+}
+
+
+class BinTable:
+    """Non-overlapping card number ranges -> tier, sorted for binary search
+
+    Range bounds are number prefixes of any length: "4000" to "4001" covers
+    4000000000000000-4001999999999999.
+    """
+
+    def __init__(self, ranges: Iterable[Tuple[str, str, str]]):
+        rows = []
+        for start, end, card_type in ranges:
+            if not (start.isdigit() and end.isdigit()) or len(start) > CARD_DIGITS or len(end) > CARD_DIGITS:
+                raise ValueError(f"BIN range bounds must be 1-{CARD_DIGITS} digits, got {start!r}-{end!r}")
+            if card_type not in TIER_ORDER:
+                raise ValueError(f"Unknown card type {card_type!r} for BIN range {start}-{end}")
+            low, high = int(start.ljust(CARD_DIGITS, "0")), int(end.ljust(CARD_DIGITS, "9"))
+            if low > high:
+                raise ValueError(f"BIN range {start}-{end} is empty")
+            rows.append((low, high, TIER_ORDER.index(card_type)))
+        rows.sort()
+        for (_, previous_high, _), (low, high, _) in zip(rows, rows[1:]):
+            if low <= previous_high:
+                raise ValueError(f"BIN ranges overlap at {low}")
+
+        self.starts = np.array([r[0] for r in rows], dtype=np.int64)
+        self.ends = np.array([r[1] for r in rows], dtype=np.int64)
+        self.tiers = np.array([r[2] for r in rows], dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def lookup(self, numbers: np.ndarray) -> np.ndarray:
+        """Tier rank (index into TIER_ORDER) of each card number, or -1 outside every range"""
+        index = np.searchsorted(self.starts, numbers, side="right") - 1
+        found = index >= 0
+        found[found] = numbers[found] <= self.ends[index[found]]
+        return np.where(found, self.tiers[np.maximum(index, 0)] if len(self) else -1, -1).astype(np.int8)
+
+
+# Without a table file every Visa number is classic
+BUILTIN_BIN_RANGES = [("4", "4", "classic")]
+
+
+def load_bin_table(path: str) -> BinTable:
+    """Read a CSV BIN table with start,end,card_type columns (a header row and # comments are skipped)"""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [
+            [cell.strip() for cell in row]
+            for row in csv.reader(f)
+            if row and not row[0].lstrip().startswith("#")
+        ]
+    if rows and rows[0][:1] == ["start"]:
+        rows = rows[1:]
+    if any(len(row) != 3 for row in rows):
+        raise ValueError(f"{path}: every BIN row needs start,end,card_type")
+    return BinTable(tuple(row) for row in rows)
+
+
+_bin_table: Optional[BinTable] = None
+
+
+def get_bin_table() -> BinTable:
+    """The configured BIN table, loaded on first use"""
+    global _bin_table
+    if _bin_table is None:
+        path = config.CARD_BIN_TABLE_PATH
+        _bin_table = load_bin_table(path) if path else BinTable(BUILTIN_BIN_RANGES)
+    return _bin_table
+
+
+def validate_numbers(numbers: List[str], table: Optional[BinTable] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Error code and tier rank (-1 if invalid) of each cleaned card number
+
+    Test cards keep their fixed tiers without a checksum.
+    """
+    table = table or get_bin_table()
+    errors = np.full(len(numbers), BAD_FORMAT, dtype=np.uint8)
+    tiers = np.full(len(numbers), -1, dtype=np.int8)
+    well_formed = np.fromiter(
+        (len(n) == CARD_DIGITS and n.isascii() and n.isdigit() for n in numbers), dtype=bool, count=len(numbers)
+    )
+    rows = np.flatnonzero(well_formed)
+    if not len(rows):
+        return errors, tiers
+
+    digits = np.frombuffer(
+        "".join([numbers[i] for i in rows.tolist()]).encode("ascii"), dtype=np.uint8
+    ).reshape(-1, CARD_DIGITS) - ord("0")
+    # Luhn: double every second digit from the right (the even positions of a 16-digit number)
+    doubled = digits[:, 0::2] * 2
+    checksum = np.where(doubled > 9, doubled - 9, doubled).sum(axis=1) + digits[:, 1::2].sum(axis=1)
+    ranks = table.lookup(digits.astype(np.int64) @ _POWERS_OF_TEN)
+
+    codes = np.select(
+        [digits[:, 0] != 4, checksum % 10 != 0, ranks < 0],
+        [NOT_VISA, BAD_CHECKSUM, NO_RANGE],
+        OK,
+    ).astype(np.uint8)
+    errors[rows] = codes
+    tiers[rows] = np.where(codes == OK, ranks, -1)
+
+    for i in rows.tolist():
+        test_card = TEST_CARDS.get(numbers[i])
+        if test_card is not None:
+            errors[i] = OK
+            tiers[i] = TIER_ORDER.index(test_card["card_type"])
+    return errors, tiers
+
+
+def lookup_card_type(card_number: str) -> Optional[str]:
+    """Tier of one cleaned 16-digit number from the BIN table, or None if no range covers it"""
+    rank = int(get_bin_table().lookup(np.array([int(card_number)], dtype=np.int64))[0])
+    return TIER_ORDER[rank] if rank >= 0 else None
+
+
+def check_card_number(card_number: str) -> Tuple[Optional[str], Optional[str]]:
+    """(tier, None) for one cleaned card number, or (None, error message), checked as in a batch"""
+    errors, tiers = validate_numbers([card_number])
+    if errors[0] != OK:
+        return None, ERRORS[int(errors[0])]
+    return TIER_ORDER[int(tiers[0])], None
+
+
+_scan = json.scanner.make_scanner(json.JSONDecoder())
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def validate_lines(lines: List[bytes], first_index: int, table: Optional[BinTable] = None) -> Tuple[str, int]:
+    """NDJSON results for NDJSON input lines, and how many cards were valid
+
+    Each input line is {"card_number": "...", "id": <optional, echoed>} or a
+    bare JSON string; results carry the line's index in the whole stream.
+    """
+    items = []
+    # Decode the chunk at once, then run the (C) JSON scanner on each line, skipping json.loads' overhead
+    for line in b"\n".join(lines).decode("utf-8", errors="replace").split("\n"):
+        line = line.strip()
+        try:
+            item, end = _scan(line, 0)
+        except (StopIteration, ValueError):
+            item, end = None, 0
+        items.append(item if end == len(line) else None)
+
+    numbers: List[str] = []
+    ids: List[Optional[str]] = []
+    for item in items:
+        if type(item) is dict:
+            number = item.get("card_number")
+            item_id = item.get("id")
+            ids.append(None if item_id is None else str(item_id) if type(item_id) is int else _encode(item_id))
+        else:
+            number = item
+            ids.append(None)
+        # Whitespace and dashes are allowed as separators, as in CardInput
+        numbers.append("".join(number.split()).replace("-", "") if type(number) is str else "")
+
+    errors, tiers = validate_numbers(numbers, table)
+    out = []
+    for index, (number, item_id, error, tier) in enumerate(
+        zip(numbers, ids, errors.tolist(), tiers.tolist()), first_index
+    ):
+        prefix = f'{{"index":{index},' if item_id is None else f'{{"index":{index},"id":{item_id},'
+        if error == OK:
+            out.append(f'{prefix}"valid":true,"card_type":"{TIER_ORDER[tier]}","last_four":"{number[-4:]}"}}\n')
+        else:
+            out.append(f'{prefix}"valid":false,"error":"{ERRORS[error]}"}}\n')
+    return "".join(out), int(np.count_nonzero(errors == OK))
+
+
+class _LineSplitter:
+    """Splits a byte stream into non-empty lines; an overlong line is cut short and the rest dropped"""
+
+    def __init__(self):
+        self._buffer = b""
+        self._skipping = False
+
+    def feed(self, data: bytes) -> List[bytes]:
+        lines = (self._buffer + data).split(b"\n")
+        self._buffer = lines.pop()
+        if self._skipping and lines:
+            # The tail of the overlong line
+            lines.pop(0)
+            self._skipping = False
+        if len(self._buffer) > MAX_LINE_BYTES:
+            if not self._skipping:
+                lines.append(self._buffer[:MAX_LINE_BYTES])
+            self._buffer = b""
+            self._skipping = True
+        return [line for line in lines if line.strip()]
+
+    def finish(self) -> List[bytes]:
+        rest = [] if self._skipping or not self._buffer.strip() else [self._buffer]
+        self._buffer = b""
+        return rest
+
+
+def _summary(total: int, valid: int) -> str:
+    return json.dumps({"done": True, "total": total, "valid": valid}) + "\n"
+
+
+def validate_ndjson(data: Iterable[bytes], table: Optional[BinTable] = None) -> Iterator[str]:
+    """Validate an NDJSON byte stream (e.g. a file), yielding NDJSON results chunk by chunk, then a summary"""
+    splitter = _LineSplitter()
+    pending: List[bytes] = []
+    total = valid = 0
+    for data_chunk in itertools.chain(data, [None]):
+        pending.extend(splitter.feed(data_chunk) if data_chunk is not None else splitter.finish())
+        while pending and (len(pending) >= config.CARD_BATCH_CHUNK or data_chunk is None):
+            lines, pending = pending[:config.CARD_BATCH_CHUNK], pending[config.CARD_BATCH_CHUNK:]
+            text, chunk_valid = validate_lines(lines, total, table)
+            total += len(lines)
+            valid += chunk_valid
+            yield text
+    yield _summary(total, valid)
+
+
+def _validate_into(spool: BinaryIO, lines: List[bytes], first_index: int, table: Optional[BinTable]) -> int:
+    text, valid = validate_lines(lines, first_index, table)
+    spool.write(text.encode("utf-8"))
+    return valid
+
+
+async def spool_validate_ndjson(data: AsyncIterable[bytes], table: Optional[BinTable] = None) -> BinaryIO:
+    """Validate a request body as it arrives, collecting the NDJSON results in a rewound spool file
+
+    Results are spooled (in memory up to CARD_BATCH_SPOOL_BYTES, then on
+    disk) instead of streamed while the body is still arriving: clients that
+    send the whole body before reading would deadlock against a full-duplex
+    response. Chunks are validated in a worker thread to keep the event loop free.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=config.CARD_BATCH_SPOOL_BYTES)
+    splitter = _LineSplitter()
+    pending: List[bytes] = []
+    total = valid = 0
+    try:
+        async for data_chunk in data:
+            pending.extend(splitter.feed(data_chunk))
+            while len(pending) >= config.CARD_BATCH_CHUNK:
+                lines, pending = pending[:config.CARD_BATCH_CHUNK], pending[config.CARD_BATCH_CHUNK:]
+                valid += await asyncio.to_thread(_validate_into, spool, lines, total, table)
+                total += len(lines)
+        pending.extend(splitter.finish())
+        if pending:
+            valid += await asyncio.to_thread(_validate_into, spool, pending, total, table)
+            total += len(pending)
+        spool.write(_summary(total, valid).encode("utf-8"))
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+def read_spool(spool: BinaryIO, size: int = 1 << 20) -> Iterator[bytes]:
+    """Stream a spool file's contents, closing it at the end"""
+    with spool:
+        yield from iter(lambda: spool.read(size), b"")
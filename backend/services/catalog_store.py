@@ -0,0 +1,775 @@
+"""
+Catalog Store
+Pluggable storage for the benefits and offers catalogs (in-memory or SQLite) with hot reload
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+import numpy as np
+import config
+from models.benefits import Benefit, BenefitCategory, MerchantOffer
+from services.benefits_service import BENEFITS_DATABASE, TIER_ORDER, BenefitsIndex
+from services.geo import EARTH_RADIUS_KM, bounding_box, haversine_km
+from services.metrics import counter, register_collector
+from services.offers_service import CATEGORY_CODES, OFFERS_DATABASE, OffersIndex
+from services.search_service import (
+    BENEFIT,
+    FIELD_WEIGHTS,
+    OFFER,
+    SearchIndex,
+    SearchResult,
+    benefit_fields,
+    benefit_tiers,
+    empty_result,
+    fts_rows,
+    match_expression,
+)
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BENEFIT_COLUMNS = tuple(Benefit.model_fields)
+# distance_km is computed per query, never stored
+OFFER_COLUMNS = tuple(name for name in MerchantOffer.model_fields if name != "distance_km")
+
+# First k-nearest search radius; doubled until enough offers are found
+INITIAL_SEARCH_KM = 2.0
+
+# Offers are bucketed on the same lat/lon grid as GeoIndex; each grid row of a
+# query box becomes one range scan on the cell index
+CELL_DEG = 0.05
+CELL_COLS = int(math.ceil(360.0 / CELL_DEG))
+# Boxes spanning more grid rows than this scan the latitude index instead
+MAX_CELL_RANGES = 32
+
+SQLITE_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE benefits (
+    tier TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    terms_and_conditions TEXT NOT NULL,
+    value TEXT,
+    merchant TEXT,
+    validity TEXT,
+    icon TEXT NOT NULL,
+    PRIMARY KEY (tier, position)
+);
+CREATE TABLE offers (
+    id TEXT NOT NULL,
+    merchant_name TEXT NOT NULL,
+    offer_title TEXT NOT NULL,
+    discount TEXT NOT NULL,
+    description TEXT NOT NULL,
+    location TEXT,
+    latitude REAL,
+    longitude REAL,
+    valid_until TEXT NOT NULL,
+    terms TEXT NOT NULL,
+    category TEXT NOT NULL,
+    logo_url TEXT,
+    cell INTEGER
+);
+CREATE TABLE search_docs (
+    doc INTEGER PRIMARY KEY,
+    kind INTEGER NOT NULL,
+    ref INTEGER NOT NULL,
+    benefit_id TEXT,
+    category TEXT NOT NULL,
+    tier_rank INTEGER NOT NULL,
+    latitude REAL,
+    longitude REAL,
+    valid_until TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE search_fts USING fts5(
+    title, merchant, description, terms, content='', tokenize='unicode61 remove_diacritics 0'
+);
+"""
+
+# Built after the bulk insert, which is much faster than maintaining them row by row.
+# The cell index also covers the columns recommendation scoring reads, so it needs no table lookups.
+SQLITE_INDEXES = """
+CREATE INDEX idx_benefits_tier_category ON benefits (tier, category);
+CREATE UNIQUE INDEX idx_offers_id ON offers (id);
+CREATE INDEX idx_offers_cell ON offers (cell, latitude, longitude, valid_until, category);
+CREATE INDEX idx_offers_category_cell ON offers (category, cell);
+CREATE INDEX idx_offers_lat_lon ON offers (latitude, longitude);
+CREATE INDEX idx_offers_valid_until ON offers (valid_until);
+CREATE INDEX idx_offers_online_valid_until ON offers (valid_until) WHERE latitude IS NULL;
+"""
+
+catalog_reloads = counter("catalog_reloads_total", "Catalog hot reloads by result", ("result",))
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def load_catalog_json(path: str) -> Tuple[Dict[str, List[dict]], List[dict]]:
+    """Benefits (tier -> records) and offers from a {"benefits": ..., "offers": ...} JSON file"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("benefits", {}), data.get("offers", [])
+
+
+def write_json_catalog(path: str, benefits: Dict[str, List[dict]], offers: Iterable[dict]) -> None:
+    """Write a JSON catalog atomically (the watcher never sees a half-written file)"""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"benefits": benefits, "offers": list(offers)}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _benefit_row(tier: str, position: int, benefit: dict) -> tuple:
+    row = {**benefit, "category": BenefitCategory(benefit["category"]).value}
+    row.setdefault("icon", "gift")
+    return (tier, position) + tuple(row.get(name) for name in BENEFIT_COLUMNS)
+
+
+def _grid(lat: float, lon: float) -> Tuple[int, int]:
+    return math.floor((lat + 90.0) / CELL_DEG), math.floor((lon + 180.0) / CELL_DEG)
+
+
+def _offer_row(offer: dict) -> tuple:
+    row = {**offer, "category": BenefitCategory(offer["category"]).value}
+    cell = None
+    if row.get("latitude") is not None and row.get("longitude") is not None:
+        grid_row, grid_col = _grid(row["latitude"], row["longitude"])
+        cell = grid_row * CELL_COLS + grid_col
+    return tuple(row.get(name) for name in OFFER_COLUMNS) + (cell,)
+
+
+def write_sqlite_catalog(path: str, benefits: Dict[str, List[dict]], offers: Iterable[dict]) -> int:
+    """Build an indexed SQLite catalog and atomically move it into place; returns the offer count"""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(SQLITE_SCHEMA)
+        conn.executemany(
+            f"INSERT INTO benefits VALUES ({', '.join('?' * (len(BENEFIT_COLUMNS) + 2))})",
+            (_benefit_row(tier, position, b) for tier, records in benefits.items() for position, b in enumerate(records)),
+        )
+        # Offers are streamed from the iterable, so huge catalogs never sit in memory
+        conn.executemany(
+            f"INSERT INTO offers VALUES ({', '.join('?' * (len(OFFER_COLUMNS) + 1))})",
+            (_offer_row(o) for o in offers),
+        )
+        conn.executescript(SQLITE_INDEXES)
+        _write_search_index(conn, benefits)
+        conn.execute("INSERT INTO meta VALUES ('created_at', ?)", (str(time.time()),))
+        conn.execute("ANALYZE")
+        conn.commit()
+        count = conn.execute("SELECT count(*) FROM offers").fetchone()[0]
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def _write_search_index(conn: sqlite3.Connection, benefits: Dict[str, List[dict]]) -> None:
+    """Fill the FTS table and its document metadata, in the same document order as SearchIndex"""
+    tiers = benefit_tiers(benefits)
+    unique_benefits = {b["id"]: b for tier in TIER_ORDER for b in benefits.get(tier, [])}
+    docs = [
+        (BENEFIT, position, b["id"], BenefitCategory(b["category"]).value, tiers[b["id"]], None, None, "9999-12-31",
+         fts_rows(benefit_fields(b)))
+        for position, b in enumerate(unique_benefits.values())
+    ]
+    offers = conn.execute(
+        "SELECT rowid, offer_title, merchant_name, description, terms, category, latitude, longitude, valid_until "
+        "FROM offers ORDER BY rowid"
+    )
+    doc = 0
+    while docs:
+        conn.executemany(
+            "INSERT INTO search_docs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((doc + i, *d[:-1]) for i, d in enumerate(docs)),
+        )
+        conn.executemany(
+            "INSERT INTO search_fts (rowid, title, merchant, description, terms) VALUES (?, ?, ?, ?, ?)",
+            ((doc + i, *d[-1]) for i, d in enumerate(docs)),
+        )
+        doc += len(docs)
+        docs = [
+            (OFFER, rowid, None, category, 0, lat, lon, valid_until, fts_rows((title, merchant, description, terms)))
+            for rowid, title, merchant, description, terms, category, lat, lon, valid_until in offers.fetchmany(10_000)
+        ]
+
+
+def _haversine_sql(lat1: float, lon1: float, lat2: Optional[float], lon2: Optional[float]) -> Optional[float]:
+    """Scalar haversine registered as a SQLite function"""
+    if lat2 is None or lon2 is None:
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, max(0.0, a))))
+
+
+class SqliteOffers:
+    """Offer queries answered by SQLite: bounding-box index scans ranked by distance with a LIMIT"""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_results: int):
+        self._connect = connect
+        self.max_results = max_results
+        self._columns = ", ".join(OFFER_COLUMNS)
+        # The planner prefers the lat/lon index for IS NULL (its stats can't tell NULLs are common);
+        # catalogs built before the partial index existed don't have it
+        has_online_index = connect().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_offers_online_valid_until'"
+        ).fetchone()
+        self._online_index = " INDEXED BY idx_offers_online_valid_until" if has_online_index else ""
+
+    def _filters(self, category: Optional[str], valid_on: Optional[str]) -> Tuple[str, list]:
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if valid_on:
+            clauses.append("valid_until >= ?")
+            params.append(valid_on)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def _offer(self, row: tuple, distance: Optional[float] = None) -> MerchantOffer:
+        distance_km = round(distance, 2) if distance is not None else None
+        return MerchantOffer(**dict(zip(OFFER_COLUMNS, row)), distance_km=distance_km)
+
+    def _box(self, latitude: float, longitude: float, radius: float) -> Tuple[str, list]:
+        """WHERE clause and parameters selecting located offers in the search box around a point"""
+        box = bounding_box(latitude, longitude, radius)
+        if box is None:
+            return "latitude IS NOT NULL", []
+        min_lat, max_lat, min_lon, max_lon = box
+        where = "latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?"
+        box_params = [min_lat, max_lat, min_lon, max_lon]
+        row_lo, col_lo = _grid(min_lat, min_lon)
+        row_hi, col_hi = _grid(max_lat, max_lon)
+        if row_hi - row_lo < MAX_CELL_RANGES:
+            ranges = " OR ".join(["cell BETWEEN ? AND ?"] * (row_hi - row_lo + 1))
+            # Unary + keeps the planner on the cell index
+            where = f"({ranges}) AND +latitude BETWEEN ? AND ? AND +longitude BETWEEN ? AND ?"
+            cells = []
+            for grid_row in range(row_lo, row_hi + 1):
+                cells += [grid_row * CELL_COLS + col_lo, grid_row * CELL_COLS + col_hi]
+            box_params = cells + box_params
+        return where, box_params
+
+    def _nearby(self, latitude: float, longitude: float, radius: float, k: int, filters: str, params: list) -> list:
+        where, box_params = self._box(latitude, longitude, radius)
+        return self._connect().execute(
+            f"SELECT rowid, haversine_km(?, ?, latitude, longitude) AS distance FROM offers "
+            f"WHERE {where}{filters} AND distance <= ? ORDER BY distance, rowid LIMIT ?",
+            [latitude, longitude, *box_params, *params, radius, k],
+        ).fetchall()
+
+    def rank(
+        self,
+        latitude: float,
+        longitude: float,
+        category: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        limit: Optional[int] = None,
+        valid_on: Optional[str] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Matching rowids closest first (at most max_results); online offers last with NaN distance"""
+        filters, params = self._filters(category, valid_on)
+        k = min(limit, self.max_results) if limit is not None else self.max_results
+        max_radius = max_distance if max_distance is not None else np.pi * EARTH_RADIUS_KM
+
+        # Grow the search box until it holds k offers, like GeoIndex.nearest
+        radius = min(INITIAL_SEARCH_KM, max_radius)
+        while True:
+            ranked = self._nearby(latitude, longitude, radius, k, filters, params)
+            if len(ranked) >= k or radius >= max_radius:
+                break
+            radius = min(radius * 2, max_radius)
+
+        # Offers without coordinates (online) are listed after physical ones
+        if limit is None and len(ranked) < k:
+            ranked += self._connect().execute(
+                f"SELECT rowid, NULL FROM offers WHERE latitude IS NULL{filters} ORDER BY rowid LIMIT ?",
+                [*params, k - len(ranked)],
+            ).fetchall()
+
+        rowids = np.array([rowid for rowid, _ in ranked], dtype=np.int64)
+        distances = np.array([np.nan if d is None else d for _, d in ranked], dtype=np.float64)
+        return rowids, distances
+
+    def _fetch(self, rowids: List[int], columns: str) -> Dict[int, tuple]:
+        rows: Dict[int, tuple] = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(rowids), 500):
+            chunk = rowids[start:start + 500]
+            rows.update(
+                (row[0], row[1:]) for row in self._connect().execute(
+                    f"SELECT rowid, {columns} FROM offers WHERE rowid IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        return rows
+
+    def candidates(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_distance: Optional[float] = None,
+        valid_on: Optional[str] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Up to k nearest matching offers plus up to k online ones, with category codes and valid_until
+
+        Unlike rank(), distances are computed with NumPy over the rows of the
+        search box, which is much cheaper than the SQL function for large k.
+        """
+        filters, params = self._filters(None, valid_on)
+        k = min(k, self.max_results)
+        max_radius = max_distance if max_distance is not None else np.pi * EARTH_RADIUS_KM
+
+        radius = min(INITIAL_SEARCH_KM, max_radius)
+        while True:
+            where, box_params = self._box(latitude, longitude, radius)
+            located = self._connect().execute(
+                f"SELECT rowid, latitude, longitude, category, valid_until FROM offers WHERE {where}{filters}",
+                [*box_params, *params],
+            ).fetchall()
+            distances = haversine_km(
+                latitude, longitude,
+                np.array([row[1] for row in located], dtype=np.float64),
+                np.array([row[2] for row in located], dtype=np.float64),
+            )
+            inside = np.flatnonzero(distances <= radius)
+            if len(inside) >= k or radius >= max_radius:
+                break
+            radius = min(radius * 2, max_radius)
+
+        nearest = inside[np.argsort(distances[inside], kind="stable")[:k]]
+        # Online offers soonest to expire first, like OffersIndex.candidates
+        online = self._connect().execute(
+            f"SELECT rowid, NULL, NULL, category, valid_until FROM offers{self._online_index} "
+            f"WHERE latitude IS NULL{filters} ORDER BY valid_until LIMIT ?",
+            [*params, k],
+        ).fetchall()
+        rows = [located[i] for i in nearest.tolist()] + online
+        return (
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.concatenate((distances[nearest], np.full(len(online), np.nan))),
+            np.array([CATEGORY_CODES[row[3]] for row in rows], dtype=np.uint8),
+            np.array([row[4] for row in rows], dtype="datetime64[D]"),
+        )
+
+    def materialize(self, rowids: np.ndarray, distances: np.ndarray) -> List[MerchantOffer]:
+        """Fetch and build models for ranked rowids, keeping their order (NaN distance = none)"""
+        rowids = rowids.tolist()
+        rows = self._fetch(rowids, self._columns)
+        return [
+            self._offer(rows[rowid], None if distance != distance else distance)
+            for rowid, distance in zip(rowids, distances.tolist())
+        ]
+
+    def query(
+        self,
+        latitude: float,
+        longitude: float,
+        category: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        limit: Optional[int] = None,
+        valid_on: Optional[str] = None,
+    ) -> List[MerchantOffer]:
+        """Offers ordered by distance from a point, closest first (at most max_results)"""
+        return self.materialize(*self.rank(latitude, longitude, category, max_distance, limit, valid_on))
+
+    def by_category(self, category: str) -> List[MerchantOffer]:
+        """Offers in a category, in catalog order (at most max_results)"""
+        rows = self._connect().execute(
+            f"SELECT {self._columns} FROM offers WHERE category = ? ORDER BY rowid LIMIT ?",
+            (category, self.max_results),
+        ).fetchall()
+        return [self._offer(row) for row in rows]
+
+
+class SqliteSearch:
+    """Full-text search over the catalog's FTS5 table; ranks like SearchIndex over the same data"""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_results: int):
+        self._connect = connect
+        self.max_results = max_results
+        conn = connect()
+        self.available = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_fts'").fetchone() is not None
+        if not self.available:
+            logger.warning("Catalog has no search index (built before search existed); rebuild it with jobs.build_catalog")
+        self.benefit_ids: List[str] = [
+            benefit_id for (benefit_id,) in conn.execute(
+                "SELECT benefit_id FROM search_docs WHERE kind = ? ORDER BY ref", (BENEFIT,)
+            )
+        ] if self.available else []
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT count(*) FROM search_docs").fetchone()[0] if self.available else 0
+
+    def benefit_id(self, ref: int) -> str:
+        return self.benefit_ids[ref]
+
+    def search(
+        self,
+        terms: List[str],
+        kind: Optional[int] = None,
+        category: Optional[str] = None,
+        max_tier_rank: Optional[int] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        max_distance: Optional[float] = None,
+        valid_on: Optional[str] = None,
+    ) -> SearchResult:
+        """Best max_results documents, after filters; every term must match unless no document has them all"""
+        if not self.available or not terms:
+            return empty_result()
+        every = self._connect().execute(
+            "SELECT 1 FROM search_fts WHERE search_fts MATCH ? LIMIT 1", (match_expression(terms),)
+        ).fetchone() is not None
+        clauses, params = ["search_fts MATCH ?"], [match_expression(terms, every)]
+        if kind is not None:
+            clauses.append("d.kind = ?")
+            params.append(kind)
+        if category:
+            clauses.append("d.category = ?")
+            params.append(category)
+        if max_tier_rank is not None:
+            clauses.append("d.tier_rank <= ?")
+            params.append(max_tier_rank)
+        if valid_on:
+            clauses.append("d.valid_until >= ?")
+            params.append(valid_on)
+        located = latitude is not None and longitude is not None
+        if located and max_distance is not None:
+            box = bounding_box(latitude, longitude, max_distance)
+            clauses.append("d.latitude IS NOT NULL")
+            if box is not None:
+                clauses.append("d.latitude BETWEEN ? AND ? AND d.longitude BETWEEN ? AND ?")
+                params.extend(box)
+
+        weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS)
+        rows = self._connect().execute(
+            f"SELECT d.kind, d.ref, -bm25(search_fts, {weights}) AS score, d.latitude, d.longitude "
+            f"FROM search_fts JOIN search_docs d ON d.doc = search_fts.rowid "
+            f"WHERE {' AND '.join(clauses)} ORDER BY score DESC, d.doc LIMIT ?",
+            (*params, self.max_results),
+        ).fetchall()
+        kinds = np.array([r[0] for r in rows], dtype=np.uint8)
+        refs = np.array([r[1] for r in rows], dtype=np.int64)
+        scores = np.array([r[2] for r in rows], dtype=np.float64)
+        lats = np.array([np.nan if r[3] is None else r[3] for r in rows], dtype=np.float64)
+        lons = np.array([np.nan if r[4] is None else r[4] for r in rows], dtype=np.float64)
+        distances = np.full(len(rows), np.nan)
+        if located:
+            distances = haversine_km(latitude, longitude, lats, lons)
+            if max_distance is not None:
+                # The box is a superset of the circle
+                keep = distances <= max_distance
+                kinds, refs, scores, distances = kinds[keep], refs[keep], scores[keep], distances[keep]
+        return SearchResult(kinds, refs, scores, distances)
+
+
+class CatalogStore(ABC):
+    """One immutable snapshot of the catalogs; hot reload swaps whole stores"""
+
+    backend = ""
+    # Whether queries wait on disk, so request handlers run them in a worker thread
+    blocking = False
+
+    def __init__(self, source: str, fingerprint: Optional[tuple] = None):
+        self.source = source
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        # Identifies the data for HTTP caching; identical across workers reading the same file
+        self.version = _digest([self.backend, source, fingerprint])
+        self.benefits: BenefitsIndex
+        self.offers = None
+        self.search = None
+        self._lock = threading.Lock()
+        self._readers = 0
+        self._retired = False
+
+    @abstractmethod
+    def iter_terms(self) -> Iterator[str]:
+        """Every T&C string in the catalog (may repeat)"""
+
+    @abstractmethod
+    def offer_count(self) -> int:
+        """Offers in the catalog"""
+
+    def close(self) -> None:
+        pass
+
+    @contextmanager
+    def reading(self) -> Iterator["CatalogStore"]:
+        """Keep the snapshot open while a query runs, even if a reload replaces it meanwhile"""
+        with self._lock:
+            self._readers += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._readers -= 1
+                idle = self._retired and self._readers == 0
+            if idle:
+                self.close()
+
+    def retire(self) -> None:
+        """Close once the queries still reading the snapshot finish (a reload replaced it)"""
+        with self._lock:
+            self._retired = True
+            idle = self._readers == 0
+        if idle:
+            self.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "source": self.source,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "offers": self.offer_count(),
+        }
+
+
+class MemoryCatalogStore(CatalogStore):
+    """Whole catalog validated into memory; fastest, for small and medium catalogs"""
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        benefits: Dict[str, List[dict]],
+        offers: List[dict],
+        source: str,
+        fingerprint=None,
+        previous: Optional[CatalogStore] = None,
+    ):
+        super().__init__(source, fingerprint)
+        if fingerprint is None:
+            # Built-in data has no file to fingerprint; hash the records instead
+            self.version = _digest([benefits, offers])
+        self._benefit_records = benefits
+        self.benefits = BenefitsIndex(benefits)
+        self.offers = OffersIndex(offers, config.CATALOG_MAX_QUERY_OFFERS)
+        # Documents unchanged since the previous snapshot reuse its tokenization
+        previous_search = previous.search if isinstance(previous, MemoryCatalogStore) else None
+        self.search = SearchIndex(benefits, offers, config.CATALOG_MAX_QUERY_OFFERS, previous_search)
+
+    def iter_terms(self) -> Iterator[str]:
+        for records in self._benefit_records.values():
+            for b in records:
+                yield b["terms_and_conditions"]
+        yield from self.offers.unique("terms")
+
+    def offer_count(self) -> int:
+        return len(self.offers)
+
+
+class SqliteCatalogStore(CatalogStore):
+    """Benefits in memory (they are few); offers stay on disk and are queried through indexes"""
+
+    backend = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, max_results: int, fingerprint=None):
+        super().__init__(path, fingerprint)
+        # One read-only connection per thread, so queries in worker threads run side by side
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        try:
+            benefits: Dict[str, List[dict]] = {}
+            rows = self._connect().execute(
+                f"SELECT tier, {', '.join(BENEFIT_COLUMNS)} FROM benefits ORDER BY tier, position"
+            )
+            for tier, *values in rows:
+                benefits.setdefault(tier, []).append(dict(zip(BENEFIT_COLUMNS, values)))
+            self.benefits = BenefitsIndex(benefits)
+            self.offers = SqliteOffers(self._connect, max_results)
+            self.search = SqliteSearch(self._connect, max_results)
+            self._offer_count = self._connect().execute("SELECT count(*) FROM offers").fetchone()[0]
+        except Exception:
+            self.close()
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Not checked against the thread only so close() can close every thread's connection
+            conn = sqlite3.connect(f"file:{self.source}?mode=ro", uri=True, check_same_thread=False)
+            conn.create_function("haversine_km", 4, _haversine_sql, deterministic=True)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def iter_terms(self) -> Iterator[str]:
+        for (terms,) in self._connect().execute("SELECT terms_and_conditions FROM benefits"):
+            yield terms
+        for (terms,) in self._connect().execute("SELECT terms FROM offers"):
+            yield terms
+
+    def offer_count(self) -> int:
+        return self._offer_count
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+
+def _file_fingerprint(path: str) -> Optional[tuple]:
+    """Identifies a file version; changes when the file is rewritten or replaced"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def open_catalog_store(backend: str, path: str, previous: Optional[CatalogStore] = None) -> CatalogStore:
+    """Load a catalog snapshot; blocking, so hot reloads run it in a worker thread
+
+    previous (the snapshot being replaced) lets the memory backend rebuild
+    its search index incrementally.
+    """
+    fingerprint = _file_fingerprint(path) if path else None
+    if backend == "sqlite":
+        if not path:
+            raise ValueError("CATALOG_BACKEND=sqlite needs CATALOG_PATH to point at a SQLite catalog")
+        return SqliteCatalogStore(path, config.CATALOG_MAX_QUERY_OFFERS, fingerprint)
+    if backend != "memory":
+        raise ValueError(f"Unknown CATALOG_BACKEND {backend!r} (expected 'memory' or 'sqlite')")
+    if path:
+        benefits, offers = load_catalog_json(path)
+        return MemoryCatalogStore(benefits, offers, path, fingerprint, previous)
+    return MemoryCatalogStore(BENEFITS_DATABASE, OFFERS_DATABASE, "built-in")
+
+
+_store: Optional[CatalogStore] = None
+# The snapshot a run_catalog_query call reads, so a reload mid-query doesn't switch it
+_pinned: ContextVar[Optional[CatalogStore]] = ContextVar("catalog_store", default=None)
+_watcher_task: Optional[asyncio.Task] = None
+# Fingerprint of a file version that failed to load, so it isn't retried until it changes again
+_rejected: Optional[tuple] = None
+
+
+def _swap(store: CatalogStore) -> None:
+    global _store
+    # A single reference assignment: requests see either the old or the new catalog, never a mix
+    old, _store = _store, store
+    if old is not None and old is not store:
+        old.retire()
+
+
+def load_catalog() -> CatalogStore:
+    """(Re)load the configured catalog synchronously (startup, scripts)"""
+    _swap(open_catalog_store(config.CATALOG_BACKEND, config.CATALOG_PATH))
+    return _store
+
+
+def get_catalog_store() -> CatalogStore:
+    """Current catalog snapshot (or the one the running query pinned), loaded on first use"""
+    pinned = _pinned.get()
+    if pinned is not None:
+        return pinned
+    if _store is None:
+        return load_catalog()
+    return _store
+
+
+async def run_catalog_query(fn: Callable[[], T]) -> T:
+    """Run fn() against one catalog snapshot, in a worker thread when the store reads from disk"""
+    store = get_catalog_store()
+    if not store.blocking:
+        return fn()
+    with store.reading():
+        token = _pinned.set(store)
+        try:
+            # to_thread copies the context, pin included
+            return await asyncio.to_thread(fn)
+        finally:
+            _pinned.reset(token)
+
+
+async def reload_catalog_if_changed() -> bool:
+    """Reload in a worker thread if the catalog file changed; requests keep the old snapshot meanwhile"""
+    if not config.CATALOG_PATH:
+        return False
+    global _rejected
+    fingerprint = _file_fingerprint(config.CATALOG_PATH)
+    current = get_catalog_store()
+    if fingerprint is None or fingerprint in (current.fingerprint, _rejected):
+        return False
+
+    try:
+        store = await asyncio.to_thread(open_catalog_store, config.CATALOG_BACKEND, config.CATALOG_PATH, current)
+    except Exception:
+        _rejected = fingerprint
+        raise
+    _swap(store)
+    catalog_reloads.inc("ok")
+    logger.info("Reloaded %s catalog from %s (%d offers)", store.backend, store.source, store.offer_count())
+    return True
+
+
+async def _watch_catalog() -> None:
+    while True:
+        await asyncio.sleep(config.CATALOG_WATCH_INTERVAL)
+        try:
+            await reload_catalog_if_changed()
+        except Exception:
+            # An invalid file keeps the previous catalog until the file changes again
+            catalog_reloads.inc("error")
+            logger.exception("Catalog reload failed; keeping the previous catalog")
+
+
+async def start_catalog_watcher() -> None:
+    """Poll the catalog file for changes (called on application startup)"""
+    global _watcher_task
+    if _watcher_task is None and config.CATALOG_PATH and config.CATALOG_WATCH_INTERVAL > 0:
+        _watcher_task = asyncio.create_task(_watch_catalog())
+
+
+async def stop_catalog_watcher() -> None:
+    """Stop the catalog file watcher (called on application shutdown)"""
+    global _watcher_task
+    if _watcher_task is not None:
+        _watcher_task.cancel()
+        try:
+            await _watcher_task
+        except asyncio.CancelledError:
+            pass
+        _watcher_task = None
+
+
+def _collect_catalog_gauges():
+    if _store is None:
+        return
+    labels = {"backend": _store.backend}
+    yield "catalog_offers", "Offers in the loaded catalog", labels, _store.offer_count()
+    yield "catalog_loaded_timestamp_seconds", "When the loaded catalog was read", labels, _store.loaded_at
+
+
+register_collector(_collect_catalog_gauges)
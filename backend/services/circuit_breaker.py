@@ -0,0 +1,170 @@
+"""
+Circuit Breaker
+Closed / open / half-open breaker with exponential backoff for the Ollama backend
+"""
+import time
+from enum import Enum
+from typing import Optional
+from services.shared_state import SharedState
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"        # calls flow normally
+    OPEN = "open"            # calls short-circuit to the fallback
+    HALF_OPEN = "half_open"  # one trial call decides whether to close again
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; each failed trial doubles the open period
+
+    With a shared store, state is published to and adopted from the other
+    worker processes, and only one of them runs the half-open trial.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        shared: Optional[SharedState] = None,
+        name: str = "breaker",
+        sync_interval: float = 0.5,
+    ):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.shared = shared if shared is not None and shared.enabled else None
+        self.name = name
+        self.sync_interval = sync_interval
+        self._pulled_at = float("-inf")
+        self._synced_at = 0.0  # write time of the shared state last adopted or published
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.backoff = base_backoff
+        self.open_until = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the backend right now"""
+        self._pull()
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN and time.monotonic() >= self.open_until:
+            self.state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == CircuitState.HALF_OPEN:
+            now = time.monotonic()
+            # A trial that never reported back (e.g. cancelled) doesn't block forever
+            if not self._trial_in_flight or now - self._trial_started > self.max_backoff:
+                # Across workers, the lease holder runs the trial
+                if self.shared is None or self.shared.claim(f"{self.name}:trial", self.max_backoff):
+                    self._trial_in_flight = True
+                    self._trial_started = now
+                    return True
+
+        self.short_circuited += 1
+        return False
+
+    def available(self) -> bool:
+        """Whether allow_request would likely pass, without claiming a half-open trial"""
+        self._pull()
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() >= self.open_until
+        return not self._trial_in_flight
+
+    def record_success(self) -> None:
+        self._pull()
+        changed = self.state != CircuitState.CLOSED or self.consecutive_failures
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.backoff = self.base_backoff
+        self._end_trial()
+        if changed:
+            self._push()
+
+    def record_failure(self) -> None:
+        self._pull()
+        self.consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN:
+            # The trial failed: stay open for twice as long
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            self._open()
+        elif self.state == CircuitState.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open()
+        self._end_trial()
+        self._push()
+
+    def trip(self) -> None:
+        """Open immediately, e.g. when a health probe finds the backend down"""
+        self._pull()
+        if self.state != CircuitState.OPEN:
+            self._open()
+            self._push()
+
+    def probe_succeeded(self) -> None:
+        """Let the next call through as a trial once the backend answers health checks again"""
+        self._pull()
+        if self.state == CircuitState.OPEN:
+            self.open_until = 0.0
+            self._push()
+
+    def _end_trial(self) -> None:
+        if self._trial_in_flight and self.shared is not None:
+            self.shared.release(f"{self.name}:trial")
+        self._trial_in_flight = False
+
+    def _pull(self) -> None:
+        """Adopt state another worker published since we last looked (at most every sync_interval)"""
+        if self.shared is None:
+            return
+        now = time.monotonic()
+        if now - self._pulled_at < self.sync_interval:
+            return
+        self._pulled_at = now
+
+        stored = self.shared.get(self.name)
+        if stored is None or stored[1] <= self._synced_at:
+            return
+        data, self._synced_at = stored
+        self.state = CircuitState(data["state"])
+        self.consecutive_failures = data["consecutive_failures"]
+        self.backoff = data["backoff"]
+        # Shared as wall-clock time; monotonic clocks aren't comparable across processes
+        self.open_until = now + max(0.0, data["open_until"] - time.time())
+
+    def _push(self) -> None:
+        if self.shared is None:
+            return
+        self._synced_at = self.shared.put(self.name, {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "backoff": self.backoff,
+            "open_until": time.time() + max(0.0, self.open_until - time.monotonic()),
+        })
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self.open_until = time.monotonic() + self.backoff
+        self._trial_in_flight = False
+        self.times_opened += 1
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "backoff_seconds": self.backoff,
+            "retry_in_seconds": round(max(0.0, self.open_until - time.monotonic()), 2)
+            if self.state == CircuitState.OPEN else 0.0,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+            "shared": self.shared is not None,
+        }
@@ -0,0 +1,168 @@
+"""
+Geo Utilities
+Vectorized haversine distances and a grid-bucket spatial index for merchant locations
+"""
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = np.pi * EARTH_RADIUS_KM / 180.0  # on the sphere haversine_km measures
+
+# Named places the offers API understands when no coordinates are given
+KNOWN_LOCATIONS: Dict[str, Tuple[float, float]] = {
+    "iit chennai": (12.9916, 80.2336),
+    "iit chennai campus": (12.9916, 80.2336),
+    "iit madras": (12.9916, 80.2336),
+    "velachery": (12.9791, 80.2209),
+    "adyar": (13.0012, 80.2565),
+    "t. nagar": (13.0418, 80.2341),
+    "anna nagar": (13.0850, 80.2101),
+    "omr": (12.9602, 80.2461),
+}
+
+DEFAULT_LOCATION = KNOWN_LOCATIONS["iit chennai"]
+
+# Which of the given point indices a query keeps (e.g. a category filter), evaluated on candidates only
+PointFilter = Callable[[np.ndarray], np.ndarray]
+
+
+def resolve_location(name: Optional[str]) -> Tuple[float, float]:
+    """Coordinates for a named location, defaulting to IIT Chennai"""
+    if name:
+        key = name.strip().lower().replace(", chennai", "")
+        if key in KNOWN_LOCATIONS:
+            return KNOWN_LOCATIONS[key]
+    return DEFAULT_LOCATION
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Optional[Tuple[float, float, float, float]]:
+    """(min_lat, max_lat, min_lon, max_lon) around a point, or None if it touches a pole or the antimeridian
+
+    The box holds every point within radius_km by haversine_km: the circle is
+    widest in longitude poleward of the centre, by asin(sin(r) / cos(lat)).
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    # A hair of slack so points exactly on the circle survive rounding
+    dlat = np.degrees(angle) + 1e-9
+    if lat - dlat <= -90.0 or lat + dlat >= 90.0:
+        return None
+    spread = np.sin(angle) / np.cos(np.radians(lat))
+    if angle >= np.pi / 2 or spread >= 1.0:
+        return None
+    dlon = float(np.degrees(np.arcsin(spread))) + 1e-9
+    if lon - dlon <= -180.0 or lon + dlon >= 180.0:
+        return None
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def concat_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """np.concatenate of arange(start, end) for each pair, without a Python loop"""
+    lengths = ends - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum())
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoIndex:
+    """Points bucketed into fixed lat/lon grid cells (geohash-style) for radius and k-NN queries"""
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, cell_deg: float = 0.05):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_deg = cell_deg
+        self._cols = int(np.ceil(360.0 / cell_deg))
+
+        rows, cols = self._cell(self.lats, self.lons)
+        keys = rows * self._cols + cols
+
+        # Points sorted by cell so each occupied cell is a contiguous slice
+        self._order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[self._order]
+        self._cell_keys, self._cell_starts = np.unique(sorted_keys, return_index=True)
+        self._cell_ends = np.append(self._cell_starts[1:], len(sorted_keys))
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _cell(self, lats, lons):
+        rows = np.floor((np.asarray(lats) + 90.0) / self.cell_deg).astype(np.int64)
+        cols = np.floor((np.asarray(lons) + 180.0) / self.cell_deg).astype(np.int64)
+        return rows, cols
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indices of points in the cells overlapping the query's bounding box"""
+        box = bounding_box(lat, lon, radius_km)
+        # Boxes touching a pole or the antimeridian fall back to every point
+        if box is None:
+            return np.arange(len(self.lats))
+
+        min_lat, max_lat, min_lon, max_lon = box
+        row_lo, col_lo = self._cell(min_lat, min_lon)
+        row_hi, col_hi = self._cell(max_lat, max_lon)
+        # Cell keys are sorted row-major, so each grid row's cells in the box are one run of keys:
+        # two binary searches per row instead of a scan over every occupied cell
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64) * self._cols
+        first = np.searchsorted(self._cell_keys, rows + col_lo, side="left")
+        last = np.searchsorted(self._cell_keys, rows + col_hi, side="right")
+        cells = concat_ranges(first, last)
+        if len(cells) == 0:
+            return np.empty(0, dtype=np.int64)
+        return self._order[concat_ranges(self._cell_starts[cells], self._cell_ends[cells])]
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        keep: Optional[PointFilter] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances of points within radius_km that pass keep, closest first (at most limit)"""
+        candidates = self._candidates(lat, lon, radius_km)
+        if keep is not None:
+            candidates = candidates[keep(candidates)]
+
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        keep = distances <= radius_km
+        candidates, distances = candidates[keep], distances[keep]
+
+        if limit is not None and limit < len(distances):
+            # Only the closest limit points need sorting; ties at the cut go to the lowest indices
+            cut = np.partition(distances, limit - 1)[limit - 1]
+            closer = np.flatnonzero(distances < cut)
+            tied = np.flatnonzero(distances == cut)
+            tied = tied[np.argsort(candidates[tied], kind="stable")][:limit - len(closer)]
+            nearest = np.concatenate((closer, tied))
+            candidates, distances = candidates[nearest], distances[nearest]
+        # Equally distant points in index order
+        order = np.lexsort((candidates, distances))
+        return candidates[order], distances[order]
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        max_radius_km: Optional[float] = None,
+        keep: Optional[PointFilter] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances of the k closest points, searching outward ring by ring"""
+        limit = max_radius_km if max_radius_km is not None else np.pi * EARTH_RADIUS_KM
+        radius = min(self.cell_deg * KM_PER_DEGREE_LAT, limit)
+
+        while True:
+            indices, distances = self.within(lat, lon, radius, keep, k)
+            # Anything outside the radius is farther than everything inside it
+            if len(indices) >= k or radius >= limit:
+                return indices, distances
+            radius = min(radius * 2, limit)
@@ -0,0 +1,203 @@
+"""
+HTTP Response Cache
+Catalog-versioned ETags, Cache-Control and pre-encoded (gzip/brotli) response bodies
+"""
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from fastapi import Request, Response
+import config
+from services.metrics import counter, register_collector
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it (e.g. a bare dev install) clients get gzip
+    brotli = None
+
+
+# Bump when the JSON shape of cached responses changes, so old ETags stop matching
+FORMAT_VERSION = 1
+
+# Small bodies aren't worth compressing
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 6
+
+http_cache_requests = counter(
+    "http_cache_requests_total", "Cacheable responses by route and result", ("route", "result")
+)
+
+
+def json_bytes(data: Any) -> bytes:
+    """Compact UTF-8 JSON, as FastAPI's JSONResponse renders it"""
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(version: str, route: str, params: Hashable) -> str:
+    """Weak ETag derived from the data version and request, so 304s need no body at all"""
+    digest = hashlib.sha256(repr((FORMAT_VERSION, route, params)).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison: W/ prefixes are ignored on both sides
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """Best of br, gzip and identity the client accepts"""
+    if not accept_encoding:
+        return "identity"
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding in ("br", "gzip") if brotli is not None else ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+class CachedBody:
+    """One response body and its compressed variants, encoded on first demand"""
+
+    __slots__ = ("version", "identity", "encoded")
+
+    def __init__(self, version: str, identity: bytes):
+        self.version = version
+        self.identity = identity
+        self.encoded: Dict[str, bytes] = {}
+
+    def body(self, encoding: str) -> bytes:
+        if encoding == "identity" or len(self.identity) < MIN_COMPRESS_BYTES:
+            return self.identity
+        body = self.encoded.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.identity, quality=BROTLI_QUALITY)
+            else:
+                body = gzip.compress(self.identity, compresslevel=GZIP_LEVEL, mtime=0)
+            self.encoded[encoding] = body
+        return body
+
+    @property
+    def size(self) -> int:
+        return len(self.identity) + sum(len(body) for body in self.encoded.values())
+
+
+class ResponseCache:
+    """LRU of encoded bodies per (route, params), bounded by total bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, CachedBody]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: tuple, version: str) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, entry: CachedBody) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def grew(self, key: tuple, entry: CachedBody, before: int) -> None:
+        """Account for a compressed variant added after put()"""
+        if self._entries.get(key) is entry:
+            self._bytes += entry.size - before
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+response_cache = ResponseCache(config.HTTP_CACHE_MAX_BYTES)
+
+
+async def cached_response(
+    request: Request,
+    route: str,
+    params: Hashable,
+    version: str,
+    build: Callable[[], bytes],
+    max_age: int,
+    run: Optional[Callable[[Callable[[], bytes]], Awaitable[bytes]]] = None,
+) -> Response:
+    """Serve a JSON body from the cache, answering 304 when the client's ETag is current
+
+    build() runs only on a miss or after the version changes, through run
+    if given (e.g. run_catalog_query, off the event loop); exceptions it
+    raises (e.g. HTTPException) propagate and nothing is cached.
+    """
+    etag = make_etag(version, route, params)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        http_cache_requests.inc(route, "not_modified")
+        return Response(status_code=304, headers=headers)
+
+    key = (route, params)
+    entry = response_cache.get(key, version) if config.HTTP_CACHE_ENABLED else None
+    if entry is None:
+        http_cache_requests.inc(route, "miss")
+        entry = CachedBody(version, await run(build) if run is not None else build())
+        if config.HTTP_CACHE_ENABLED:
+            response_cache.put(key, entry)
+    else:
+        http_cache_requests.inc(route, "hit")
+
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    before = entry.size
+    body = entry.body(encoding)
+    if config.HTTP_CACHE_ENABLED and entry.size != before:
+        response_cache.grew(key, entry, before)
+    if body is not entry.identity:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _collect_http_cache_gauges():
+    stats = response_cache.stats()
+    yield "http_cache_entries", "Cached response bodies", {}, stats["entries"]
+    yield "http_cache_bytes", "Bytes held by cached response bodies (all encodings)", {}, stats["bytes"]
+
+
+register_collector(_collect_http_cache_gauges)
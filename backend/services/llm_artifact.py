@@ -0,0 +1,50 @@
+"""
+Pre-generated LLM Artifact
+Versioned JSON file of completions, keyed like the completion cache
+"""
+import json
+import os
+import time
+from typing import Dict, Optional
+import config
+
+
+ARTIFACT_VERSION = 1
+
+
+def read_artifact(path: str) -> Optional[dict]:
+    """Load an artifact, or None if it is missing, unreadable or from another format version"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if artifact.get("version") != ARTIFACT_VERSION:
+        return None
+    return artifact
+
+
+def write_artifact(path: str, entries: Dict[str, str], catalog_hash: str) -> None:
+    """Atomically write an artifact for the configured model"""
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "model": config.OLLAMA_MODEL,
+        "catalog_hash": catalog_hash,
+        "created_at": time.time(),
+        "entries": entries,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_artifact_into_cache(path: str) -> int:
+    """Seed the completion cache from an artifact built with the current model"""
+    from services.llm_cache import llm_cache
+
+    artifact = read_artifact(path)
+    if artifact is None or artifact.get("model") != config.OLLAMA_MODEL:
+        return 0
+    return llm_cache.preload(artifact.get("entries", {}))
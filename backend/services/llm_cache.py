@@ -0,0 +1,289 @@
+"""
+LLM Response Cache
+Two-tier cache (in-process LRU + SQLite on disk) for Ollama completions
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+import config
+
+
+def make_cache_key(model: str, system_prompt: Optional[str], prompt: str, options: dict) -> str:
+    """Content-addressed key for a completion request"""
+    payload = json.dumps(
+        {
+            "model": model,
+            "system": system_prompt or "",
+            "prompt": prompt,
+            "options": options,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """LRU memory tier in front of a persistent SQLite tier, with TTL and size limits
+
+    get/set may block on disk; on the event loop use lookup/store, which
+    answer memory hits inline and run the disk tier in a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 1024,
+        max_disk_entries: int = 50000,
+        ttl_seconds: int = 7 * 24 * 3600,
+        enabled: bool = True,
+        sweep_interval: float = 300.0,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.sweep_interval = sweep_interval
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        # The memory tier's lock is only held for dict updates, so the event loop never waits on disk I/O
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._model: Optional[str] = None
+        # Rows on disk as of the last sweep plus rows written since (other workers' writes show up on the next sweep)
+        self._disk_rows: Optional[int] = None
+        self._swept_at = 0.0
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the disk tier on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions(accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _check_model(self, conn: sqlite3.Connection) -> None:
+        """Drop every entry when the configured Ollama model changes"""
+        model = config.OLLAMA_MODEL
+        if self._model == model:
+            return
+
+        row = conn.execute("SELECT value FROM meta WHERE name = 'model'").fetchone()
+        if row is None or row[0] != model:
+            conn.execute("DELETE FROM completions")
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('model', ?)", (model,))
+            self._disk_rows = 0
+        with self._lock:
+            self._memory.clear()
+            self._model = model
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entry"""
+        with self._lock:
+            self._memory[key] = (value, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        """Memory-tier hit, or None (also when the model changed and the disk tier must be checked first)"""
+        with self._lock:
+            if self._model != config.OLLAMA_MODEL:
+                return None
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if now - created_at > self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.memory_hits += 1
+            return value
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[str]:
+        """Look up a completion, checking memory first and then disk
+
+        The disk tier is shared by every worker process, so a miss in memory
+        can still be answered by a completion another worker stored.
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        return self._get_disk(key, now, count_miss)
+
+    async def lookup(self, key: str, count_miss: bool = True) -> Optional[str]:
+        """get() for the event loop: memory hits inline, the disk tier in a worker thread"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self._get_disk, key, now, count_miss)
+
+    def _get_disk(self, key: str, now: float, count_miss: bool) -> Optional[str]:
+        with self._disk_lock:
+            conn = self._connect()
+            self._check_model(conn)
+            row = conn.execute(
+                "SELECT value, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, created_at = row
+                if now - created_at <= self.ttl_seconds:
+                    conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._remember(key, value, created_at)
+                    with self._lock:
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return value
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+
+        if count_miss:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a completion in both tiers"""
+        if not self.enabled or not value:
+            return
+
+        now = time.time()
+        self._set_disk(key, value, now)
+        self._remember(key, value, now)
+
+    async def store(self, key: str, value: str) -> None:
+        """set() for the event loop: the disk write runs in a worker thread"""
+        if not self.enabled or not value:
+            return
+
+        now = time.time()
+        await asyncio.to_thread(self._set_disk, key, value, now)
+        self._remember(key, value, now)
+
+    def _set_disk(self, key: str, value: str, now: float) -> None:
+        with self._disk_lock:
+            conn = self._connect()
+            self._check_model(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, model, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, self._model, now, now),
+            )
+            self._wrote(conn, 1, now)
+
+    def _wrote(self, conn: sqlite3.Connection, rows: int, now: float) -> None:
+        """Count written rows, sweeping the disk tier when it may be full or a sweep is due"""
+        if self._disk_rows is not None:
+            self._disk_rows += rows
+        due = now - self._swept_at >= self.sweep_interval
+        if self._disk_rows is None or self._disk_rows > self.max_disk_entries or due:
+            self._evict_disk(conn, now)
+
+    def _evict_disk(self, conn: sqlite3.Connection, now: float) -> None:
+        """Expire stale rows and trim the disk tier below its size limit
+
+        Trimming to 90% of the limit leaves room for a run of writes before
+        the next sweep has to count the table again.
+        """
+        conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        if count > self.max_disk_entries:
+            overflow = count - self.max_disk_entries * 9 // 10
+            conn.execute(
+                "DELETE FROM completions WHERE key IN "
+                "(SELECT key FROM completions ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            with self._lock:
+                self.evictions += overflow
+            count -= overflow
+        self._disk_rows = count
+        self._swept_at = now
+
+    def preload(self, entries: Dict[str, str]) -> int:
+        """Bulk-insert completions into the disk tier; returns how many were stored"""
+        if not self.enabled or not entries:
+            return 0
+
+        now = time.time()
+        rows = [(key, value, config.OLLAMA_MODEL, now, now) for key, value in entries.items() if value]
+        with self._disk_lock:
+            conn = self._connect()
+            self._check_model(conn)
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO completions (key, value, model, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+            self._wrote(conn, len(rows), now)
+        return len(rows)
+
+    def clear(self) -> None:
+        """Remove every cached completion"""
+        with self._disk_lock:
+            with self._lock:
+                self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM completions")
+                self._disk_rows = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "model": self._model or config.OLLAMA_MODEL,
+        }
+
+
+llm_cache = LLMCache(
+    path=config.LLM_CACHE_PATH,
+    max_entries=config.LLM_CACHE_MAX_ENTRIES,
+    max_disk_entries=config.LLM_CACHE_MAX_DISK_ENTRIES,
+    ttl_seconds=config.LLM_CACHE_TTL_SECONDS,
+    enabled=config.LLM_CACHE_ENABLED,
+)
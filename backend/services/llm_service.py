@@ -2,54 +2,512 @@
 LLM Service for GenAI features
 Uses Ollama to run Llama 3.2 locally
 """
+import asyncio
 import httpx
-from typing import Optional
+import json
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional, Tuple
 import config
+from services.admission import AdmissionController, Priority
+from services.circuit_breaker import CircuitState
+from services.llm_cache import llm_cache, make_cache_key
+from models.benefits import RankedRecommendation
+from services.metrics import (
+    ConnectTimer,
+    llm_chunked_requests,
+    llm_fallbacks,
+    llm_queue_seconds,
+    llm_requests,
+    llm_total_seconds,
+    llm_ttft_seconds,
+    record_ollama_stats,
+    register_collector,
+)
+from services.model_warmup import keep_alive_value
+from services.ollama_pool import BLOCKING, STREAM, OllamaBackend, OllamaPool
+from services.prompt_budget import BUDGETS, count_tokens, pack, split_text
+from services.recommendation_service import rank_recommendations
+from services.semantic_cache import SemanticCache, normalize_user_context
+from services.shared_state import shared_state
+from services.singleflight import SharedFlight, SingleFlight, StreamFlight
 
 
-async def generate_completion(prompt: str, system_prompt: Optional[str] = None) -> str:
+logger = logging.getLogger(__name__)
+
+# Process-wide Ollama client, opened and closed by the FastAPI lifespan
+_client: Optional[httpx.AsyncClient] = None
+
+
+def create_client() -> httpx.AsyncClient:
+    """Build a pooled keep-alive client from the Ollama connection settings"""
+    http2 = config.OLLAMA_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("OLLAMA_HTTP2 is set but the 'h2' package is missing; using HTTP/1.1")
+            http2 = False
+    
+    return httpx.AsyncClient(
+        timeout=60.0,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=config.OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=config.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.OLLAMA_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def start_client() -> None:
+    """Open the shared Ollama client (called on application startup)"""
+    global _client
+    if _client is None:
+        _client = create_client()
+
+
+async def close_client() -> None:
+    """Close the shared Ollama client (called on application shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+@asynccontextmanager
+async def ollama_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Yield the shared client, or a short-lived one outside the app lifespan (scripts, jobs)"""
+    if _client is not None:
+        yield _client
+    else:
+        async with create_client() as client:
+            yield client
+
+
+# Ollama replicas: each call goes to the best one; failing replicas are ejected by their breakers,
+# and each replica's model is preloaded and kept warm while there is traffic
+ollama_pool = OllamaPool(ollama_client)
+
+
+# Bounds how many generations Ollama is asked to run at once (this worker's share)
+llm_admission = AdmissionController(
+    max_concurrency=config.LLM_WORKER_CONCURRENCY,
+    max_queue=config.LLM_MAX_QUEUE,
+    queue_timeout=config.LLM_QUEUE_TIMEOUT,
+)
+
+# Identical prompts generated concurrently share one Ollama call, within and across workers
+completion_flights = SingleFlight()
+stream_flights = StreamFlight()
+shared_flights = SharedFlight(shared_state, config.SHARED_FLIGHT_WAIT, config.SHARED_FLIGHT_POLL_INTERVAL)
+
+
+def _collect_llm_gauges():
+    """Expose cache, coalescing and admission state at scrape time"""
+    cache = llm_cache.stats()
+    yield "llm_cache_hits", "Completion cache hits by tier", {"tier": "memory"}, cache["memory_hits"]
+    yield "llm_cache_hits", "Completion cache hits by tier", {"tier": "disk"}, cache["disk_hits"]
+    yield "llm_cache_misses", "Completion cache misses", {}, cache["misses"]
+    yield "llm_coalesced_requests", "Completions that joined an identical in-flight call", {
+        "mode": "blocking"
+    }, completion_flights.coalesced
+    yield "llm_coalesced_requests", "Completions that joined an identical in-flight call", {
+        "mode": "stream"
+    }, stream_flights.coalesced
+    admission = llm_admission.stats()
+    yield "llm_queue_depth", "Completions waiting for an admission slot", {}, admission["queue_depth"]
+    yield "llm_active_requests", "Completions currently running against Ollama", {}, admission["active"]
+    yield "llm_circuit_open", "1 while every Ollama replica is ejected", {}, int(not ollama_pool.accepting())
+    backends = ollama_pool.backends
+    for backend in backends:
+        yield "llm_backend_ejected", "1 while the replica's circuit breaker is open or half-open", {
+            "backend": backend.url
+        }, int(backend.breaker.state != CircuitState.CLOSED)
+    for backend in backends:
+        yield "llm_backend_outstanding", "Calls in flight on the replica", {"backend": backend.url}, backend.outstanding
+    for backend in backends:
+        yield "llm_model_loaded", "1 while the replica reports the model loaded", {
+            "backend": backend.url
+        }, int(bool(backend.warmer.loaded))
+    for backend in backends:
+        if backend.warmer.load_seconds is not None:
+            yield "llm_model_load_seconds", "Duration of the replica's last cold model load", {
+                "backend": backend.url
+            }, backend.warmer.load_seconds
+
+
+register_collector(_collect_llm_gauges)
+
+# Near-duplicate recommendation requests answered from earlier LLM results. Summaries are exact-match
+# only: T&Cs differing in one amount or day count look nearly identical but need different summaries
+recommend_semantic_cache = SemanticCache(
+    "recommend", config.LLM_SEMANTIC_RECOMMEND_THRESHOLD, config.LLM_SEMANTIC_MAX_ENTRIES, shared=shared_state
+)
+
+# (cache, exact-match partition, text compared by similarity)
+SemanticKey = Tuple[SemanticCache, str, str]
+
+# Sampling options sent with every chat request (part of the cache key)
+DEFAULT_OPTIONS = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+}
+
+
+def request_options(route: str) -> dict:
+    """Sampling options plus the route's token budget (num_ctx, num_predict)"""
+    return {**DEFAULT_OPTIONS, **BUDGETS[route].options()}
+
+
+async def generate_completion(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    priority: Priority = Priority.INTERACTIVE
+) -> str:
     """Generate completion using Ollama Llama model"""
     
+    result, _ = await complete(prompt, system_prompt, priority)
+    return result
+
+
+async def complete(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    priority: Priority = Priority.INTERACTIVE,
+    semantic: Optional[SemanticKey] = None,
+    fallback: Optional[str] = None,
+    options: Optional[dict] = None,
+    hedge: bool = False
+) -> Tuple[str, str]:
+    """Like generate_completion, but also returns the source ("cache", "llm" or "fallback")
+    
+    fallback replaces the generic fallback_summarize text when Ollama can't answer;
+    options (default DEFAULT_OPTIONS) are sent to Ollama and are part of the cache key;
+    hedge lets a late call start again on a second replica.
+    """
+    
+    # Serve repeated prompts from the cache
+    ollama_pool.note_activity()
+    options = options or DEFAULT_OPTIONS
+    cache_key = make_cache_key(config.OLLAMA_MODEL, system_prompt, prompt, options)
+    cached = await llm_cache.lookup(cache_key)
+    if cached is not None:
+        llm_requests.inc("cache_hit")
+        return cached, "cache"
+    
+    similar = _semantic_lookup(semantic)
+    if similar is not None:
+        llm_requests.inc("semantic_hit")
+        return similar, "cache"
+    
+    async def complete_and_cache() -> Optional[str]:
+        queued_at = time.perf_counter()
+        async with llm_admission.slot(priority) as admitted:
+            llm_queue_seconds.observe(time.perf_counter() - queued_at)
+            if not admitted:
+                # Shed under load: queue full or waited past the deadline
+                llm_fallbacks.inc("shed")
+                return None
+            result = await request_completion(prompt, system_prompt, options, hedge)
+        if result is not None:
+            await llm_cache.store(cache_key, result)
+        return result
+    
+    async def complete_across_workers() -> Optional[str]:
+        # Another worker may be generating the same prompt; its result lands in the shared disk cache,
+        # so without the cache there is nothing to wait for
+        if not llm_cache.enabled:
+            return await complete_and_cache()
+        return await shared_flights.do(
+            cache_key, complete_and_cache, lambda: llm_cache.lookup(cache_key, count_miss=False)
+        )
+    
+    result = await completion_flights.do(cache_key, complete_across_workers)
+    if result is None:
+        # Fallback results are never cached
+        llm_requests.inc("fallback")
+        return fallback if fallback is not None else await fallback_summarize(prompt), "fallback"
+    
+    llm_requests.inc("llm")
+    _semantic_store(semantic, result)
+    return result, "llm"
+
+
+def _semantic_lookup(semantic: Optional[SemanticKey]) -> Optional[str]:
+    if semantic is None or not config.LLM_SEMANTIC_CACHE_ENABLED:
+        return None
+    cache, partition, text = semantic
+    return cache.lookup(partition, text)
+
+
+def _semantic_store(semantic: Optional[SemanticKey], result: str) -> None:
+    if semantic is not None and config.LLM_SEMANTIC_CACHE_ENABLED and result:
+        cache, partition, text = semantic
+        cache.store(partition, text, result)
+
+
+# How long Ollama keeps the model loaded after each request
+KEEP_ALIVE = keep_alive_value(config.OLLAMA_KEEP_ALIVE)
+
+
+def build_chat_payload(
+    prompt: str,
+    system_prompt: Optional[str],
+    stream: bool,
+    options: Optional[dict] = None,
+    model: Optional[str] = None
+) -> dict:
+    """Request body for Ollama's /api/chat"""
+    
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": prompt})
     
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{config.OLLAMA_BASE_URL}/api/chat",
-                json={
-                    "model": config.OLLAMA_MODEL,
-                    "messages": messages,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                    }
-                }
-            )
+    return {
+        "model": model or config.OLLAMA_MODEL,
+        "messages": messages,
+        "stream": stream,
+        "options": options or DEFAULT_OPTIONS,
+        "keep_alive": KEEP_ALIVE,
+    }
+
+
+async def request_completion(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    options: Optional[dict] = None,
+    hedge: bool = False
+) -> Optional[str]:
+    """Call Ollama's chat API on the best replica, returning None when the LLM is unavailable"""
+    
+    async def attempt(backend: OllamaBackend) -> Tuple[Optional[str], Optional[str]]:
+        started = time.perf_counter()
+        try:
+            async with ollama_client() as client:
+                response = await client.post(
+                    f"{backend.url}/api/chat",
+                    json=build_chat_payload(prompt, system_prompt, False, options, backend.model),
+                    extensions={"trace": ConnectTimer()}
+                )
             
             if response.status_code == 200:
                 data = response.json()
-                return data.get("message", {}).get("content", "")
-            else:
-                # Fallback for any non-200 response (404, 500, etc.)
-                return await fallback_summarize(prompt)
-                
+                backend.breaker.record_success()
+                llm_total_seconds.observe(time.perf_counter() - started, "blocking")
+                record_ollama_stats(data)
+                backend.warmer.note_response(data)
+                return data.get("message", {}).get("content", ""), None
+            # Fallback for any non-200 response (404, 500, etc.)
+            cause = "http_status"
+        
+        except httpx.TimeoutException:
+            cause = "timeout"
+        except httpx.ConnectError:
+            # Fallback when Ollama is not running
+            cause = "connect_error"
+        except Exception:
+            cause = "error"
+        
+        backend.breaker.record_failure()
+        return None, cause
+    
+    result, cause = await ollama_pool.call(attempt, BLOCKING, hedge=hedge)
+    if result is None:
+        llm_fallbacks.inc(cause or "error")
+    return result
+
+
+class _OpenStream(NamedTuple):
+    """A streaming chat that has produced its first token"""
+    backend: OllamaBackend
+    response: httpx.Response
+    lines: AsyncIterator[str]
+    head: List[dict]  # objects read while waiting for the first token
+    exit_stack: AsyncExitStack
+
+
+async def _open_stream(
+    backend: OllamaBackend,
+    prompt: str,
+    system_prompt: Optional[str],
+    options: dict
+) -> Tuple[Optional[_OpenStream], Optional[str]]:
+    """Start a streaming chat on one replica and read up to its first token"""
+    
+    exit_stack = AsyncExitStack()
+    try:
+        client = await exit_stack.enter_async_context(ollama_client())
+        response = await exit_stack.enter_async_context(client.stream(
+            "POST",
+            f"{backend.url}/api/chat",
+            json=build_chat_payload(prompt, system_prompt, True, options, backend.model),
+            extensions={"trace": ConnectTimer()}
+        ))
+        cause = "http_status"
+        if response.status_code == 200:
+            # Ollama sends one JSON object per line
+            lines = response.aiter_lines()
+            head: List[dict] = []
+            cause = "error"
+            async for line in lines:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                head.append(data)
+                if data.get("message", {}).get("content") or data.get("done"):
+                    return _OpenStream(backend, response, lines, head, exit_stack), None
     except httpx.TimeoutException:
-        return await fallback_summarize(prompt)
+        cause = "timeout"
     except httpx.ConnectError:
-        # Fallback when Ollama is not running
-        return await fallback_summarize(prompt)
-    except Exception as e:
-        return await fallback_summarize(prompt)
+        cause = "connect_error"
+    except Exception:
+        cause = "error"
+    except BaseException:
+        # Cancelled, e.g. a hedge that lost: just release the connection
+        await exit_stack.aclose()
+        raise
+    
+    await exit_stack.aclose()
+    backend.breaker.record_failure()
+    return None, cause
+
+
+async def _close_stream(stream: _OpenStream) -> None:
+    await stream.exit_stack.aclose()
+
+
+async def _stream_objects(stream: _OpenStream) -> AsyncIterator[dict]:
+    """Every object of an opened stream, starting with those read while opening it"""
+    for data in stream.head:
+        yield data
+    async for line in stream.lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+async def stream_completion(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    priority: Priority = Priority.INTERACTIVE,
+    semantic: Optional[SemanticKey] = None,
+    fallback: Optional[str] = None,
+    options: Optional[dict] = None,
+    hedge: bool = False
+) -> AsyncIterator[dict]:
+    """Stream a completion as {"delta": text} events followed by {"done": True, "source": ...}
+    
+    With hedge, a replica slow to send its first token is raced against a second one.
+    """
+    
+    ollama_pool.note_activity()
+    options = options or DEFAULT_OPTIONS
+    cache_key = make_cache_key(config.OLLAMA_MODEL, system_prompt, prompt, options)
+    cached = await llm_cache.lookup(cache_key)
+    if cached is None:
+        cached = _semantic_lookup(semantic)
+        if cached is not None:
+            llm_requests.inc("semantic_hit")
+    else:
+        llm_requests.inc("cache_hit")
+    if cached is not None:
+        yield {"delta": cached}
+        yield {"done": True, "source": "cache"}
+        return
+    
+    # Identical prompts streamed concurrently share one generation
+    generate = lambda: _generate_stream(
+        cache_key, prompt, system_prompt, priority, semantic, fallback, options, hedge
+    )
+    async for event in stream_flights.stream(cache_key, generate):
+        yield event
+
+
+async def _generate_stream(
+    cache_key: str,
+    prompt: str,
+    system_prompt: Optional[str],
+    priority: Priority,
+    semantic: Optional[SemanticKey],
+    fallback: Optional[str],
+    options: dict,
+    hedge: bool
+) -> AsyncIterator[dict]:
+    """stream_completion's events on a cache miss: generate on a replica, then cache the text"""
+    
+    parts: List[str] = []
+    completed = False
+    cause = None
+    queued_at = time.perf_counter()
+    async with llm_admission.slot(priority) as admitted:
+        started = time.perf_counter()
+        llm_queue_seconds.observe(started - queued_at)
+        if not admitted:
+            cause = "shed"
+        else:
+            stream, cause = await ollama_pool.call(
+                lambda backend: _open_stream(backend, prompt, system_prompt, options),
+                STREAM,
+                hedge=hedge,
+                discard=_close_stream,
+            )
+            if stream is not None:
+                backend = stream.backend
+                try:
+                    with backend.busy():
+                        async for data in _stream_objects(stream):
+                            piece = data.get("message", {}).get("content", "")
+                            if piece:
+                                if not parts:
+                                    llm_ttft_seconds.observe(time.perf_counter() - started)
+                                parts.append(piece)
+                                yield {"delta": piece}
+                            if data.get("done"):
+                                backend.breaker.record_success()
+                                llm_total_seconds.observe(time.perf_counter() - started, "stream")
+                                record_ollama_stats(data)
+                                backend.warmer.note_response(data)
+                                completed = True
+                                break
+                except httpx.TimeoutException:
+                    cause = "timeout"
+                except httpx.ConnectError:
+                    cause = "connect_error"
+                except Exception:
+                    cause = "error"
+                finally:
+                    await stream.exit_stack.aclose()
+                if not completed:
+                    # The replica dropped the stream
+                    backend.breaker.record_failure()
+    
+    if completed:
+        llm_requests.inc("llm")
+        await llm_cache.store(cache_key, "".join(parts))
+        _semantic_store(semantic, "".join(parts))
+        yield {"done": True, "source": "llm"}
+    elif parts:
+        # Ollama dropped mid-generation; keep what was already sent
+        llm_requests.inc("truncated")
+        yield {"done": True, "source": "llm", "truncated": True}
+    else:
+        # Nothing was produced, so send the fallback as a single chunk
+        llm_fallbacks.inc(cause or "error")
+        llm_requests.inc("fallback")
+        yield {"delta": fallback if fallback is not None else await fallback_summarize(prompt)}
+        yield {"done": True, "source": "fallback"}
 
 
-async def summarize_terms(terms_and_conditions: str, language: str = "en") -> str:
-    """Summarize complex T&C in plain language"""
+def _language_instruction(language: str) -> str:
+    return "in simple English" if language == "en" else "in simple Tamil (தமிழ்)"
+
+
+def build_summarize_prompt(terms_and_conditions: str, language: str = "en") -> Tuple[str, str]:
+    """Prompt and system prompt for T&C summarization"""
     
-    lang_instruction = "in simple English" if language == "en" else "in simple Tamil (தமிழ்)"
+    lang_instruction = _language_instruction(language)
     
     system_prompt = f"""You are a helpful assistant that summarizes complex legal terms and conditions 
 into simple, easy-to-understand language {lang_instruction}. 
@@ -65,12 +523,28 @@ Provide a brief, friendly summary that highlights:
 - Key conditions
 - Important limitations"""
 
-    result = await generate_completion(prompt, system_prompt)
-    return result
+    return prompt, system_prompt
 
 
-async def translate_to_tamil(text: str) -> str:
-    """Translate English text to Tamil"""
+def build_merge_prompt(summaries: List[str], language: str = "en") -> Tuple[str, str]:
+    """Prompt and system prompt merging summaries of consecutive parts of one long T&C"""
+    
+    _, system_prompt = build_summarize_prompt("", language)
+    parts = "\n\n".join(f"Part {i}:\n{summary.strip()}" for i, summary in enumerate(summaries, 1))
+    prompt = f"""These are summaries of consecutive parts of one terms and conditions document:
+
+{parts}
+
+Combine them into one brief, friendly summary {_language_instruction(language)} that highlights:
+- Main benefit
+- Key conditions
+- Important limitations"""
+
+    return prompt, system_prompt
+
+
+def build_translate_prompt(text: str) -> Tuple[str, str]:
+    """Prompt and system prompt for English to Tamil translation"""
     
     system_prompt = """You are a professional translator specializing in English to Tamil translation.
 Translate naturally, maintaining the original meaning while making it sound natural in Tamil.
@@ -78,46 +552,318 @@ Use Tamil script (தமிழ்) for the output."""
 
     prompt = f"Translate this to Tamil:\n\n{text}"
     
-    result = await generate_completion(prompt, system_prompt)
-    return result
+    return prompt, system_prompt
 
 
-async def generate_recommendations(
+def build_recommendations_prompt(
     card_type: str,
-    user_context: dict
-) -> str:
-    """Generate personalized recommendations based on user context"""
+    user_context: dict,
+    ranked: List[RankedRecommendation]
+) -> Tuple[str, str]:
+    """Prompt and system prompt asking the LLM to phrase already-ranked recommendations"""
     
     location = user_context.get("location", "IIT Chennai")
     lifestyle = user_context.get("lifestyle", "student")
     interests = user_context.get("interests", ["technology", "food", "entertainment"])
     
-    system_prompt = """You are a helpful Visa card benefits advisor. 
-Provide personalized recommendations based on the user's card type and context.
-Be specific, actionable, and highlight the value proposition.
-Format as 3-4 short recommendations with emojis."""
-
-    prompt = f"""Based on this user profile, recommend the best card benefits to use:
+    system_prompt = """You are a helpful Visa card benefits advisor.
+Turn each ranked pick into one short, actionable recommendation, in the given order.
+Use only the facts given and do not add other benefits.
+Start each recommendation with an emoji."""
 
-Card Type: Visa {card_type.title()}
+    picks = "\n".join(f"{i}. {_describe_pick(item)}" for i, item in enumerate(ranked, 1))
+    prompt = f"""Card Type: Visa {card_type.title()}
 Location: {location}
 Lifestyle: {lifestyle}
 Interests: {', '.join(interests)}
 
-Provide personalized recommendations for how they can maximize their card benefits."""
+Ranked picks:
+{picks}"""
+
+    return prompt, system_prompt
+
+
+def _describe_pick(item: RankedRecommendation) -> str:
+    """One compact line of facts about a ranked benefit or offer"""
+    facts = [item.category.value]
+    if item.value:
+        facts.append(item.value)
+    if item.merchant:
+        facts.append(item.merchant)
+    line = f"{item.title} ({', '.join(facts)})"
+    return f"{line}: {'; '.join(item.reasons)}" if item.reasons else line
+
+
+async def summarize_terms(terms_and_conditions: str, language: str = "en") -> Tuple[str, str]:
+    """Summarize complex T&C in plain language, returning (summary, source) like complete"""
+    
+    if _needs_chunking("summarize", terms_and_conditions):
+        return await map_reduce_summary(terms_and_conditions, language)
+    prompt, system_prompt = build_summarize_prompt(terms_and_conditions, language)
+    return await complete(prompt, system_prompt, options=request_options("summarize"), hedge=True)
+
+
+async def translate_to_tamil(text: str) -> Tuple[str, str]:
+    """Translate English text to Tamil, returning (translation, source) like complete"""
+    
+    if _needs_chunking("translate", text):
+        return await chunked_translation(text)
+    prompt, system_prompt = build_translate_prompt(text)
+    return await complete(prompt, system_prompt, options=request_options("translate"))
+
+
+def _needs_chunking(route: str, text: str) -> bool:
+    return count_tokens(text) > BUDGETS[route].chunk_tokens
+
+
+def _whole_text_key(kind: str, text: str, route: str) -> str:
+    """Cache key for the combined result of a chunked request (its parts are cached per prompt)"""
+    return make_cache_key(config.OLLAMA_MODEL, f"chunked {kind}", text, request_options(route))
+
+
+async def _complete_all(prompts: List[Tuple[str, str]], route: str) -> Optional[List[str]]:
+    """Complete prompts in parallel (admission control still applies); None if any fell back"""
+    results = await asyncio.gather(*(complete(*prompt, options=request_options(route)) for prompt in prompts))
+    if any(source == "fallback" for _, source in results):
+        return None
+    return [result for result, _ in results]
+
+
+async def _final_merge_prompt(text: str, language: str) -> Optional[Tuple[str, str]]:
+    """Map-reduce down to the last merge prompt: summarize chunks, then merge summaries group by group
+
+    Returns None if any step fell back. The number of rounds grows with the
+    log of the input size, and inputs are capped at LLM_MAX_INPUT_CHARS.
+    """
+    budget = BUDGETS["summarize"]
+    chunks = split_text(text, budget.chunk_tokens)
+    summaries = await _complete_all([build_summarize_prompt(chunk, language) for chunk in chunks], "summarize")
+    while summaries is not None:
+        groups = pack(summaries, budget.chunk_tokens)
+        if len(groups) == 1:
+            return build_merge_prompt(summaries, language)
+        if len(groups) == len(summaries):
+            # Summaries too long to group by budget; merge pairs so the rounds still converge
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        summaries = await _complete_all([build_merge_prompt(group, language) for group in groups], "summarize")
+    return None
+
+
+async def map_reduce_summary(terms_and_conditions: str, language: str = "en") -> Tuple[str, str]:
+    """Summary of a T&C too long for one prompt, and its source ("cache", "llm" or "fallback")"""
+    
+    key = _whole_text_key(f"summary [{language}]", terms_and_conditions, "summarize")
+    cached = await llm_cache.lookup(key)
+    if cached is not None:
+        llm_requests.inc("cache_hit")
+        return cached, "cache"
+    
+    llm_chunked_requests.inc("summarize")
+    final = await _final_merge_prompt(terms_and_conditions, language)
+    if final is not None:
+        result, source = await complete(*final, options=request_options("summarize"), hedge=True)
+        if source != "fallback":
+            await llm_cache.store(key, result)
+            return result, source
+    return await fallback_summarize(terms_and_conditions), "fallback"
+
+
+async def _stream_map_reduce_summary(terms_and_conditions: str, language: str) -> AsyncIterator[dict]:
+    """Streaming map_reduce_summary: the chunk summaries run first, then the final merge streams"""
+    
+    key = _whole_text_key(f"summary [{language}]", terms_and_conditions, "summarize")
+    cached = await llm_cache.lookup(key)
+    if cached is not None:
+        llm_requests.inc("cache_hit")
+        yield {"delta": cached}
+        yield {"done": True, "source": "cache"}
+        return
+    
+    llm_chunked_requests.inc("summarize")
+    final = await _final_merge_prompt(terms_and_conditions, language)
+    if final is None:
+        yield {"delta": await fallback_summarize(terms_and_conditions)}
+        yield {"done": True, "source": "fallback"}
+        return
+    
+    parts: List[str] = []
+    async for event in stream_completion(*final, options=request_options("summarize"), hedge=True):
+        if "delta" in event:
+            parts.append(event["delta"])
+        elif event.get("source") in ("llm", "cache") and not event.get("truncated"):
+            await llm_cache.store(key, "".join(parts))
+        yield event
+
+
+def _translation_prompts(text: str) -> List[Tuple[str, str]]:
+    return [build_translate_prompt(chunk) for chunk in split_text(text, BUDGETS["translate"].chunk_tokens)]
+
+
+async def chunked_translation(text: str) -> Tuple[str, str]:
+    """Translation of a text too long for one prompt, chunk by chunk in parallel, and its source"""
+    
+    key = _whole_text_key("translation [ta]", text, "translate")
+    cached = await llm_cache.lookup(key)
+    if cached is not None:
+        llm_requests.inc("cache_hit")
+        return cached, "cache"
+    
+    llm_chunked_requests.inc("translate")
+    parts = await _complete_all(_translation_prompts(text), "translate")
+    if parts is None:
+        return await fallback_summarize(text), "fallback"
+    result = "\n".join(part.strip() for part in parts)
+    await llm_cache.store(key, result)
+    return result, "llm"
+
+
+async def _stream_chunked_translation(text: str) -> AsyncIterator[dict]:
+    """Streaming chunked_translation: chunks translate in parallel and are sent in order as they finish"""
+    
+    key = _whole_text_key("translation [ta]", text, "translate")
+    cached = await llm_cache.lookup(key)
+    if cached is not None:
+        llm_requests.inc("cache_hit")
+        yield {"delta": cached}
+        yield {"done": True, "source": "cache"}
+        return
+    
+    llm_chunked_requests.inc("translate")
+    options = request_options("translate")
+    tasks = [asyncio.ensure_future(complete(*prompt, options=options)) for prompt in _translation_prompts(text)]
+    parts: List[str] = []
+    sources = set()
+    try:
+        for task in tasks:
+            result, source = await task
+            if source == "fallback":
+                break
+            yield {"delta": ("\n" if parts else "") + result.strip()}
+            parts.append(result.strip())
+            sources.add(source)
+        else:
+            await llm_cache.store(key, "\n".join(parts))
+            # Every chunk answered from the cache: the whole translation was
+            yield {"done": True, "source": "cache" if sources == {"cache"} else "llm"}
+            return
+    finally:
+        # Stop outstanding chunks on a fallback or if the client disconnects
+        for task in tasks:
+            task.cancel()
+    
+    if parts:
+        # Like a stream Ollama dropped mid-generation: keep what was already sent
+        yield {"done": True, "source": "llm", "truncated": True}
+    else:
+        yield {"delta": await fallback_summarize(text)}
+        yield {"done": True, "source": "fallback"}
+
+
+async def generate_recommendations(
+    card_type: str,
+    user_context: dict
+) -> Tuple[str, str]:
+    """Generate personalized recommendations based on user context, returning (text, source) like complete"""
+    
+    return await complete(*await _recommendation_request(card_type, user_context))
 
-    result = await generate_completion(prompt, system_prompt)
-    return result
+
+async def _recommendation_request(card_type: str, user_context: dict) -> tuple:
+    """Arguments for complete/stream_completion: the ranking engine picks, the LLM only phrases"""
+    # Imported here: the catalog store loads in the startup warm-up, not at import
+    from services.catalog_store import run_catalog_query
+    
+    ranked = (await run_catalog_query(lambda: rank_recommendations(card_type, user_context))).recommendations
+    user_context = normalize_user_context(user_context)
+    prompt, system_prompt = build_recommendations_prompt(card_type, user_context, ranked)
+    
+    # Tier, lifestyle and the picks must match exactly; location and interests are compared by similarity
+    partition = f"{card_type.lower()}|{user_context['lifestyle']}|{','.join(item.id for item in ranked)}"
+    text = f"{user_context['location']} | {' '.join(user_context['interests'])}"
+    semantic = (recommend_semantic_cache, partition, text)
+    fallback = fallback_recommendations(card_type, ranked)
+    return prompt, system_prompt, Priority.BACKGROUND, semantic, fallback, request_options("recommend")
+
+
+def summary_cache_key(terms_and_conditions: str, language: str = "en") -> str:
+    """Completion cache key under which summarize_terms stores this summary"""
+    
+    if _needs_chunking("summarize", terms_and_conditions):
+        return _whole_text_key(f"summary [{language}]", terms_and_conditions, "summarize")
+    prompt, system_prompt = build_summarize_prompt(terms_and_conditions, language)
+    return make_cache_key(config.OLLAMA_MODEL, system_prompt, prompt, request_options("summarize"))
+
+
+def translation_cache_key(text: str) -> str:
+    """Completion cache key under which translate_to_tamil stores this translation"""
+    
+    if _needs_chunking("translate", text):
+        return _whole_text_key("translation [ta]", text, "translate")
+    prompt, system_prompt = build_translate_prompt(text)
+    return make_cache_key(config.OLLAMA_MODEL, system_prompt, prompt, request_options("translate"))
+
+
+async def cached_summary(terms_and_conditions: str, language: str = "en") -> Optional[str]:
+    """Summary already in the completion cache, without calling Ollama"""
+    return await llm_cache.lookup(summary_cache_key(terms_and_conditions, language))
+
+
+async def summarize_batch(
+    texts: Iterable[str],
+    language: str = "en",
+    concurrency: int = 4
+) -> AsyncIterator[Tuple[str, str, str]]:
+    """Summarize unique texts, yielding (text, summary, source) as each one finishes"""
+    
+    pending: List[str] = []
+    for text in dict.fromkeys(texts):
+        cached = await cached_summary(text, language)
+        if cached is not None:
+            yield text, cached, "cache"
+        else:
+            pending.append(text)
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def summarize_one(text: str) -> Tuple[str, str, str]:
+        async with semaphore:
+            return (text, *await summarize_terms(text, language))
+    
+    tasks = [asyncio.ensure_future(summarize_one(text)) for text in pending]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding work if the client disconnects mid-batch
+        for task in tasks:
+            task.cancel()
+
+
+def stream_summarize_terms(terms_and_conditions: str, language: str = "en") -> AsyncIterator[dict]:
+    """Streaming variant of summarize_terms"""
+    if _needs_chunking("summarize", terms_and_conditions):
+        return _stream_map_reduce_summary(terms_and_conditions, language)
+    prompt, system_prompt = build_summarize_prompt(terms_and_conditions, language)
+    return stream_completion(prompt, system_prompt, options=request_options("summarize"), hedge=True)
+
+
+def stream_translate_to_tamil(text: str) -> AsyncIterator[dict]:
+    """Streaming variant of translate_to_tamil"""
+    if _needs_chunking("translate", text):
+        return _stream_chunked_translation(text)
+    return stream_completion(*build_translate_prompt(text), options=request_options("translate"))
+
+
+async def stream_recommendations(card_type: str, user_context: dict) -> AsyncIterator[dict]:
+    """Streaming variant of generate_recommendations"""
+    async for event in stream_completion(*await _recommendation_request(card_type, user_context)):
+        yield event
 
 
 async def fallback_summarize(original_text: str) -> str:
-    """Fallback summarization/recommendations when LLM is unavailable"""
+    """Fallback summarization when LLM is unavailable"""
     lower_text = original_text.lower()
     
-    # Check if this is a recommendation request
-    if "card type:" in lower_text and "lifestyle:" in lower_text:
-        return await fallback_recommendations(original_text)
-    
     # T&C Summarization fallback
     key_points = []
     
@@ -140,85 +886,102 @@ async def fallback_summarize(original_text: str) -> str:
     return "**Quick Summary:**\n" + "\n".join(key_points)
 
 
-async def fallback_recommendations(prompt: str) -> str:
-    """Generate smart fallback recommendations based on user context"""
-    lower_text = prompt.lower()
-    recommendations = []
-    
-    # Parse lifestyle
-    lifestyle = "professional"
-    if "student" in lower_text:
-        lifestyle = "student"
-    elif "business" in lower_text:
-        lifestyle = "business"
-    elif "freelancer" in lower_text:
-        lifestyle = "freelancer"
-    elif "retired" in lower_text:
-        lifestyle = "retired"
-    elif "professional" in lower_text:
-        lifestyle = "professional"
-    
-    # Parse card type
-    card_tier = "classic"
-    if "signature" in lower_text:
-        card_tier = "signature"
-    elif "platinum" in lower_text:
-        card_tier = "platinum"
-    elif "gold" in lower_text:
-        card_tier = "gold"
-    
-    # Generate lifestyle-specific recommendations
-    if lifestyle == "student":
-        recommendations.append("🎓 Use your student dining discounts at campus food outlets")
-        recommendations.append("📚 Access complimentary academic resources and courses")
-        recommendations.append("🎬 Get BOGO movie tickets on weekdays with BookMyShow")
-    elif lifestyle == "professional":
-        recommendations.append("💼 Maximize airport lounge access during business travel")
-        recommendations.append("🍽️ Enjoy 20% off at 1000+ partner restaurants")
-        recommendations.append("🛡️ Use extended warranty on electronics purchases")
-    elif lifestyle == "business":
-        recommendations.append("✈️ Leverage priority lounge access for client meetings")
-        recommendations.append("💰 Get 5% cashback on international transactions")
-        recommendations.append("🏢 Use concierge services for event planning")
-    elif lifestyle == "freelancer":
-        recommendations.append("💻 Save on coworking space memberships")
-        recommendations.append("☕ Use dining discounts for client meetings")
-        recommendations.append("🛡️ Benefit from purchase protection on equipment")
-    elif lifestyle == "retired":
-        recommendations.append("✈️ Enjoy complimentary airport lounge access")
-        recommendations.append("🏥 Use travel insurance for peace of mind")
-        recommendations.append("🍽️ Get dining discounts at premium restaurants")
-    
-    # Add card-tier specific bonus
-    if card_tier == "signature":
-        recommendations.append("⭐ As a Signature cardholder, you have access to exclusive Michelin-star dining!")
-    elif card_tier == "platinum":
-        recommendations.append("⭐ Your Platinum card includes unlimited international lounge access!")
-    elif card_tier == "gold":
-        recommendations.append("⭐ Don't forget your 2 complimentary lounge visits per quarter!")
-    
-    return "\n".join(recommendations)
+# Leading emoji for each category in fallback recommendations
+CATEGORY_EMOJI = {
+    "travel": "✈️",
+    "dining": "🍽️",
+    "shopping": "🛍️",
+    "entertainment": "🎬",
+    "insurance": "🛡️",
+    "lifestyle": "🌟",
+    "cashback": "💰",
+}
+
+# Tier-specific reminder appended to fallback recommendations
+TIER_NOTES = {
+    "signature": "⭐ As a Signature cardholder, you have access to exclusive Michelin-star dining!",
+    "platinum": "⭐ Your Platinum card includes unlimited international lounge access!",
+    "gold": "⭐ Don't forget your 2 complimentary lounge visits per quarter!",
+}
+
+
+def fallback_recommendations(card_type: str, ranked: List[RankedRecommendation]) -> str:
+    """Recommendations written from the ranked picks without the LLM"""
+    lines = []
+    for item in ranked:
+        line = f"{CATEGORY_EMOJI.get(item.category.value, '💳')} {item.title}"
+        if item.value:
+            line += f" ({item.value})"
+        if item.reasons:
+            line += f" - {', '.join(item.reasons)}"
+        lines.append(line)
+    
+    note = TIER_NOTES.get(card_type.lower())
+    if note:
+        lines.append(note)
+    return "\n".join(lines)
+
+
+async def probe_ollama() -> dict:
+    """Ask every replica's /api/tags whether it is up and has the model pulled"""
+    statuses = await ollama_pool.probe()
+    return {
+        "ollama_running": any(status["ollama_running"] for status in statuses),
+        "model_available": any(status["model_available"] for status in statuses),
+        "available_models": list(dict.fromkeys(name for status in statuses for name in status["available_models"])),
+    }
+
+
+# Latest probe result, refreshed by the background health prober
+_health: Optional[dict] = None
+_health_checked_at: Optional[float] = None
+_prober_task: Optional[asyncio.Task] = None
+
+
+async def refresh_ollama_health() -> dict:
+    """Probe Ollama once, cache the result and feed it to each replica's circuit breaker"""
+    global _health, _health_checked_at
+    
+    status = await probe_ollama()
+    _health, _health_checked_at = status, time.time()
+    return status
+
+
+async def _health_prober() -> None:
+    while True:
+        try:
+            await refresh_ollama_health()
+        except Exception:
+            logger.exception("Ollama health probe failed")
+        await asyncio.sleep(config.OLLAMA_HEALTH_INTERVAL)
+
+
+async def start_health_prober() -> None:
+    """Start polling Ollama health in the background (called on application startup)"""
+    global _prober_task
+    if _prober_task is None:
+        _prober_task = asyncio.create_task(_health_prober())
+
+
+async def stop_health_prober() -> None:
+    """Stop the background health prober (called on application shutdown)"""
+    global _prober_task
+    if _prober_task is not None:
+        _prober_task.cancel()
+        try:
+            await _prober_task
+        except asyncio.CancelledError:
+            pass
+        _prober_task = None
 
 
 async def check_ollama_status() -> dict:
     """Check if Ollama server is running and model is available"""
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{config.OLLAMA_BASE_URL}/api/tags")
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                model_names = [m.get("name", "") for m in models]
-                has_llama = any(config.OLLAMA_MODEL in name for name in model_names)
-                return {
-                    "ollama_running": True,
-                    "model_available": has_llama,
-                    "available_models": model_names
-                }
-    except:
-        pass
     
+    # Answer from the prober's cached result; probe inline only if nothing is cached yet
+    status = _health if _health is not None else await refresh_ollama_health()
     return {
-        "ollama_running": False,
-        "model_available": False,
-        "available_models": []
+        **status,
+        "checked_at": _health_checked_at,
+        "accepting": ollama_pool.accepting()
     }
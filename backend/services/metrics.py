@@ -0,0 +1,225 @@
+"""
+Metrics
+Minimal Prometheus-style counters and histograms with text exposition
+
+Updates take no locks: they run on the event loop thread and only bump
+ints/floats in preallocated lists, so the hot path stays cheap.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; covers fast catalog routes up to slow CPU-bound generations
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKENS_PER_SECOND_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 200)
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = self.buckets + (float("inf"),)
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+# Collectors report values owned elsewhere (cache, queue, ...) as gauges at scrape time
+GaugeSample = Tuple[str, str, Dict[str, str], float]
+_collectors: List[Callable[[], Iterable[GaugeSample]]] = []
+_metrics: List = []
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    metric = Counter(name, documentation, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Iterable[float] = LATENCY_BUCKETS,
+) -> Histogram:
+    metric = Histogram(name, documentation, labelnames, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(collector: Callable[[], Iterable[GaugeSample]]) -> None:
+    """Add a callback yielding (name, help, labels, value) gauge samples at scrape time"""
+    _collectors.append(collector)
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition (format 0.0.4) of every registered metric"""
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.expose())
+
+    seen = set()
+    for collector in _collectors:
+        for name, documentation, labels, value in collector():
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} gauge")
+            names = tuple(labels)
+            lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# HTTP
+http_requests = counter(
+    "http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status")
+)
+http_request_duration = histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("route", "method")
+)
+
+# LLM
+llm_requests = counter("llm_requests_total", "Completions by outcome", ("outcome",))
+llm_fallbacks = counter("llm_fallbacks_total", "Fallback answers served, by cause", ("cause",))
+llm_chunked_requests = counter(
+    "llm_chunked_requests_total", "Inputs over the prompt budget, split into chunks", ("route",)
+)
+llm_queue_seconds = histogram("llm_queue_seconds", "Time spent waiting for an admission slot")
+llm_connect_seconds = histogram("llm_connect_seconds", "TCP connect time to Ollama (new connections only)")
+llm_ttft_seconds = histogram("llm_ttft_seconds", "Time to first token for streamed completions")
+llm_total_seconds = histogram("llm_total_seconds", "Total Ollama request time", ("mode",))
+llm_tokens_per_second = histogram(
+    "llm_tokens_per_second", "Generation speed reported by Ollama (eval_count / eval_duration)",
+    buckets=TOKENS_PER_SECOND_BUCKETS,
+)
+llm_generated_tokens = counter("llm_generated_tokens_total", "Tokens generated by Ollama")
+
+
+def record_ollama_stats(data: dict) -> None:
+    """Record token throughput from the final Ollama response object"""
+    eval_count = data.get("eval_count")
+    eval_duration = data.get("eval_duration")
+    if eval_count and eval_duration:
+        llm_generated_tokens.inc(amount=eval_count)
+        llm_tokens_per_second.observe(eval_count / (eval_duration / 1e9))
+
+
+class ConnectTimer:
+    """httpx trace hook that measures TCP connect time for new pool connections"""
+
+    __slots__ = ("_started",)
+
+    def __init__(self):
+        self._started: Optional[float] = None
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self._started = time.perf_counter()
+        elif event_name == "connection.connect_tcp.complete" and self._started is not None:
+            llm_connect_seconds.observe(time.perf_counter() - self._started)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # FastAPI stores the matched route in the scope; use its template, not the raw path
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            http_requests.inc(route_path, method, str(status))
+            http_request_duration.observe(time.perf_counter() - started, route_path, method)
@@ -0,0 +1,187 @@
+"""
+Model Warm-up
+Preloads the Ollama model at startup and keeps it resident while the AI routes see traffic
+"""
+import asyncio
+import logging
+import time
+from typing import AsyncContextManager, Callable, Optional, Union
+import httpx
+import config
+
+
+logger = logging.getLogger(__name__)
+
+# A completion whose load_duration exceeds this found the model unloaded
+COLD_LOAD_SECONDS = 1.0
+
+
+def keep_alive_value(value: str) -> Union[int, float, str]:
+    """Ollama's keep_alive: a number of seconds ("-1" = forever) or a duration string like "30m" """
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+class ModelWarmer:
+    """Loads a backend's model ahead of the first request and refreshes its keep_alive
+
+    Every interval it checks /api/ps; while an AI request arrived within the
+    warm-up window it also pings the model (an empty chat, which loads the
+    model or just extends its keep_alive). Past the window it stops pinging
+    so Ollama can unload an idle model and free the memory.
+    """
+
+    def __init__(
+        self,
+        client: Callable[[], AsyncContextManager[httpx.AsyncClient]],
+        base_url: str,
+        model: str,
+        preload: bool = True,
+        interval: float = 60.0,
+        window: float = 3600.0,
+    ):
+        self.client = client
+        self.base_url = base_url
+        self.model = model
+        self.preload = preload
+        self.interval = interval
+        self.window = window
+        self.keep_alive = keep_alive_value(config.OLLAMA_KEEP_ALIVE)
+        self._task: Optional[asyncio.Task] = None
+
+        # The preload counts as activity: keep the model warm for a window after startup
+        self.last_activity: Optional[float] = time.time() if preload else None
+        self.loaded: Optional[bool] = None  # None until Ollama has been asked
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.expires_at: Optional[str] = None
+        self.size_vram: Optional[int] = None
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.pings = 0
+        self.loads = 0
+
+    def note_activity(self) -> None:
+        """Record an AI request, keeping the model warm for another window"""
+        self.last_activity = time.time()
+
+    def note_response(self, data: dict) -> None:
+        """Learn from a completion's final object whether it had to load the model"""
+        self.loaded = True
+        load_seconds = (data.get("load_duration") or 0) / 1e9
+        if load_seconds >= COLD_LOAD_SECONDS:
+            self._record_load(load_seconds)
+
+    def _record_load(self, seconds: float) -> None:
+        self.loads += 1
+        self.load_seconds = seconds
+        self.loaded_at = time.time()
+
+    async def refresh(self) -> Optional[bool]:
+        """Ask Ollama's /api/ps whether the model is loaded (None if Ollama can't tell)"""
+        try:
+            async with self.client() as client:
+                response = await client.get(f"{self.base_url}/api/ps", timeout=5.0)
+        except httpx.HTTPError as e:
+            # An unreachable Ollama has nothing loaded (a restart drops the model)
+            self.loaded, self.last_error = False, f"ps: {type(e).__name__}"
+            return False
+        self.checked_at = time.time()
+        if response.status_code != 200:
+            return self.loaded
+
+        running = [m for m in response.json().get("models", []) if self.model in m.get("name", "")]
+        self.loaded = bool(running)
+        self.expires_at = running[0].get("expires_at") if running else None
+        self.size_vram = running[0].get("size_vram") if running else None
+        return self.loaded
+
+    async def warm(self) -> bool:
+        """Load the model (or extend its keep_alive if loaded) with an empty chat request"""
+        was_loaded = self.loaded
+        payload = {
+            "model": self.model,
+            "messages": [],
+            "keep_alive": self.keep_alive,
+            # Same num_ctx as real requests, or the first of them would reload the model
+            "options": {"num_ctx": config.LLM_NUM_CTX},
+        }
+        started = time.perf_counter()
+        try:
+            async with self.client() as client:
+                response = await client.post(
+                    f"{self.base_url}/api/chat", json=payload, timeout=config.OLLAMA_LOAD_TIMEOUT
+                )
+        except httpx.HTTPError as e:
+            self.last_error = f"warm: {type(e).__name__}"
+            return False
+        if response.status_code != 200:
+            self.last_error = f"warm: HTTP {response.status_code}"
+            return False
+
+        elapsed = time.perf_counter() - started
+        self.pings += 1
+        self.last_error = None
+        self.loaded = True
+        # A ping to a loaded model returns in milliseconds; a slow one had to load it
+        if was_loaded is False or elapsed >= COLD_LOAD_SECONDS:
+            self._record_load(elapsed)
+            logger.info("Ollama model %s loaded on %s in %.1fs", self.model, self.base_url, elapsed)
+        return True
+
+    async def tick(self) -> None:
+        """One warm-up round: refresh the loaded state, and ping if there was recent traffic"""
+        loaded = await self.refresh()
+        recent = self.last_activity is not None and time.time() - self.last_activity <= self.window
+        # Also retry a preload that failed (e.g. Ollama started after the app)
+        if recent or (self.preload and not self.pings and not loaded):
+            await self.warm()
+
+    async def _run(self) -> None:
+        if self.preload:
+            try:
+                await self.refresh()
+                if await self.warm():
+                    await self.refresh()
+            except Exception:
+                logger.exception("Ollama model preload failed on %s", self.base_url)
+        while self.interval > 0:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Ollama warm-up failed on %s", self.base_url)
+
+    async def start(self) -> None:
+        """Preload in the background and start the warm-up loop (called on application startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop preloading/warm-up (called on application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "loaded": self.loaded,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+            "expires_at": self.expires_at,
+            "size_vram": self.size_vram,
+            "checked_at": self.checked_at,
+            "keep_alive": self.keep_alive,
+            "last_activity": self.last_activity,
+            "pings": self.pings,
+            "loads": self.loads,
+            "last_error": self.last_error,
+        }
@@ -2,8 +2,14 @@
 Mock Merchant Offers Service
 Simulates Visa Merchant Offers Resource Center (VMORC) API
 """
-from typing import List, Optional
+from datetime import date
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import config
 from models.benefits import MerchantOffer, BenefitCategory, OffersResponse
+from services.geo import GeoIndex, PointFilter, resolve_location
+from services.pagination import decode_cursor, next_cursor, query_fingerprint
 
 
 # Mock offers near IIT Chennai (IIT Madras)
@@ -15,7 +21,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "20% Off",
         "description": "Authentic South Indian vegetarian meals at discounted prices for students",
         "location": "Velachery, Chennai",
-        "distance_km": 2.5,
+        "latitude": 12.9791,
+        "longitude": 80.2209,
         "valid_until": "2026-06-30",
         "terms": "Valid with student ID. Minimum order ₹150. Dine-in only. Not valid on weekends.",
         "category": BenefitCategory.DINING,
@@ -27,7 +34,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "15% Off",
         "description": "All sports equipment and fitness accessories",
         "location": "OMR, Chennai",
-        "distance_km": 5.0,
+        "latitude": 12.9602,
+        "longitude": 80.2461,
         "valid_until": "2026-03-31",
         "terms": "Valid on purchases above ₹2000. Excludes cycles and treadmills. One per customer per month.",
         "category": BenefitCategory.SHOPPING,
@@ -39,7 +47,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "Buy 1 Get 1 Free",
         "description": "BOGO on movie tickets Monday to Thursday",
         "location": "VR Chennai Mall",
-        "distance_km": 8.0,
+        "latitude": 13.0806,
+        "longitude": 80.1967,
         "valid_until": "2026-04-30",
         "terms": "Valid Mon-Thu only. Excludes premium formats and recliner seats. Max 2 free tickets per transaction.",
         "category": BenefitCategory.ENTERTAINMENT,
@@ -51,7 +60,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "25% Off",
         "description": "Textbooks, reference materials, and stationery",
         "location": "T. Nagar, Chennai",
-        "distance_km": 6.0,
+        "latitude": 13.0418,
+        "longitude": 80.2341,
         "valid_until": "2026-05-31",
         "terms": "Valid on academic and reference books only. Student ID required. Cannot combine with other offers.",
         "category": BenefitCategory.SHOPPING,
@@ -63,7 +73,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "₹50 Off",
         "description": "Any chai + snack combo for late-night study sessions",
         "location": "IIT Madras Research Park",
-        "distance_km": 0.5,
+        "latitude": 12.9897,
+        "longitude": 80.2466,
         "valid_until": "2026-12-31",
         "terms": "Valid after 8 PM. One per student per day. Show valid ID card.",
         "category": BenefitCategory.DINING,
@@ -75,7 +86,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "30% Off",
         "description": "Deep cleaning service for hostel rooms and PG accommodations",
         "location": "Serves IIT Campus Area",
-        "distance_km": 0.0,
+        "latitude": 12.9916,
+        "longitude": 80.2336,
         "valid_until": "2026-06-30",
         "terms": "First booking only. Minimum booking ₹500. Available 7 days a week.",
         "category": BenefitCategory.LIFESTYLE,
@@ -87,7 +99,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "₹30 Cashback",
         "description": "On rides starting or ending at IIT Madras",
         "location": "IIT Madras Campus",
-        "distance_km": 0.0,
+        "latitude": 12.9915,
+        "longitude": 80.2337,
         "valid_until": "2026-07-31",
         "terms": "3 rides per week. Minimum fare ₹100. Cashback credited within 24 hours.",
         "category": BenefitCategory.TRAVEL,
@@ -99,7 +112,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "40% Off",
         "description": "Monthly gym and fitness class membership",
         "location": "Adyar, Chennai",
-        "distance_km": 3.0,
+        "latitude": 13.0012,
+        "longitude": 80.2565,
         "valid_until": "2026-08-31",
         "terms": "Valid for students aged 18-25. ID verification required. 3-month minimum commitment.",
         "category": BenefitCategory.LIFESTYLE,
@@ -111,7 +125,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "50% Off",
         "description": "Amazon Prime annual membership at student rates",
         "location": "Online",
-        "distance_km": None,
+        "latitude": None,
+        "longitude": None,
         "valid_until": "2026-12-31",
         "terms": "Valid .edu email required. 6-month free trial, then ₹499/year. Includes Prime Video and Music.",
         "category": BenefitCategory.SHOPPING,
@@ -123,7 +138,8 @@ OFFERS_DATABASE: List[dict] = [
         "discount": "₹500 Off",
         "description": "Prescription glasses and contact lenses",
         "location": "Phoenix Mall, Chennai",
-        "distance_km": 7.0,
+        "latitude": 12.9915,
+        "longitude": 80.217,
         "valid_until": "2026-05-31",
         "terms": "Valid on purchases above ₹1500. Free eye checkup included. One per customer.",
         "category": BenefitCategory.LIFESTYLE,
@@ -131,40 +147,280 @@ OFFERS_DATABASE: List[dict] = [
 ]
 
 
+# Text fields kept as codes into per-column string tables
+STRING_FIELDS = ("id", "merchant_name", "offer_title", "discount", "description", "location", "valid_until", "terms", "logo_url")
+REQUIRED_FIELDS = tuple(name for name in STRING_FIELDS if MerchantOffer.model_fields[name].is_required())
+CATEGORIES = list(BenefitCategory)
+CATEGORY_CODES = {category.value: code for code, category in enumerate(CATEGORIES)}
+
+
+class StringColumn:
+    """Each distinct string stored once in a table and referenced by an int32 code"""
+
+    __slots__ = ("table", "codes")
+
+    def __init__(self, values: Iterable[Optional[str]]):
+        lookup: Dict[Optional[str], int] = {}
+        self.table: List[Optional[str]] = []
+        codes = []
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(self.table)
+                self.table.append(value)
+            codes.append(code)
+        self.codes = np.array(codes, dtype=np.int32)
+
+
+class OffersIndex:
+    """Columnar offers catalog: NumPy arrays for coordinates, validity and category, interned strings
+
+    Filters run as vectorized masks; MerchantOffer models are only built for
+    the rows a query returns. Like the SQLite backend, a query returns at most
+    max_results offers.
+    """
+
+    def __init__(self, database: Iterable[dict], max_results: Optional[int] = None):
+        self.max_results = max_results if max_results is not None else config.CATALOG_MAX_QUERY_OFFERS
+        strings: Dict[str, list] = {name: [] for name in STRING_FIELDS}
+        lats, lons, categories = [], [], []
+        for offer in database:
+            # Fail on load rather than on the first query that returns a bad row
+            for name in STRING_FIELDS:
+                value = offer.get(name)
+                if value is None and name in REQUIRED_FIELDS:
+                    raise ValueError(f"Offer {offer.get('id')!r} is missing {name!r}")
+                if value is not None and not isinstance(value, str):
+                    raise ValueError(f"Offer {offer.get('id')!r} has a non-string {name!r}")
+                strings[name].append(value)
+            located = offer.get("latitude") is not None and offer.get("longitude") is not None
+            lats.append(float(offer["latitude"]) if located else np.nan)
+            lons.append(float(offer["longitude"]) if located else np.nan)
+            categories.append(CATEGORY_CODES[BenefitCategory(offer["category"]).value])
+
+        self._strings = {name: StringColumn(values) for name, values in strings.items()}
+        self.lats = np.array(lats, dtype=np.float64)
+        self.lons = np.array(lons, dtype=np.float64)
+        self.category_codes = np.array(categories, dtype=np.uint8)
+        self.valid_until = np.array(strings["valid_until"], dtype="datetime64[D]")
+
+        # Offers without coordinates (online) are listed after physical ones
+        located_mask = ~np.isnan(self.lats)
+        self._located = np.flatnonzero(located_mask)
+        self._online = np.flatnonzero(~located_mask)
+        self._online_by_expiry = self._online[np.argsort(self.valid_until[self._online], kind="stable")]
+        self._geo = GeoIndex(self.lats[self._located], self.lons[self._located])
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def unique(self, name: str) -> List[Optional[str]]:
+        """Distinct values of a text field"""
+        return list(self._strings[name].table)
+
+    def _filter(self, category: Optional[str], valid_on: Optional[str]) -> Optional[PointFilter]:
+        """Which of the given rows match the filters, or None to keep every row
+
+        Evaluated on a query's candidate rows only, so a filtered query stays
+        as cheap as the spatial lookup in front of it.
+        """
+        if not category and not valid_on:
+            return None
+        code = CATEGORY_CODES.get(category) if category else None
+        if category and code is None:
+            # Unknown categories match nothing
+            return lambda rows: np.zeros(len(rows), dtype=bool)
+        day = np.datetime64(valid_on, "D") if valid_on else None
+
+        def keep(rows: np.ndarray) -> np.ndarray:
+            matches = np.ones(len(rows), dtype=bool)
+            if code is not None:
+                matches &= self.category_codes[rows] == code
+            if day is not None:
+                matches &= self.valid_until[rows] >= day
+            return matches
+        return keep
+
+    def _located_filter(self, keep: Optional[PointFilter]) -> Optional[PointFilter]:
+        """keep applied to GeoIndex point indices (positions among the located rows)"""
+        return None if keep is None else lambda points: keep(self._located[points])
+
+    def candidates(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_distance: Optional[float] = None,
+        valid_on: Optional[str] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Up to k nearest matching offers plus up to k online ones (soonest to expire first),
+        with category codes and valid_until for scoring"""
+        keep = self._filter(None, valid_on)
+        indices, distances = self._geo.nearest(latitude, longitude, k, max_distance, self._located_filter(keep))
+        online = self._online_by_expiry
+        online = (online if keep is None else online[keep(online)])[:k]
+        
+        rows = np.concatenate((self._located[indices], online))
+        distances = np.concatenate((distances, np.full(len(online), np.nan)))
+        return rows, distances, self.category_codes[rows], self.valid_until[rows]
+
+    def materialize(self, rows: np.ndarray, distances: np.ndarray) -> List[MerchantOffer]:
+        """Build models for the selected rows, gathering each column once (NaN distance = none)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = {
+            name: [column.table[code] for code in column.codes[rows].tolist()]
+            for name, column in self._strings.items()
+        }
+        lats = self.lats[rows]
+        located = (~np.isnan(lats)).tolist()
+        lats = lats.tolist()
+        lons = self.lons[rows].tolist()
+        categories = [CATEGORIES[code] for code in self.category_codes[rows].tolist()]
+        distances_km = [None if d != d else d for d in np.round(distances, 2).tolist()]
+
+        return [
+            MerchantOffer(
+                **{name: values[i] for name, values in columns.items()},
+                latitude=lats[i] if located[i] else None,
+                longitude=lons[i] if located[i] else None,
+                category=categories[i],
+                distance_km=distances_km[i],
+            )
+            for i in range(len(rows))
+        ]
+
+    def rank(
+        self,
+        latitude: float,
+        longitude: float,
+        category: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        limit: Optional[int] = None,
+        valid_on: Optional[str] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Matching rows closest first (at most max_results) and their distances; online offers last with NaN distance"""
+        keep = self._filter(category, valid_on)
+        k = min(limit, self.max_results) if limit is not None else self.max_results
+        
+        # Only the k nearest are selected and sorted, not every offer in range
+        indices, distances = self._geo.nearest(latitude, longitude, k, max_distance, self._located_filter(keep))
+        rows = self._located[indices]
+        
+        if limit is None and len(rows) < k:
+            online = self._online if keep is None else self._online[keep(self._online)]
+            online = online[:k - len(rows)]
+            rows = np.concatenate((rows, online))
+            distances = np.concatenate((distances, np.full(len(online), np.nan)))
+        
+        return rows, distances
+
+    def query(
+        self,
+        latitude: float,
+        longitude: float,
+        category: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        limit: Optional[int] = None,
+        valid_on: Optional[str] = None,
+    ) -> List[MerchantOffer]:
+        """Offers ordered by distance from a point, closest first"""
+        return self.materialize(*self.rank(latitude, longitude, category, max_distance, limit, valid_on))
+
+    def by_category(self, category: str) -> List[MerchantOffer]:
+        """Every offer in a category, in catalog order"""
+        rows = np.arange(len(self))
+        rows = rows[self._filter(category, None)(rows)]
+        return self.materialize(rows, np.full(len(rows), np.nan))
+
+
+def get_offers_index():
+    """Offers index of the currently loaded catalog (in-memory or SQLite backed)"""
+    # Imported here: the catalog store builds on OffersIndex from this module
+    from services.catalog_store import get_catalog_store
+    return get_catalog_store().offers
+
+
+def get_offers_version() -> str:
+    """Version of offer query results for HTTP caching"""
+    from services.catalog_store import get_catalog_store
+    version = get_catalog_store().version
+    # Hiding expired offers makes results change at midnight too
+    return f"{version}.{date.today():%Y%m%d}" if config.CATALOG_HIDE_EXPIRED else version
+
+
+# Rankings of paginated queries, so later pages are sliced from the same sorted order
+_rankings: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+_rankings_rows = 0
+_rankings_index = None
+
+
+def _cached_ranking(index, key: tuple) -> Tuple[np.ndarray, np.ndarray]:
+    global _rankings_rows, _rankings_index
+    if index is not _rankings_index:
+        # The catalog was reloaded: rankings point at rows of the old one
+        _rankings.clear()
+        _rankings_rows = 0
+        _rankings_index = index
+    
+    ranking = _rankings.get(key)
+    if ranking is not None:
+        _rankings.move_to_end(key)
+        return ranking
+    
+    ranking = index.rank(*key)
+    _rankings[key] = ranking
+    _rankings_rows += len(ranking[0])
+    # Bounded by total rows held, not entries: one ranking can cover the whole catalog
+    while _rankings_rows > config.OFFERS_RANKING_CACHE_ROWS and len(_rankings) > 1:
+        _, (evicted, _) = _rankings.popitem(last=False)
+        _rankings_rows -= len(evicted)
+    return ranking
+
+
 def get_offers_by_location(
     location: str = "IIT Chennai", 
     category: Optional[str] = None,
-    max_distance: Optional[float] = None
+    max_distance: Optional[float] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    limit: Optional[int] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None
 ) -> OffersResponse:
-    """Get merchant offers near a location (simulates VMORC API)"""
-    offers = []
+    """Get merchant offers near a location (simulates VMORC API)
     
-    for o in OFFERS_DATABASE:
-        # Filter by category if specified
-        if category and o["category"].value != category:
-            continue
-        
-        # Filter by distance if specified
-        if max_distance and o.get("distance_km") is not None:
-            if o["distance_km"] > max_distance:
-                continue
-        
-        offers.append(MerchantOffer(**o))
+    limit keeps only the k nearest offers; page_size and cursor page through
+    the result (a bad cursor raises ValueError).
+    """
+    
+    # Explicit coordinates win over the named location
+    if latitude is None or longitude is None:
+        latitude, longitude = resolve_location(location)
+    # A max_distance of 0 means no limit, as it always has
+    max_distance = max_distance or None
+    
+    valid_on = date.today().isoformat() if config.CATALOG_HIDE_EXPIRED else None
+    key = (latitude, longitude, category, max_distance, limit, valid_on)
+    index = get_offers_index()
+    
+    if page_size is None and not cursor:
+        offers = index.query(*key)
+        return OffersResponse(location=location, total_offers=len(offers), offers=offers)
     
-    # Sort by distance (closest first, online last)
-    offers.sort(key=lambda x: x.distance_km if x.distance_km is not None else 999)
+    # Every parameter of the query, including the label echoed back and the day expired offers are hidden on
+    fingerprint = query_fingerprint(location, *key)
+    offset = decode_cursor(cursor, fingerprint)
+    rows, distances = _cached_ranking(index, key)
+    end = offset + page_size if page_size is not None else len(rows)
     
     return OffersResponse(
         location=location,
-        total_offers=len(offers),
-        offers=offers
+        total_offers=len(rows),
+        offers=index.materialize(rows[offset:end], distances[offset:end]),
+        next_cursor=next_cursor(offset, page_size, len(rows), fingerprint)
     )
 
 
 def get_offers_by_category(category: str) -> List[MerchantOffer]:
     """Get offers filtered by category"""
-    return [
-        MerchantOffer(**o) 
-        for o in OFFERS_DATABASE 
-        if o["category"].value == category
-    ]
+    return get_offers_index().by_category(category)
@@ -0,0 +1,332 @@
+"""
+Ollama Backend Pool
+Routes completions across Ollama replicas by load and latency, with failover, hedging and ejection
+"""
+import asyncio
+import math
+import random
+import time
+from contextlib import contextmanager
+from typing import AsyncContextManager, Awaitable, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+import httpx
+import config
+from services.circuit_breaker import CircuitBreaker, CircuitState
+from services.model_warmup import ModelWarmer
+from services.shared_state import shared_state
+
+
+T = TypeVar("T")
+
+# Weight of the newest sample in a replica's latency average
+EWMA_ALPHA = 0.3
+# A latency average this many seconds old counts for 1/e: slow replicas get retried once they've rested
+LATENCY_DECAY_SECONDS = 30.0
+# Calls per request: the first replica, plus one failover or hedge
+MAX_ATTEMPTS = 2
+
+# Latency kinds: a blocking call is timed to its full answer, a stream to its first token
+BLOCKING, STREAM = "blocking", "stream"
+
+
+class BackendSpec(NamedTuple):
+    url: str
+    model: str
+    weight: float = 1.0
+
+
+def parse_backends(spec: str, default_url: str, default_model: str) -> List[BackendSpec]:
+    """Parse OLLAMA_BACKENDS: comma-separated "url [weight=N]" entries, each serving default_model
+
+    An empty spec is the single replica at default_url. There is no per-replica
+    model: cached and pre-generated answers are keyed by OLLAMA_MODEL.
+    """
+    backends = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        url, *settings = entry.split()
+        values = dict(setting.partition("=")[::2] for setting in settings)
+        unknown = set(values) - {"weight"}
+        if unknown:
+            raise ValueError(f"Unknown OLLAMA_BACKENDS setting(s) {sorted(unknown)} in {entry!r}")
+        weight = float(values.get("weight", 1.0))
+        if weight <= 0:
+            raise ValueError(f"OLLAMA_BACKENDS weight must be positive in {entry!r}")
+        backends.append(BackendSpec(url.rstrip("/"), default_model, weight))
+    if len({backend.url for backend in backends}) != len(backends):
+        raise ValueError("OLLAMA_BACKENDS lists a URL twice")
+    return backends or [BackendSpec(default_url.rstrip("/"), default_model)]
+
+
+class OllamaBackend:
+    """One Ollama replica: its model, weight, breaker, health, warm-up and load/latency state"""
+
+    def __init__(self, spec: BackendSpec, client: Callable[[], AsyncContextManager[httpx.AsyncClient]]):
+        self.url, self.model, self.weight = spec
+        # Consecutive failures eject the replica until a half-open trial (or a health probe) succeeds
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.OLLAMA_BREAKER_FAILURES,
+            base_backoff=config.OLLAMA_BREAKER_BACKOFF,
+            max_backoff=config.OLLAMA_BREAKER_MAX_BACKOFF,
+            shared=shared_state,
+            name=f"ollama_breaker:{self.url}",
+        )
+        self.warmer = ModelWarmer(
+            client,
+            self.url,
+            self.model,
+            preload=config.OLLAMA_PRELOAD,
+            interval=config.OLLAMA_WARMUP_INTERVAL,
+            window=config.OLLAMA_WARMUP_WINDOW,
+        )
+        self.health: Optional[dict] = None
+        self.outstanding = 0
+        self._latency: Dict[str, Tuple[float, float]] = {}  # kind -> (average seconds, monotonic time)
+
+        self.requests = 0
+        self.failures = 0
+        self.hedge_wins = 0
+
+    @property
+    def healthy(self) -> bool:
+        """Not failing health probes (a replica never probed counts as healthy)"""
+        return self.health is None or bool(self.health["ollama_running"] and self.health["model_available"])
+
+    def available(self) -> bool:
+        return self.healthy and self.breaker.available()
+
+    @contextmanager
+    def busy(self) -> Iterator[None]:
+        """Count a call in flight on this replica"""
+        self.outstanding += 1
+        try:
+            yield
+        finally:
+            self.outstanding -= 1
+
+    def latency(self, kind: str) -> Optional[float]:
+        """Average latency of this kind, decayed towards 0 while the replica gets no traffic"""
+        sample = self._latency.get(kind)
+        if sample is None:
+            return None
+        average, observed_at = sample
+        return average * math.exp(-(time.monotonic() - observed_at) / LATENCY_DECAY_SECONDS)
+
+    def observe(self, kind: str, seconds: float) -> None:
+        sample = self._latency.get(kind)
+        average = seconds if sample is None else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * sample[0]
+        self._latency[kind] = (average, time.monotonic())
+
+    def score(self, kind: str, policy: str) -> float:
+        """Lower is better: in-flight calls per unit of weight, times expected latency for "ewma" """
+        load = (self.outstanding + 1) / self.weight
+        if policy == "ewma":
+            # Unmeasured replicas score 0 so they get measured
+            return load * (self.latency(kind) or 0.0)
+        return load
+
+    async def probe(self, client: httpx.AsyncClient) -> dict:
+        """Ask /api/tags whether the replica is up and has its model, and tell the breaker"""
+        status = {"ollama_running": False, "model_available": False, "available_models": []}
+        try:
+            response = await client.get(f"{self.url}/api/tags", timeout=5.0)
+            if response.status_code == 200:
+                names = [m.get("name", "") for m in response.json().get("models", [])]
+                status = {
+                    "ollama_running": True,
+                    "model_available": any(self.model in name for name in names),
+                    "available_models": names,
+                }
+        except (httpx.HTTPError, ValueError):
+            pass
+
+        self.health = status
+        if not status["ollama_running"]:
+            self.breaker.trip()
+        elif status["model_available"]:
+            self.breaker.probe_succeeded()
+        return status
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "model": self.model,
+            "weight": self.weight,
+            "healthy": self.healthy,
+            "ejected": self.breaker.state != CircuitState.CLOSED,
+            "outstanding": self.outstanding,
+            "latency_seconds": {kind: self.latency(kind) for kind in (BLOCKING, STREAM)},
+            "requests": self.requests,
+            "failures": self.failures,
+            "hedge_wins": self.hedge_wins,
+            "circuit": self.breaker.stats(),
+            "model_state": self.warmer.stats(),
+        }
+
+
+# An attempt against one replica: (result, None) on success, (None, failure cause) otherwise
+Attempt = Callable[[OllamaBackend], Awaitable[Tuple[Optional[T], Optional[str]]]]
+
+
+class OllamaPool:
+    """Picks a replica per call, fails over once on error, and hedges slow interactive calls
+
+    Replicas come from OLLAMA_BACKENDS (or OLLAMA_BASE_URL alone), read on
+    first use so scripts can point config at other servers before calling.
+    """
+
+    def __init__(self, client: Callable[[], AsyncContextManager[httpx.AsyncClient]]):
+        self.client = client
+        self.policy = config.OLLAMA_BALANCER
+        if self.policy not in ("least_outstanding", "ewma"):
+            raise ValueError(f"OLLAMA_BALANCER must be least_outstanding or ewma, got {self.policy!r}")
+        self._backends: Optional[List[OllamaBackend]] = None
+
+        self.requests = 0
+        self.failovers = 0
+        self.hedges = 0
+
+    @property
+    def backends(self) -> List[OllamaBackend]:
+        if self._backends is None:
+            self.configure(parse_backends(config.OLLAMA_BACKENDS, config.OLLAMA_BASE_URL, config.OLLAMA_MODEL))
+        return self._backends
+
+    def configure(self, specs: List[BackendSpec]) -> None:
+        """Replace the replicas (their warm-up loops must not be running)"""
+        # Cached and pre-generated answers are keyed by OLLAMA_MODEL, whichever replica produced them
+        others = sorted({spec.model for spec in specs} - {config.OLLAMA_MODEL})
+        if others:
+            raise ValueError(f"Every Ollama replica must serve OLLAMA_MODEL ({config.OLLAMA_MODEL}), got {others}")
+        self._backends = [OllamaBackend(spec, self.client) for spec in specs]
+
+    def pick(self, kind: str, exclude: List[OllamaBackend] = ()) -> Optional[OllamaBackend]:
+        """Best available replica for a call (claiming a half-open breaker's trial), or None if all are out"""
+        candidates = [b for b in self.backends if b not in exclude and b.available()]
+        # Random tie-break spreads calls between equally idle replicas
+        candidates.sort(key=lambda b: (b.score(kind, self.policy), random.random()))
+        for backend in candidates:
+            if backend.breaker.allow_request():
+                return backend
+        return None
+
+    def accepting(self) -> bool:
+        """Whether any replica would take a call right now"""
+        return any(backend.available() for backend in self.backends)
+
+    def hedge_delay(self, kind: str) -> Optional[float]:
+        """How long to wait on a replica before hedging to another, or None to not hedge"""
+        if config.OLLAMA_HEDGE_FACTOR <= 0 or len(self.backends) < 2:
+            return None
+        if self.hedges >= config.OLLAMA_HEDGE_BUDGET * self.requests:
+            return None
+        # Late compared with the fastest replica's usual latency
+        latencies = [latency for b in self.backends if b.available() and (latency := b.latency(kind))]
+        if not latencies:
+            return None
+        return max(config.OLLAMA_HEDGE_MIN_DELAY, config.OLLAMA_HEDGE_FACTOR * min(latencies))
+
+    async def call(
+        self,
+        attempt: Attempt,
+        kind: str,
+        hedge: bool = False,
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+    ) -> Tuple[Optional[T], Optional[str]]:
+        """First successful attempt across replicas, as (result, None), or (None, last failure cause)
+
+        A failed attempt fails over to another replica; with hedge, a second
+        replica also starts if the first is late, and the slower one is
+        cancelled. discard releases a result that lost the race (e.g. an
+        opened stream).
+        """
+        self.requests += 1
+        tasks: Dict[asyncio.Task, OllamaBackend] = {}
+        tried: List[OllamaBackend] = []
+
+        def launch() -> bool:
+            backend = self.pick(kind, exclude=tried)
+            if backend is None:
+                return False
+            tried.append(backend)
+            backend.requests += 1
+            tasks[asyncio.ensure_future(self._leased(attempt, backend, kind))] = backend
+            return True
+
+        if not launch():
+            return None, "circuit_open"
+        delay = self.hedge_delay(kind) if hedge else None
+        hedge_at = time.monotonic() + delay if delay is not None else None
+        cause: Optional[str] = None
+        hedged = False
+        try:
+            while tasks:
+                timeout = None if hedge_at is None else max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_at = None
+                    if len(tried) < MAX_ATTEMPTS and launch():
+                        self.hedges += 1
+                        hedged = True
+                    continue
+
+                winner = None
+                for task in done:
+                    backend = tasks.pop(task)
+                    result, failure = task.result()
+                    if result is None:
+                        backend.failures += 1
+                        cause = failure
+                    elif winner is None:
+                        winner = result
+                        if hedged and backend is not tried[0]:
+                            backend.hedge_wins += 1
+                    elif discard is not None:
+                        await discard(result)
+                if winner is not None:
+                    return winner, None
+                # Fail over, unless a hedge is still running
+                hedge_at = None
+                if not tasks and len(tried) < MAX_ATTEMPTS and launch():
+                    self.failovers += 1
+            return None, cause
+        finally:
+            for task in tasks:
+                task.cancel()
+            for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+                if discard is not None and isinstance(outcome, tuple) and outcome[0] is not None:
+                    await discard(outcome[0])
+
+    async def _leased(self, attempt: Attempt, backend: OllamaBackend, kind: str):
+        started = time.perf_counter()
+        with backend.busy():
+            result = await attempt(backend)
+        if result[0] is not None:
+            backend.observe(kind, time.perf_counter() - started)
+        return result
+
+    async def probe(self) -> List[dict]:
+        """Health-check every replica concurrently"""
+        async with self.client() as client:
+            return await asyncio.gather(*(backend.probe(client) for backend in self.backends))
+
+    def note_activity(self) -> None:
+        """Record an AI request, so every replica's model is kept warm"""
+        for backend in self.backends:
+            backend.warmer.note_activity()
+
+    async def start(self) -> None:
+        """Preload and keep warm every replica's model (called on application startup)"""
+        for backend in self.backends:
+            await backend.warmer.start()
+
+    async def stop(self) -> None:
+        for backend in self.backends:
+            await backend.warmer.stop()
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "requests": self.requests,
+            "failovers": self.failovers,
+            "hedges": self.hedges,
+            "backends": [backend.stats() for backend in self.backends],
+        }
@@ -0,0 +1,64 @@
+"""
+Pagination
+Opaque offset cursors and field projection for list endpoints
+"""
+import base64
+import hashlib
+import json
+from typing import Optional, Set, Type
+from pydantic import BaseModel
+
+
+def query_fingerprint(*params) -> str:
+    """Short digest of the query a cursor was issued for"""
+    return hashlib.sha256(json.dumps(params, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(offset: int, fingerprint: str) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{fingerprint}".encode("ascii")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], fingerprint: str) -> int:
+    """Offset a cursor points at; raises ValueError if it is malformed or from another query"""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset_text, cursor_fingerprint = base64.urlsafe_b64decode(padded).decode("ascii").split(":")
+        offset = int(offset_text)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    if cursor_fingerprint != fingerprint:
+        raise ValueError("Cursor was issued for different query parameters")
+    return offset
+
+
+def next_cursor(offset: int, page_size: Optional[int], total: int, fingerprint: str) -> Optional[str]:
+    """Cursor for the page after [offset, offset + page_size), or None on the last page"""
+    if page_size is None or offset + page_size >= total:
+        return None
+    return encode_cursor(offset + page_size, fingerprint)
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Set[str]]:
+    """Comma-separated field names validated against a model; None means every field"""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(model.model_fields)}"
+        )
+    return requested
+
+
+def project(response: BaseModel, items_field: str, fields: Optional[Set[str]]) -> dict:
+    """JSON-ready response with only the requested fields kept on each list item"""
+    if fields is None:
+        return response.model_dump(mode="json")
+    include = {name: True for name in type(response).model_fields}
+    include[items_field] = {"__all__": fields}
+    return response.model_dump(mode="json", include=include)
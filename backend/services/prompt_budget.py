@@ -0,0 +1,96 @@
+"""
+Prompt Budget
+Approximate token counting, per-route token budgets and text chunking for LLM requests
+"""
+import re
+from typing import Dict, List, NamedTuple
+import config
+
+
+# Pieces split roughly like Llama 3's pre-tokenizer: words with their leading space, 1-3 digit
+# groups, punctuation runs and whitespace. Words this tokenizer keeps whole are usually one BPE
+# token; counting one per 6 characters overestimates, which is the safe side for a budget.
+_PIECE_RE = re.compile(r"'(?:s|t|re|ve|m|ll|d)\b| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+", re.IGNORECASE)
+ASCII_CHARS_PER_TOKEN = 6
+
+# A sentence (or line) with its trailing whitespace
+_SENTENCE_RE = re.compile(r"[^\n]*?(?:[.!?](?=\s)|\n|$)\s*")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate Llama token count; non-ASCII scripts (e.g. Tamil) count a token per character"""
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece.isascii():
+            tokens += (len(piece) + ASCII_CHARS_PER_TOKEN - 1) // ASCII_CHARS_PER_TOKEN
+        else:
+            tokens += len(piece)
+    return tokens
+
+
+def pack(pieces: List[str], max_tokens: int) -> List[List[str]]:
+    """Group consecutive pieces into runs of at most max_tokens (a single oversized piece stays alone)"""
+    groups, current, used = [], [], 0
+    for piece in pieces:
+        tokens = count_tokens(piece)
+        if current and used + tokens > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(piece)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens, at sentence boundaries where possible"""
+    pieces = []
+    for sentence in _SENTENCE_RE.findall(text):
+        if count_tokens(sentence) > max_tokens:
+            # A run-on "sentence": fall back to word boundaries, then to fixed-size slices
+            for words in pack(re.findall(r"\S+\s*", sentence), max_tokens):
+                part = "".join(words)
+                step = max_tokens if not part.isascii() else max_tokens * ASCII_CHARS_PER_TOKEN
+                pieces.extend(part[i:i + step] for i in range(0, len(part), step))
+        elif sentence:
+            pieces.append(sentence)
+    return [chunk for chunk in map("".join, pack(pieces, max_tokens)) if chunk.strip()]
+
+
+class Budget(NamedTuple):
+    """Token limits of one kind of LLM request"""
+    num_predict: int  # output tokens Ollama may generate
+    chunk_tokens: int  # user text above this is split into chunks
+
+    def options(self) -> Dict[str, int]:
+        """Ollama options enforcing the budget"""
+        return {"num_ctx": config.LLM_NUM_CTX, "num_predict": self.num_predict}
+
+
+# Room in the context for the system prompt and instructions around the user's text
+PROMPT_OVERHEAD_TOKENS = 256
+
+
+# Tamil output takes several times the tokens of the English input
+TRANSLATION_EXPANSION = 4
+
+
+def _budget(num_predict: int, expansion: int = 0) -> Budget:
+    # Every request uses the same num_ctx (changing it makes Ollama reload the model), so the
+    # input a route can take is whatever its output budget leaves free
+    room = config.LLM_NUM_CTX - num_predict - PROMPT_OVERHEAD_TOKENS
+    if room < 64:
+        raise ValueError(f"LLM_NUM_CTX={config.LLM_NUM_CTX} leaves no room for input next to {num_predict} output tokens")
+    chunk_tokens = min(config.LLM_CHUNK_TOKENS, room)
+    if expansion:
+        # Output grows with the input, so the chunk must fit the output budget too
+        chunk_tokens = min(chunk_tokens, num_predict // expansion)
+    return Budget(num_predict, chunk_tokens)
+
+
+BUDGETS = {
+    "summarize": _budget(config.LLM_SUMMARY_MAX_TOKENS),
+    "translate": _budget(config.LLM_TRANSLATE_MAX_TOKENS, TRANSLATION_EXPANSION),
+    "recommend": _budget(config.LLM_RECOMMEND_MAX_TOKENS),
+}
@@ -0,0 +1,312 @@
+"""
+Recommendation Engine
+Deterministic ranking of the benefits and offers a card holder can use, scored with NumPy over the catalog
+"""
+from collections import Counter
+from datetime import date
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
+import numpy as np
+import config
+from models.benefits import Benefit, MerchantOffer, RankedRecommendation, RecommendationsResponse
+from services.benefits_service import TIER_ORDER, BenefitsIndex, get_benefits_index
+from services.geo import resolve_location
+from services.offers_service import CATEGORIES, CATEGORY_CODES, get_offers_index
+from services.semantic_cache import normalize_text, normalize_user_context
+
+
+# Category affinity of each lifestyle, in [0, 1]; unknown lifestyles like every category a little
+LIFESTYLE_AFFINITY: Dict[str, Dict[str, float]] = {
+    "student": {"dining": 0.9, "entertainment": 0.8, "shopping": 0.6, "lifestyle": 0.5, "cashback": 0.5},
+    "professional": {"travel": 0.8, "dining": 0.7, "insurance": 0.6, "shopping": 0.4, "cashback": 0.4},
+    "business": {"travel": 1.0, "lifestyle": 0.7, "cashback": 0.6, "dining": 0.5, "insurance": 0.4},
+    "freelancer": {"shopping": 0.7, "dining": 0.6, "insurance": 0.6, "lifestyle": 0.5, "cashback": 0.5},
+    "retired": {"travel": 0.8, "insurance": 0.8, "dining": 0.6, "lifestyle": 0.5},
+}
+DEFAULT_AFFINITY = {category.value: 0.5 for category in CATEGORIES}
+
+# Interest -> (category affinities, words in a benefit or offer that mark a match)
+INTEREST_PROFILES: Dict[str, Tuple[Dict[str, float], Tuple[str, ...]]] = {
+    "food": ({"dining": 1.0}, ("food", "dining", "restaurant", "restaurants", "meal", "meals", "thali", "cafe", "zomato")),
+    "technology": ({"shopping": 0.7, "insurance": 0.4}, ("tech", "technology", "electronics", "gadgets", "laptop", "warranty", "software")),
+    "entertainment": ({"entertainment": 1.0}, ("movie", "movies", "cinema", "cinemas", "concert", "music", "bookmyshow")),
+    "travel": ({"travel": 1.0, "insurance": 0.3}, ("travel", "flight", "flights", "lounge", "airport", "hotel", "trip")),
+    "shopping": ({"shopping": 1.0, "cashback": 0.5}, ("shopping", "store", "mall", "fashion", "flipkart", "amazon")),
+    "fitness": ({"lifestyle": 0.6, "shopping": 0.5}, ("fitness", "gym", "sports", "yoga")),
+    "books": ({"shopping": 0.5, "lifestyle": 0.5}, ("book", "books", "bookstore", "academic", "courses")),
+    "health": ({"insurance": 0.7, "lifestyle": 0.5}, ("health", "medical", "pharmacy", "wellness")),
+}
+
+# Weight of each signal (all in [0, 1]) in a score; each kind sums to 1 so benefits and offers compare
+BENEFIT_WEIGHTS = {"affinity": 0.5, "keyword": 0.3, "tier": 0.2}
+OFFER_WEIGHTS = {"affinity": 0.4, "keyword": 0.25, "distance": 0.25, "expiry": 0.1}
+
+# A benefit inherited from a lower tier counts this much less per tier of difference
+TIER_DECAY = 0.6
+# Proximity is exp(-distance / scale); online offers get a flat score
+DISTANCE_SCALE_KM = 5.0
+ONLINE_PROXIMITY = 0.5
+# Offers expiring sooner than this get a "use it soon" boost
+EXPIRY_HORIZON_DAYS = 60
+# Each earlier pick in the same category scales a candidate's score by this
+DIVERSITY_PENALTY = 0.7
+# Offers scored per request: the nearest this many within the radius, and as many online ones
+OFFER_CANDIDATES = 200
+# Text matching needs the models, so only this many times k offers are built and rescored
+RERANK_FACTOR = 8
+
+
+class Profile(NamedTuple):
+    """A user context reduced to what scoring needs"""
+    lifestyle: str
+    interests: List[str]
+    affinity: np.ndarray  # per category code, max-normalized to [0, 1]
+    keywords: List[Tuple[str, FrozenSet[str]]]  # (interest, words marking a match)
+
+
+class _TierBenefits(NamedTuple):
+    benefits: List[Benefit]
+    categories: np.ndarray
+    tier_signal: np.ndarray
+    words: List[FrozenSet[str]]
+    word_masks: Dict[str, np.ndarray]
+
+
+class _Candidate(NamedTuple):
+    score: float
+    category: int
+    item: Union[Benefit, MerchantOffer]
+    reasons: List[str]
+
+
+def _words(*texts: Optional[str]) -> FrozenSet[str]:
+    return frozenset(word for text in texts if text for word in normalize_text(text).split())
+
+
+def build_profile(user_context: dict) -> Profile:
+    """Category affinities and match words for a (raw) user context"""
+    context = normalize_user_context(user_context)
+    affinity = np.zeros(len(CATEGORIES), dtype=np.float64)
+    for category, weight in LIFESTYLE_AFFINITY.get(context["lifestyle"], DEFAULT_AFFINITY).items():
+        affinity[CATEGORY_CODES[category]] += weight
+
+    keywords = []
+    for interest in context["interests"]:
+        # Unknown interests still match their own words, and a category name matches that category
+        categories, words = INTEREST_PROFILES.get(
+            interest, ({interest: 1.0} if interest in CATEGORY_CODES else {}, tuple(interest.split()))
+        )
+        for category, weight in categories.items():
+            affinity[CATEGORY_CODES[category]] += weight
+        keywords.append((interest, frozenset(words)))
+
+    peak = affinity.max()
+    return Profile(context["lifestyle"], context["interests"], affinity / peak if peak else affinity, keywords)
+
+
+def _keyword_signal(word_sets: List[FrozenSet[str]], profile: Profile) -> np.ndarray:
+    """Share of (up to two) interests each item's text matches"""
+    hits = np.array(
+        [sum(1 for _, words in profile.keywords if words & item_words) for item_words in word_sets],
+        dtype=np.float64,
+    )
+    return np.minimum(hits, 2.0) / 2.0
+
+
+def _matched_interests(item_words: FrozenSet[str], profile: Profile) -> List[str]:
+    return [interest for interest, words in profile.keywords if words & item_words]
+
+
+def _top(scores: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the n best scores, best first"""
+    if len(scores) > n:
+        candidates = np.argpartition(-scores, n)[:n]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class BenefitFeatures:
+    """Scoring arrays for the benefits each tier can use, built once per catalog"""
+
+    def __init__(self, index: BenefitsIndex):
+        self.index = index
+        self.tiers = {tier: self._build(index, tier) for tier in TIER_ORDER}
+
+    @staticmethod
+    def _build(index: BenefitsIndex, tier: str) -> _TierBenefits:
+        benefits = index.view(tier).response.benefits
+        rank = TIER_ORDER.index(tier)
+        tier_gaps = [rank - TIER_ORDER.index(index.tier_of(b.id) or tier) for b in benefits]
+        words = [_words(b.title, b.description, b.merchant, b.value) for b in benefits]
+
+        word_masks: Dict[str, np.ndarray] = {}
+        for position, item_words in enumerate(words):
+            for word in item_words:
+                mask = word_masks.setdefault(word, np.zeros(len(benefits), dtype=bool))
+                mask[position] = True
+
+        return _TierBenefits(
+            benefits=benefits,
+            categories=np.array([CATEGORY_CODES[b.category.value] for b in benefits], dtype=np.intp),
+            tier_signal=TIER_DECAY ** np.array(tier_gaps, dtype=np.float64),
+            words=words,
+            word_masks=word_masks,
+        )
+
+    def keyword_signal(self, tier: str, profile: Profile) -> np.ndarray:
+        """Like _keyword_signal, from the precomputed word -> benefits masks"""
+        features = self.tiers[tier]
+        hits = np.zeros(len(features.benefits), dtype=np.float64)
+        empty = np.zeros(len(features.benefits), dtype=bool)
+        for _, words in profile.keywords:
+            matched = empty
+            for word in words:
+                mask = features.word_masks.get(word)
+                if mask is not None:
+                    matched = matched | mask
+            hits += matched
+        return np.minimum(hits, 2.0) / 2.0
+
+
+_benefit_features: Optional[BenefitFeatures] = None
+
+
+def get_benefit_features() -> BenefitFeatures:
+    """Benefit scoring arrays for the currently loaded catalog"""
+    global _benefit_features
+    index = get_benefits_index()
+    if _benefit_features is None or _benefit_features.index is not index:
+        # First use, or the catalog was reloaded
+        _benefit_features = BenefitFeatures(index)
+    return _benefit_features
+
+
+def _lifestyle_reason(category: int, profile: Profile) -> Optional[str]:
+    if LIFESTYLE_AFFINITY.get(profile.lifestyle, {}).get(CATEGORIES[category].value, 0.0) >= 0.7:
+        return f"suits a {profile.lifestyle} lifestyle"
+    return None
+
+
+def _rank_benefits(tier: str, profile: Profile, k: int) -> Tuple[List[_Candidate], int]:
+    features = get_benefit_features()
+    tier_benefits = features.tiers[tier]
+    if not tier_benefits.benefits:
+        return [], 0
+
+    scores = (
+        BENEFIT_WEIGHTS["affinity"] * profile.affinity[tier_benefits.categories]
+        + BENEFIT_WEIGHTS["keyword"] * features.keyword_signal(tier, profile)
+        + BENEFIT_WEIGHTS["tier"] * tier_benefits.tier_signal
+    )
+
+    candidates = []
+    for position in _top(scores, k * RERANK_FACTOR).tolist():
+        category = int(tier_benefits.categories[position])
+        reasons = [f"matches your interest in {interest}"
+                   for interest in _matched_interests(tier_benefits.words[position], profile)]
+        lifestyle = _lifestyle_reason(category, profile)
+        if lifestyle:
+            reasons.append(lifestyle)
+        if tier_benefits.tier_signal[position] == 1.0 and tier != "classic":
+            reasons.append(f"a Visa {tier.title()} benefit")
+        candidates.append(_Candidate(float(scores[position]), category, tier_benefits.benefits[position], reasons))
+    return candidates, len(tier_benefits.benefits)
+
+
+def _rank_offers(profile: Profile, latitude: float, longitude: float, k: int) -> Tuple[List[_Candidate], int]:
+    index = get_offers_index()
+    today = date.today()
+    # Expired offers are never recommended
+    rows, distances, categories, valid_until = index.candidates(
+        latitude, longitude, OFFER_CANDIDATES, config.RECOMMEND_RADIUS_KM, today.isoformat()
+    )
+    if not len(rows):
+        return [], 0
+
+    categories = categories.astype(np.intp)
+    days_left = (valid_until - np.datetime64(today, "D")).astype(np.float64)
+    online = np.isnan(distances)
+    proximity = np.where(online, ONLINE_PROXIMITY, np.exp(-np.where(online, 0.0, distances) / DISTANCE_SCALE_KM))
+    urgency = 1.0 - np.clip(days_left / EXPIRY_HORIZON_DAYS, 0.0, 1.0)
+    scores = (
+        OFFER_WEIGHTS["affinity"] * profile.affinity[categories]
+        + OFFER_WEIGHTS["distance"] * proximity
+        + OFFER_WEIGHTS["expiry"] * urgency
+    )
+
+    # Rescore the best few with text matching, which needs the offer text
+    top = _top(scores, k * RERANK_FACTOR)
+    offers = index.materialize(rows[top], distances[top])
+    words = [_words(o.merchant_name, o.offer_title, o.description) for o in offers]
+    rescored = scores[top] + OFFER_WEIGHTS["keyword"] * _keyword_signal(words, profile)
+
+    candidates = []
+    for offer, item_words, score, category, days in zip(
+        offers, words, rescored.tolist(), categories[top].tolist(), days_left[top].tolist()
+    ):
+        reasons = [f"matches your interest in {interest}" for interest in _matched_interests(item_words, profile)]
+        lifestyle = _lifestyle_reason(category, profile)
+        if lifestyle:
+            reasons.append(lifestyle)
+        reasons.append(f"{offer.distance_km:g} km away" if offer.distance_km is not None else "available online")
+        if days <= 30:
+            reasons.append(f"ends in {int(days)} days" if days >= 1 else "ends today")
+        candidates.append(_Candidate(score, category, offer, reasons))
+    return candidates, len(rows)
+
+
+def _diversify(candidates: List[_Candidate], k: int) -> List[_Candidate]:
+    """Greedy top-k that discounts categories already picked"""
+    remaining = sorted(candidates, key=lambda c: -c.score)
+    picked: List[_Candidate] = []
+    counts: Counter = Counter()
+    while remaining and len(picked) < k:
+        best = max(range(len(remaining)), key=lambda i: remaining[i].score * DIVERSITY_PENALTY ** counts[remaining[i].category])
+        candidate = remaining.pop(best)
+        counts[candidate.category] += 1
+        picked.append(candidate)
+    return picked
+
+
+def _ranked(candidate: _Candidate) -> RankedRecommendation:
+    item = candidate.item
+    if isinstance(item, Benefit):
+        return RankedRecommendation(
+            kind="benefit", id=item.id, title=item.title, category=item.category, value=item.value,
+            merchant=item.merchant, score=round(candidate.score, 4), reasons=candidate.reasons,
+        )
+    return RankedRecommendation(
+        kind="offer", id=item.id, title=item.offer_title, category=item.category, value=item.discount,
+        merchant=item.merchant_name, distance_km=item.distance_km, valid_until=item.valid_until,
+        score=round(candidate.score, 4), reasons=candidate.reasons,
+    )
+
+
+def rank_recommendations(
+    card_type: str,
+    user_context: dict,
+    k: Optional[int] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
+) -> RecommendationsResponse:
+    """Top-k benefits and nearby offers for a card holder, best first
+
+    Scores combine category affinity (lifestyle and interests), interest
+    words in the item text, tier, distance and time left before expiry.
+    """
+    k = k or config.RECOMMEND_TOP_K
+    tier = card_type.lower() if card_type.lower() in TIER_ORDER else "classic"
+    location = user_context.get("location", "IIT Chennai")
+    if latitude is None or longitude is None:
+        latitude, longitude = resolve_location(location)
+
+    profile = build_profile(user_context)
+    benefits, benefit_count = _rank_benefits(tier, profile, k)
+    offers, offer_count = _rank_offers(profile, latitude, longitude, k)
+
+    return RecommendationsResponse(
+        card_type=tier,
+        location=location,
+        total_candidates=benefit_count + offer_count,
+        recommendations=[_ranked(candidate) for candidate in _diversify(benefits + offers, k)],
+    )
@@ -0,0 +1,351 @@
+"""
+Search Service
+Full-text search over benefits and offers: tokenizer, BM25 inverted index and the search API logic
+"""
+import re
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+import config
+from models.benefits import BenefitCategory, SearchHit, SearchResponse
+from services.benefits_service import TIER_ORDER
+from services.geo import haversine_km, resolve_location
+from services.offers_service import CATEGORY_CODES
+from services.pagination import decode_cursor, next_cursor, query_fingerprint
+
+
+# Letters and digits only, so SQLite's unicode61 tokenizer splits stored text the same way
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Too common to help ranking; dropped from documents and queries alike
+STOPWORDS = frozenset({"a", "an", "and", "at", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+# Searchable fields and their BM25 weights, in FTS column order
+SEARCH_FIELDS = ("title", "merchant", "description", "terms")
+FIELD_WEIGHTS = (3.0, 3.0, 1.0, 0.5)
+
+# BM25 parameters, the same as SQLite FTS5's bm25()
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+BENEFIT, OFFER = 0, 1
+KINDS = {"benefit": BENEFIT, "offer": OFFER}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens without stopwords, plurals folded ("movies" -> "movie")"""
+    if not text:
+        return []
+    return [
+        token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+        for token in _TOKEN_RE.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+def benefit_fields(benefit: dict) -> Tuple[Optional[str], ...]:
+    """Searchable text of a benefit record, in SEARCH_FIELDS order"""
+    return benefit["title"], benefit.get("merchant"), benefit["description"], benefit["terms_and_conditions"]
+
+
+def offer_fields(offer: dict) -> Tuple[Optional[str], ...]:
+    """Searchable text of an offer record, in SEARCH_FIELDS order"""
+    return offer["offer_title"], offer["merchant_name"], offer["description"], offer["terms"]
+
+
+def benefit_tiers(benefits: Dict[str, List[dict]]) -> Dict[str, int]:
+    """Benefit id -> rank of the lowest tier that has it"""
+    ranks: Dict[str, int] = {}
+    for rank, tier in enumerate(TIER_ORDER):
+        for b in benefits.get(tier, []):
+            ranks.setdefault(b["id"], rank)
+    return ranks
+
+
+class SearchResult(NamedTuple):
+    """Matches best first: kind, a backend-specific reference, BM25 score and distance (NaN if unknown)"""
+    kinds: np.ndarray
+    refs: np.ndarray
+    scores: np.ndarray
+    distances: np.ndarray
+
+
+def empty_result() -> SearchResult:
+    return SearchResult(*(np.zeros(0, dtype) for dtype in (np.uint8, np.int64, np.float64, np.float64)))
+
+
+class _Document(NamedTuple):
+    terms: Tuple[str, ...]
+    weights: Tuple[float, ...]  # field-weighted term frequencies
+    length: int  # tokens in all fields, unweighted (as FTS5 counts them)
+
+
+def _document(fields: tuple) -> _Document:
+    counts: Dict[str, float] = {}
+    length = 0
+    for text, weight in zip(fields, FIELD_WEIGHTS):
+        tokens = tokenize(text)
+        length += len(tokens)
+        for token in tokens:
+            counts[token] = counts.get(token, 0.0) + weight
+    return _Document(tuple(counts), tuple(counts.values()), length)
+
+
+class SearchIndex:
+    """In-memory inverted index over benefits and offers with NumPy postings
+
+    Postings are stored CSR-style: the documents of term t are
+    post_docs[offsets[t]:offsets[t + 1]], in ascending order. Building from
+    a previous index re-tokenizes only documents whose text changed; term
+    ids are assigned afresh, so the vocabulary holds only current terms.
+    """
+
+    def __init__(
+        self,
+        benefits: Dict[str, List[dict]],
+        offers: List[dict],
+        max_results: int,
+        previous: Optional["SearchIndex"] = None,
+    ):
+        self.max_results = max_results
+        tiers = benefit_tiers(benefits)
+        unique_benefits = {b["id"]: b for tier in TIER_ORDER for b in benefits.get(tier, [])}
+        self.benefit_ids = list(unique_benefits)
+
+        texts = [benefit_fields(b) for b in unique_benefits.values()] + [offer_fields(o) for o in offers]
+        self._cache: Dict[tuple, _Document] = {}
+        reused = previous._cache if previous is not None else {}
+        self.reused = 0
+        terms: List[str] = []
+        weights: List[float] = []
+        terms_per_doc: List[int] = []
+        lengths: List[int] = []
+        for fields in texts:
+            document = self._cache.get(fields)
+            if document is None:
+                document = reused.get(fields)
+                if document is None:
+                    document = _document(fields)
+                else:
+                    self.reused += 1
+                self._cache[fields] = document
+            terms.extend(document.terms)
+            weights.extend(document.weights)
+            terms_per_doc.append(len(document.terms))
+            lengths.append(document.length)
+
+        count = len(texts)
+        self.kinds = np.array([BENEFIT] * len(unique_benefits) + [OFFER] * len(offers), dtype=np.uint8)
+        self.refs = np.concatenate((np.arange(len(unique_benefits)), np.arange(len(offers)))).astype(np.int64)
+        self.categories = np.array(
+            [CATEGORY_CODES[BenefitCategory(r["category"]).value] for r in (*unique_benefits.values(), *offers)],
+            dtype=np.uint8,
+        )
+        # Offers are available to every tier
+        self.tier_ranks = np.array([tiers[i] for i in unique_benefits] + [0] * len(offers), dtype=np.int8)
+        self.lats = np.array([np.nan] * len(unique_benefits) + [
+            o["latitude"] if o.get("latitude") is not None else np.nan for o in offers
+        ], dtype=np.float64)
+        self.lons = np.array([np.nan] * len(unique_benefits) + [
+            o["longitude"] if o.get("longitude") is not None else np.nan for o in offers
+        ], dtype=np.float64)
+        # Benefits never expire
+        self.valid_until = np.array(
+            ["9999-12-31"] * len(unique_benefits) + [o["valid_until"] for o in offers], dtype="datetime64[D]"
+        )
+        self.lengths = np.array(lengths, dtype=np.float64)
+        self.avg_length = float(self.lengths.mean()) if count and self.lengths.sum() else 1.0
+
+        # Numbered in order of first occurrence, so terms of removed documents don't linger across reloads
+        self.vocabulary: Dict[str, int] = {}
+        vocabulary = self.vocabulary
+        term_array = np.fromiter(
+            (vocabulary.setdefault(term, len(vocabulary)) for term in terms), dtype=np.int64, count=len(terms)
+        )
+
+        # Group (term, doc, weight) triples by term; the stable sort keeps each term's documents ascending
+        order = np.argsort(term_array, kind="stable")
+        self.post_docs = np.repeat(np.arange(count, dtype=np.int64), terms_per_doc)[order]
+        self.post_weights = np.array(weights, dtype=np.float64)[order]
+        self.offsets = np.searchsorted(term_array[order], np.arange(len(self.vocabulary) + 1))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _bm25(self, start: int, end: int, positions: np.ndarray) -> np.ndarray:
+        """One term's BM25 contribution at the given positions of its postings [start, end)"""
+        idf = max(np.log((len(self) - (end - start) + 0.5) / (end - start + 0.5)), 1e-6)
+        tf = self.post_weights[positions]
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[self.post_docs[positions]] / self.avg_length)
+        return idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    def benefit_id(self, ref: int) -> str:
+        return self.benefit_ids[ref]
+
+    def search(
+        self,
+        terms: List[str],
+        kind: Optional[int] = None,
+        category: Optional[str] = None,
+        max_tier_rank: Optional[int] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        max_distance: Optional[float] = None,
+        valid_on: Optional[str] = None,
+    ) -> SearchResult:
+        """Best max_results documents, ranked by BM25 (FTS5's formula), after filters
+
+        Documents must contain every term; if none does, any term will do.
+        """
+        postings = []
+        for term in dict.fromkeys(terms):
+            term_id = self.vocabulary.get(term)
+            postings.append((self.offsets[term_id], self.offsets[term_id + 1]) if term_id is not None else (0, 0))
+        if not postings:
+            return empty_result()
+
+        # Every term: look the rarest term's documents up in the other (ascending) postings
+        by_size = sorted(postings, key=lambda p: p[1] - p[0])
+        matched = self.post_docs[by_size[0][0]:by_size[0][1]]
+        positions = [np.arange(*by_size[0])]
+        for start, end in by_size[1:]:
+            docs = self.post_docs[start:end]
+            found = np.minimum(np.searchsorted(docs, matched), max(len(docs) - 1, 0))
+            hit = docs[found] == matched if len(docs) else np.zeros(len(matched), dtype=bool)
+            matched = matched[hit]
+            positions = [p[hit] for p in positions] + [start + found[hit]]
+
+        if len(matched):
+            scores = sum(self._bm25(start, end, p) for (start, end), p in zip(by_size, positions))
+        else:
+            docs = [self.post_docs[start:end] for start, end in postings if end > start]
+            contributions = [self._bm25(start, end, np.arange(start, end)) for start, end in postings if end > start]
+            if not docs:
+                return empty_result()
+            # Sum per document across terms
+            if len(docs) == 1:
+                matched, scores = docs[0], contributions[0]
+            elif sum(len(d) for d in docs) * 16 > len(self):
+                # Common terms: a dense accumulator beats sorting the postings
+                dense = np.bincount(np.concatenate(docs), weights=np.concatenate(contributions), minlength=len(self))
+                matched = np.flatnonzero(dense)
+                scores = dense[matched]
+            else:
+                matched, inverse = np.unique(np.concatenate(docs), return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate(contributions))
+
+        keep = np.ones(len(matched), dtype=bool)
+        if kind is not None:
+            keep &= self.kinds[matched] == kind
+        if category:
+            code = CATEGORY_CODES.get(category)
+            keep &= self.categories[matched] == code if code is not None else False
+        if max_tier_rank is not None:
+            keep &= self.tier_ranks[matched] <= max_tier_rank
+        if valid_on:
+            keep &= self.valid_until[matched] >= np.datetime64(valid_on, "D")
+
+        distances = np.full(len(matched), np.nan)
+        if latitude is not None and longitude is not None:
+            located = ~np.isnan(self.lats[matched])
+            distances[located] = haversine_km(
+                latitude, longitude, self.lats[matched[located]], self.lons[matched[located]]
+            )
+            if max_distance is not None:
+                # Only located offers can be within a distance
+                keep &= located & (np.nan_to_num(distances, nan=np.inf) <= max_distance)
+
+        matched, scores, distances = matched[keep], scores[keep], distances[keep]
+        if len(matched) > self.max_results:
+            # Keep everything tied with the cut-off score, so ties still break by catalog order below
+            cutoff = np.partition(scores, len(scores) - self.max_results)[len(scores) - self.max_results]
+            top = scores >= cutoff
+            matched, scores, distances = matched[top], scores[top], distances[top]
+        # Best score first; ties keep catalog order (benefits before offers)
+        order = np.lexsort((matched, -scores))[:self.max_results]
+        matched = matched[order]
+        return SearchResult(self.kinds[matched], self.refs[matched], scores[order], distances[order])
+
+
+def fts_rows(fields: Iterable[Optional[str]]) -> Tuple[str, ...]:
+    """FTS5 column values: pre-tokenized, so SQLite indexes exactly the tokens SearchIndex would"""
+    return tuple(" ".join(tokenize(text)) for text in fields)
+
+
+def match_expression(terms: List[str], every: bool = True) -> str:
+    """FTS5 MATCH query for documents containing every term (or any of them)"""
+    return (" AND " if every else " OR ").join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+def _search_hits(store, result: SearchResult) -> List[SearchHit]:
+    offer_positions = np.flatnonzero(result.kinds == OFFER)
+    offers = iter(store.offers.materialize(result.refs[offer_positions], result.distances[offer_positions]))
+    hits = []
+    for kind, ref, score in zip(result.kinds.tolist(), result.refs.tolist(), result.scores.tolist()):
+        if kind == BENEFIT:
+            benefit = store.benefits.benefit(store.search.benefit_id(ref))
+            hits.append(SearchHit(
+                kind="benefit", id=benefit.id, title=benefit.title, category=benefit.category,
+                merchant=benefit.merchant, value=benefit.value, tier=store.benefits.tier_of(benefit.id),
+                score=round(score, 4),
+            ))
+        else:
+            offer = next(offers)
+            hits.append(SearchHit(
+                kind="offer", id=offer.id, title=offer.offer_title, category=offer.category,
+                merchant=offer.merchant_name, value=offer.discount, distance_km=offer.distance_km,
+                valid_until=offer.valid_until, score=round(score, 4),
+            ))
+    return hits
+
+
+def search_catalog(
+    query: str,
+    card_type: Optional[str] = None,
+    category: Optional[str] = None,
+    kind: Optional[str] = None,
+    location: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    max_distance: Optional[float] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> SearchResponse:
+    """Benefits and offers matching a free-text query, best match first
+
+    card_type keeps benefits that tier has (offers apply to every tier);
+    max_distance keeps only offers within that many km of the location. A
+    bad kind or cursor raises ValueError.
+    """
+    # Imported here: the catalog store builds on SearchIndex from this module
+    from services.catalog_store import get_catalog_store
+
+    if kind is not None and kind not in KINDS:
+        raise ValueError(f"Unknown kind {kind!r} (expected 'benefit' or 'offer')")
+    max_tier_rank = None
+    if card_type:
+        tier = card_type.lower()
+        max_tier_rank = TIER_ORDER.index(tier if tier in TIER_ORDER else "classic")
+    if (latitude is None or longitude is None) and (location or max_distance is not None):
+        latitude, longitude = resolve_location(location)
+
+    valid_on = date.today().isoformat() if config.CATALOG_HIDE_EXPIRED else None
+    fingerprint = query_fingerprint(
+        query, card_type, category, kind, location, latitude, longitude, max_distance, valid_on
+    )
+    offset = decode_cursor(cursor, fingerprint)
+
+    store = get_catalog_store()
+    result = store.search.search(
+        tokenize(query), KINDS.get(kind), category, max_tier_rank, latitude, longitude, max_distance, valid_on
+    )
+    total = len(result.kinds)
+    end = offset + page_size if page_size is not None else total
+    page = SearchResult(*(column[offset:end] for column in result))
+
+    return SearchResponse(
+        query=query,
+        total_hits=total,
+        hits=_search_hits(store, page),
+        next_cursor=next_cursor(offset, page_size, total, fingerprint)
+    )
@@ -0,0 +1,220 @@
+"""
+Semantic Cache
+Answers near-duplicate prompts from a local vector index of earlier LLM results
+"""
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+from services.metrics import counter, histogram
+from services.shared_state import SharedState
+
+
+EMBEDDING_DIM = 512
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Spellings of the same place that should share cached answers
+LOCATION_ALIASES = {
+    "iit madras": "iit chennai",
+    "iitm": "iit chennai",
+    "iit m": "iit chennai",
+    "iit chennai campus": "iit chennai",
+    "indian institute of technology madras": "iit chennai",
+}
+
+semantic_lookups = counter("llm_semantic_cache_lookups_total", "Semantic cache lookups by namespace and result",
+                           ("namespace", "result"))
+semantic_similarity = histogram("llm_semantic_cache_similarity", "Best cosine similarity found per lookup",
+                                ("namespace",), buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.98, 1.0))
+
+
+def normalize_text(value: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    return " ".join(_TOKEN_RE.findall(value.lower()))
+
+
+def normalize_location(location: str) -> str:
+    """Canonical place name, e.g. IIT Madras, Chennai -> iit chennai"""
+    location = normalize_text(location)
+    # Drop a trailing city qualifier ("Velachery, Chennai" -> "velachery")
+    if location.endswith(" chennai") and location != "iit chennai":
+        location = location[:-len(" chennai")]
+    return LOCATION_ALIASES.get(location, location)
+
+
+def normalize_user_context(user_context: dict) -> dict:
+    """Canonical location, lifestyle and a sorted, de-duplicated interest list"""
+    interests = user_context.get("interests", ["technology", "food", "entertainment"])
+    return {
+        "location": normalize_location(user_context.get("location", "IIT Chennai")),
+        "lifestyle": normalize_text(user_context.get("lifestyle", "student")),
+        "interests": sorted({normalize_text(i) for i in interests if normalize_text(i)}),
+    }
+
+
+def embed(text: str) -> np.ndarray:
+    """Hashed bag of words and character trigrams, L2-normalized"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    words = _TOKEN_RE.findall(text.lower())
+    features = list(words)
+    for word in words:
+        padded = f" {word} "
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        # The top bit picks the sign so collisions tend to cancel out
+        vector[h % EMBEDDING_DIM] += 1.0 if h & 0x80000000 else -1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _Partition:
+    """Ring buffer of embeddings and answers; grows by doubling up to its capacity"""
+
+    __slots__ = ("vectors", "values", "size", "next_slot", "capacity")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.vectors = np.zeros((min(16, capacity), EMBEDDING_DIM), dtype=np.float32)
+        self.values: List[Optional[str]] = [None] * len(self.vectors)
+        self.size = 0
+        self.next_slot = 0
+
+    def add(self, vector: np.ndarray, value: str) -> int:
+        """Store an answer, returning how many entries were added (0 once full)"""
+        if self.size == len(self.vectors) and self.size < self.capacity:
+            grown = min(self.capacity, self.size * 2)
+            self.vectors = np.vstack((self.vectors, np.zeros((grown - self.size, EMBEDDING_DIM), np.float32)))
+            self.values.extend([None] * (grown - self.size))
+            self.next_slot = self.size
+
+        # Once full, overwrite the oldest entry
+        self.vectors[self.next_slot] = vector
+        self.values[self.next_slot] = value
+        added = int(self.size < len(self.vectors))
+        self.size += added
+        self.next_slot = (self.next_slot + 1) % len(self.vectors)
+        return added
+
+
+class SemanticCache:
+    """Per-partition vector index; a lookup hits when cosine similarity clears the threshold
+
+    max_entries bounds the whole cache, not each partition: partition keys
+    carry client text, so the least recently used partitions are dropped
+    once the entries across all of them exceed it.
+
+    With a shared store, answers are also appended to a log that the other
+    worker processes replay (and embed locally) before their next lookup.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        threshold: float,
+        max_entries: int = 2048,
+        shared: Optional[SharedState] = None,
+        sync_interval: float = 1.0,
+    ):
+        self.namespace = namespace
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.shared = shared if shared is not None and shared.enabled else None
+        self.sync_interval = sync_interval
+        self._partitions: "OrderedDict[str, _Partition]" = OrderedDict()
+        self._entries = 0
+        self._log_position = 0
+        self._synced_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def lookup(self, partition: str, text: str) -> Optional[str]:
+        """Stored answer for the most similar earlier text in the same partition
+
+        The partition must match exactly (e.g. card tier or language); only
+        the text is compared by similarity.
+        """
+        self._sync()
+        bucket = self._partitions.get(partition)
+        if bucket is None or not bucket.size:
+            self._miss()
+            return None
+        self._partitions.move_to_end(partition)
+
+        scores = bucket.vectors[:bucket.size] @ embed(text)
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+        semantic_similarity.observe(similarity, self.namespace)
+
+        if similarity < self.threshold:
+            self._miss()
+            return None
+
+        self.hits += 1
+        semantic_lookups.inc(self.namespace, "hit")
+        return bucket.values[best]
+
+    def store(self, partition: str, text: str, value: str) -> None:
+        """Index an answer under its partition"""
+        self._add(partition, text, value)
+        if self.shared is not None:
+            entry_id = self.shared.append(self.namespace, {
+                "owner": self.shared.owner, "partition": partition, "text": text, "value": value,
+            })
+            # Older entries have been replayed by every live worker or pushed out of their buffers
+            if entry_id % 256 == 0:
+                self.shared.trim_log(self.namespace, keep=self.max_entries * 4)
+
+    def _add(self, partition: str, text: str, value: str) -> None:
+        bucket = self._partitions.get(partition)
+        if bucket is None:
+            bucket = self._partitions[partition] = _Partition(self.max_entries)
+        else:
+            self._partitions.move_to_end(partition)
+        self._entries += bucket.add(embed(text), value)
+
+        # Drop whole partitions, least recently used first, never the one just written
+        while self._entries > self.max_entries and len(self._partitions) > 1:
+            _, oldest = self._partitions.popitem(last=False)
+            self._entries -= oldest.size
+            self.evicted += oldest.size
+
+    def clear(self) -> None:
+        """Drop every local entry (the shared log is left to the other workers)"""
+        self._partitions.clear()
+        self._entries = 0
+
+    def _sync(self) -> None:
+        """Replay answers other workers stored since the last sync"""
+        if self.shared is None:
+            return
+        now = time.monotonic()
+        if now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        for entry_id, entry in self.shared.read_since(self.namespace, self._log_position):
+            self._log_position = entry_id
+            if entry["owner"] != self.shared.owner:
+                self._add(entry["partition"], entry["text"], entry["value"])
+
+    def _miss(self) -> None:
+        self.misses += 1
+        semantic_lookups.inc(self.namespace, "miss")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "threshold": self.threshold,
+            "entries": self._entries,
+            "partitions": len(self._partitions),
+            "evicted": self.evicted,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,129 @@
+"""
+Shared State
+Small key/value, lease and append-log store in a SQLite file shared by every worker process
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+import config
+
+
+class SharedState:
+    """Cross-process state for multi-worker mode; every method is a short local SQLite transaction"""
+
+    def __init__(self, path: str, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        # Unique per process, so a worker's leases are its own
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not cross a fork (e.g. a preloaded app); reopen in the child
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    topic TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_log_topic ON log (topic, id)")
+            self._conn = conn
+            self._pid = os.getpid()
+            self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        return self._conn
+
+    # Key/value
+
+    def get(self, key: str) -> Optional[Tuple[dict, float]]:
+        """Stored value and when it was written, or None"""
+        with self._lock:
+            row = self._connect().execute("SELECT value, updated_at FROM kv WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def put(self, key: str, value: dict) -> float:
+        """Store a value; returns its write time"""
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO kv (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now),
+            )
+        return now
+
+    # Leases
+
+    def claim(self, key: str, ttl: float) -> bool:
+        """Take (or renew) a lease unless another live process holds it"""
+        now = time.time()
+        with self._lock:
+            cursor = self._connect().execute(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (key, self.owner, now + ttl, now),
+            )
+            return cursor.rowcount > 0
+
+    def release(self, key: str) -> None:
+        """Drop a lease this process holds"""
+        with self._lock:
+            self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def is_held(self, key: str) -> bool:
+        """Whether any process holds a live lease"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT 1 FROM leases WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    # Append-only log
+
+    def append(self, topic: str, payload: dict) -> int:
+        """Add an entry other workers will see on their next read; returns its id"""
+        with self._lock:
+            cursor = self._connect().execute(
+                "INSERT INTO log (topic, payload, created_at) VALUES (?, ?, ?)",
+                (topic, json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+            return cursor.lastrowid
+
+    def read_since(self, topic: str, after_id: int, limit: int = 1000) -> Iterator[Tuple[int, dict]]:
+        """Entries of a topic newer than after_id, oldest first"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT id, payload FROM log WHERE topic = ? AND id > ? ORDER BY id LIMIT ?",
+                (topic, after_id, limit),
+            ).fetchall()
+        for entry_id, payload in rows:
+            yield entry_id, json.loads(payload)
+
+    def trim_log(self, topic: str, keep: int) -> None:
+        """Keep only the newest entries of a topic"""
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM log WHERE topic = ? AND id <= "
+                "(SELECT id FROM log WHERE topic = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (topic, topic, keep),
+            )
+
+
+shared_state = SharedState(config.SHARED_STATE_PATH, enabled=config.SHARED_STATE_ENABLED)
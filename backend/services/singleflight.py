@@ -0,0 +1,187 @@
+"""
+Single-Flight Request Coalescing
+Concurrent calls with the same key share one in-flight asyncio task (or, across workers, one lease)
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+from services.shared_state import SharedState
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one task per key; later callers await the leader's result"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn() once per key across all concurrent callers"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.leaders += 1
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # Shield so one caller disconnecting doesn't cancel the shared work
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        """Leader/coalesced counters and the number of keys in flight"""
+        total = self.leaders + self.coalesced
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0,
+            "in_flight": len(self._inflight),
+        }
+
+
+class _Broadcast:
+    """Events of one shared stream, kept so subscribers that join late replay them from the start"""
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.error: Optional[BaseException] = None
+        self.finished = False
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    async def pump(self, events: AsyncIterator[Any]) -> None:
+        try:
+            async for event in events:
+                async with self.changed:
+                    self.events.append(event)
+                    self.changed.notify_all()
+        except Exception as error:
+            self.error = error
+        finally:
+            self.finished = True
+            async with self.changed:
+                self.changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: index < len(self.events) or self.finished)
+                batch = self.events[index:]
+            if not batch:
+                if self.error is not None:
+                    raise self.error
+                return
+            for event in batch:
+                yield event
+            index += len(batch)
+
+
+class StreamFlight:
+    """Run at most one stream per key; later callers receive the leader's events as they arrive"""
+
+    def __init__(self):
+        self._inflight: Dict[str, _Broadcast] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Events of fn() once per key across all concurrent callers
+
+        The stream runs in its own task, so one caller disconnecting doesn't
+        cut the others off; it is cancelled once every caller has gone.
+        """
+        broadcast = self._inflight.get(key)
+        if broadcast is not None:
+            self.coalesced += 1
+        else:
+            broadcast = _Broadcast()
+            broadcast.task = asyncio.ensure_future(broadcast.pump(fn()))
+            self._inflight[key] = broadcast
+            self.leaders += 1
+            broadcast.task.add_done_callback(lambda done: self._forget(key, broadcast))
+
+        broadcast.subscribers += 1
+        try:
+            async for event in broadcast.follow():
+                yield event
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.finished:
+                # Callers arriving from now on start a new stream rather than replay a cut-off one
+                self._forget(key, broadcast)
+                broadcast.task.cancel()
+
+    def _forget(self, key: str, broadcast: _Broadcast) -> None:
+        if self._inflight.get(key) is broadcast:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        total = self.leaders + self.coalesced
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0,
+            "in_flight": len(self._inflight),
+        }
+
+
+class SharedFlight:
+    """Single flight across worker processes: the lease holder computes, the others poll for its result
+
+    fn() must publish its result where lookup() can see it (e.g. the shared
+    disk tier of the LLM cache). A waiter whose leader gave up without a
+    result, or that waited past wait_timeout, runs fn() itself.
+    """
+
+    def __init__(self, shared: Optional[SharedState], wait_timeout: float, poll_interval: float):
+        self.shared = shared if shared is not None and shared.enabled else None
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], lookup: Callable[[], Awaitable[Optional[T]]]) -> T:
+        if self.shared is None:
+            return await fn()
+
+        lease = f"flight:{key}"
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+        while True:
+            if self.shared.claim(lease, self.wait_timeout):
+                self.leaders += 1
+                try:
+                    return await fn()
+                finally:
+                    self.shared.release(lease)
+
+            if not waited:
+                self.followers += 1
+                waited = True
+            await asyncio.sleep(self.poll_interval)
+            result = await lookup()
+            if result is not None:
+                return result
+            if time.monotonic() >= deadline:
+                self.timeouts += 1
+                return await fn()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.shared is not None,
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "timeouts": self.timeouts,
+        }
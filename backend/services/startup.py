@@ -0,0 +1,155 @@
+"""
+Startup Warm-up
+Imports the heavy service modules and loads the catalog and LLM client after the server starts listening
+"""
+import asyncio
+import importlib
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from fastapi import HTTPException
+import config
+
+
+logger = logging.getLogger(__name__)
+
+# Warm-up steps, run in this order
+IMPORTS, CATALOG, LLM = "imports", "catalog", "llm"
+STEPS = (IMPORTS, CATALOG, LLM)
+
+# Imported by the request handlers on first use; together they pull in numpy, httpx and the search index
+HEAVY_MODULES = ("services.catalog_store", "services.card_service", "services.llm_service")
+
+
+class Readiness:
+    """Progress of the warm-up: which steps are done, how long they took, and which failed"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.started_at: Optional[float] = None  # None = no warm-up running (scripts, jobs)
+        self.seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._done = {step: asyncio.Event() for step in STEPS}
+
+    @property
+    def ready(self) -> bool:
+        return len(self.seconds) == len(STEPS)
+
+    def finish(self, step: str, seconds: float, error: Optional[str] = None) -> None:
+        if error is None:
+            self.seconds[step] = round(seconds, 3)
+        else:
+            self.errors[step] = error
+        self._done[step].set()
+
+    async def wait(self, step: str, timeout: Optional[float] = None) -> None:
+        """Wait for a step (no-op without a warm-up); RuntimeError if it failed"""
+        event = self._done[step]
+        if self.started_at is not None and not event.is_set():
+            await asyncio.wait_for(event.wait(), timeout)
+        if step in self.errors:
+            raise RuntimeError(f"Startup step {step!r} failed: {self.errors[step]}")
+
+    def stats(self) -> dict:
+        def state(step: str) -> str:
+            return "ready" if step in self.seconds else "failed" if step in self.errors else "pending"
+
+        return {
+            "ready": self.ready,
+            "steps": {step: state(step) for step in STEPS},
+            "seconds": self.seconds,
+            "errors": self.errors,
+            "started_at": self.started_at,
+        }
+
+
+readiness = Readiness()
+
+_task: Optional[asyncio.Task] = None
+# Shutdown hooks of whatever the warm-up started, run in reverse
+_cleanup: List[Callable[[], Awaitable[None]]] = []
+
+
+def requires(step: str) -> Callable[[], Awaitable[None]]:
+    """Route dependency holding requests until a warm-up step is done (503 if it failed or takes too long)"""
+    async def wait_for_startup() -> None:
+        try:
+            await readiness.wait(step, config.STARTUP_WAIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Service is starting up", headers={"Retry-After": "1"})
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+    return wait_for_startup
+
+
+async def _import_modules() -> None:
+    # In a worker thread so the event loop keeps answering health checks meanwhile
+    for name in HEAVY_MODULES:
+        await asyncio.to_thread(importlib.import_module, name)
+
+
+async def _load_catalog() -> None:
+    from services import catalog_store
+    from services.card_service import get_bin_table
+
+    # Benefit views, offers index and search index; minutes-long on a large catalog file
+    await asyncio.to_thread(catalog_store.load_catalog)
+    await asyncio.to_thread(get_bin_table)
+    await catalog_store.start_catalog_watcher()
+    _cleanup.append(catalog_store.stop_catalog_watcher)
+
+
+async def _start_llm() -> None:
+    from services import llm_service
+    from services.llm_artifact import load_artifact_into_cache
+
+    # Seed the completion cache with pre-generated summaries, if any
+    await asyncio.to_thread(load_artifact_into_cache, config.LLM_ARTIFACT_PATH)
+    # Share one pooled Ollama client across all requests
+    await llm_service.start_client()
+    _cleanup.append(llm_service.close_client)
+    # Keep Ollama health cached and the circuit breaker informed
+    await llm_service.start_health_prober()
+    _cleanup.append(llm_service.stop_health_prober)
+    # Load the model on every replica in the background so the first AI request doesn't pay for it
+    await llm_service.ollama_pool.start()
+    _cleanup.append(llm_service.ollama_pool.stop)
+
+
+async def _warm_up() -> None:
+    for step, run in ((IMPORTS, _import_modules), (CATALOG, _load_catalog), (LLM, _start_llm)):
+        started = time.perf_counter()
+        try:
+            await run()
+        except Exception as e:
+            # Keep going: the other routes can still serve, and /api/ready reports the failure
+            logger.exception("Startup step %s failed", step)
+            readiness.finish(step, time.perf_counter() - started, f"{type(e).__name__}: {e}")
+        else:
+            readiness.finish(step, time.perf_counter() - started)
+    logger.info("Startup warm-up finished in %.2fs", time.time() - readiness.started_at)
+
+
+async def start_warmup() -> None:
+    """Run the warm-up in the background (called on application startup)"""
+    global _task
+    if _task is None:
+        readiness.reset()
+        readiness.started_at = time.time()
+        _task = asyncio.create_task(_warm_up())
+
+
+async def stop_warmup() -> None:
+    """Cancel an unfinished warm-up and stop what it started (called on application shutdown)"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    while _cleanup:
+        await _cleanup.pop()()
@@ -0,0 +1,51 @@
+"""
+Test Fixtures
+Caches and shared state in a temporary directory, and a stub Ollama server per test
+"""
+import os
+import tempfile
+
+# Set before config is imported, so tests never touch the developer's cache files or a real Ollama
+_TMP = tempfile.mkdtemp(prefix="visa-benefits-tests-")
+os.environ.update({
+    "LLM_CACHE_PATH": os.path.join(_TMP, "llm_cache.sqlite3"),
+    "SHARED_STATE_PATH": os.path.join(_TMP, "shared_state.sqlite3"),
+    "LLM_ARTIFACT_PATH": os.path.join(_TMP, "llm_artifact.json"),
+    "WEB_WORKERS": "1",
+    "OLLAMA_BASE_URL": "http://127.0.0.1:9",
+    "OLLAMA_BACKENDS": "",
+    "OLLAMA_PRELOAD": "false",
+    "CATALOG_PATH": "",
+})
+
+import pytest  # noqa: E402
+import config  # noqa: E402
+from benchmarks.stub_ollama import StubOllama, StubOllamaServer  # noqa: E402
+from services import llm_service  # noqa: E402
+from services.ollama_pool import BackendSpec  # noqa: E402
+
+
+@pytest.fixture
+def llm():
+    """llm_service with empty caches and nothing in flight"""
+    llm_service.llm_cache.enabled = True
+    llm_service.llm_cache.clear()
+    llm_service.recommend_semantic_cache.clear()
+    yield llm_service
+    llm_service.ollama_pool.configure([BackendSpec(config.OLLAMA_BASE_URL, config.OLLAMA_MODEL)])
+
+
+@pytest.fixture
+def stub_ollama(llm):
+    """A stub Ollama as the pool's only replica"""
+    stub = StubOllama(model=config.OLLAMA_MODEL, tokens=5)
+    with StubOllamaServer(stub) as server:
+        llm.ollama_pool.configure([BackendSpec(server.url, config.OLLAMA_MODEL)])
+        yield stub
+
+
+@pytest.fixture
+def no_ollama(llm):
+    """A pool whose only replica refuses connections"""
+    llm.ollama_pool.configure([BackendSpec("http://127.0.0.1:9", config.OLLAMA_MODEL)])
+    yield
@@ -0,0 +1,60 @@
+import asyncio
+from services.admission import AdmissionController, Priority
+
+
+def test_waiters_are_admitted_by_priority_then_arrival():
+    async def run():
+        admission = AdmissionController(max_concurrency=1, max_queue=8, queue_timeout=5.0)
+        order = []
+
+        async def request(name, priority):
+            async with admission.slot(priority) as admitted:
+                assert admitted
+                order.append(name)
+                await asyncio.sleep(0)
+
+        async with admission.slot():
+            waiters = [
+                asyncio.ensure_future(request("background-1", Priority.BACKGROUND)),
+                asyncio.ensure_future(request("interactive", Priority.INTERACTIVE)),
+                asyncio.ensure_future(request("background-2", Priority.BACKGROUND)),
+            ]
+            await asyncio.sleep(0.01)
+            assert admission.stats()["queue_depth"] == 3
+        await asyncio.gather(*waiters)
+        return order
+
+    assert asyncio.run(run()) == ["interactive", "background-1", "background-2"]
+
+
+def test_waiters_past_the_deadline_are_shed():
+    async def run():
+        admission = AdmissionController(max_concurrency=1, max_queue=8, queue_timeout=0.05)
+        async with admission.slot():
+            async with admission.slot() as admitted:
+                assert not admitted
+        # The shed waiter left nothing behind: the next request gets the free slot at once
+        async with admission.slot() as admitted:
+            assert admitted
+        return admission.stats()
+
+    stats = asyncio.run(run())
+    assert stats["shed_deadline"] == 1 and stats["queue_depth"] == 0 and stats["active"] == 0
+
+
+def test_full_queue_sheds_lower_priority_waiters_first():
+    async def run():
+        admission = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5.0)
+        async with admission.slot():
+            background = asyncio.ensure_future(admission.acquire(Priority.BACKGROUND))
+            await asyncio.sleep(0)
+            interactive = asyncio.ensure_future(admission.acquire(Priority.INTERACTIVE))
+            assert await background is False
+            another = await admission.acquire(Priority.BACKGROUND)
+        assert await interactive is True
+        admission.release()
+        return another, admission.stats()
+
+    another, stats = asyncio.run(run())
+    assert another is False
+    assert stats["shed_evicted"] == 1 and stats["shed_queue_full"] == 1
@@ -0,0 +1,38 @@
+import json
+from fastapi.testclient import TestClient
+from services.benefits_service import get_benefit_by_id
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_reports_errors_first_and_coalesces_duplicates(llm, stub_ollama):
+    # Imported here: main starts the warm-up, which the other tests don't need
+    import main
+
+    with TestClient(main.app) as client:
+        # One text is already cached, so it is answered before any generation finishes
+        cached = client.post("/api/ai/summarize", json={"text": "Cached clause."})
+        assert cached.json()["source"] == "llm"
+        terms = get_benefit_by_id("b001").terms_and_conditions
+        response = client.post("/api/ai/summarize/batch", json={
+            "texts": ["Clause A.", "Cached clause.", "Clause A.", terms],
+            "benefit_ids": ["nope", "b001", "b001"],
+        })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = ndjson(response)
+    assert lines[0] == {"benefit_id": "nope", "error": "Benefit not found"}
+    assert lines[1] == {"index": 1, "result": cached.json()["result"], "source": "cache"}
+    assert lines[-1] == {"done": True, "total": 3, "unknown": 1}
+
+    # Each unique text is generated once, and every item that asked for it gets a line, together
+    results = lines[2:-1]
+    assert [line.get("index", line.get("benefit_id")) for line in results] in (
+        [0, 2, 3, "b001", "b001"],
+        [3, "b001", "b001", 0, 2],
+    )
+    assert all(line["source"] == "llm" and line["result"] for line in results)
+    assert stub_ollama.requests == 1 + 2
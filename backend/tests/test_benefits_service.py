@@ -0,0 +1,12 @@
+from services.benefits_service import get_benefits_by_card_type, get_benefits_index
+
+
+def test_benefits_response_is_a_deep_copy():
+    response = get_benefits_by_card_type("gold")
+    title = response.benefits[0].title
+    response.benefits[0].title = "changed"
+    response.benefits.clear()
+
+    shared = get_benefits_index().view("gold").response
+    assert shared.benefits and shared.benefits[0].title == title
+    assert get_benefits_by_card_type("gold").benefits[0].title == title
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+import config
+from fastapi import HTTPException
+from models.card import CardInput
+from routers.cards import validate_card
+from services import card_service
+from services.card_service import BinTable, validate_ndjson
+
+
+def validate(number):
+    return asyncio.run(validate_card(CardInput(card_number=number)))
+
+
+def batch(number):
+    return next(iter(validate_ndjson([f'"{number}"'.encode()])))
+
+
+@pytest.fixture
+def bin_table(monkeypatch):
+    monkeypatch.setattr(card_service, "_bin_table", BinTable([("4000", "4099", "classic"), ("4100", "4199", "gold")]))
+
+
+@pytest.fixture
+def strict(monkeypatch):
+    monkeypatch.setattr(config, "CARD_VALIDATE_STRICT", True)
+
+
+def test_single_and_batch_agree_on_valid_cards(bin_table):
+    response = validate("4111 1111 1111 1111")
+    assert (response.card_type, response.last_four) == ("gold", "1111")
+    assert '"valid":true,"card_type":"gold"' in batch("4111111111111111")
+
+
+def test_test_cards_keep_their_tier_without_a_checksum(bin_table):
+    assert validate("4000000000003000").card_type == "signature"
+
+
+@pytest.mark.parametrize("number, card_type", [
+    ("4111111111111112", "gold"),  # fails Luhn
+    ("4242424242424242", "classic"),  # outside every BIN range
+])
+def test_single_accepts_any_visa_number_by_default(bin_table, number, card_type):
+    response = validate(number)
+    assert response.valid and response.card_type == card_type
+
+
+@pytest.mark.parametrize("number, error", [
+    ("4111111111111112", "Luhn"),
+    ("4242424242424242", "BIN range"),
+])
+def test_strict_single_rejects_what_batch_rejects(bin_table, strict, number, error):
+    with pytest.raises(HTTPException) as raised:
+        validate(number)
+    assert raised.value.status_code == 400 and error in raised.value.detail
+    assert error in batch(number)
+    assert validate("4000000000001000").card_type == "gold"
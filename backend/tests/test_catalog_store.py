@@ -0,0 +1,62 @@
+import asyncio
+import sqlite3
+import threading
+import pytest
+import config
+from benchmarks.bench_catalog import synthetic_offers
+from services import catalog_store
+from services.benefits_service import BENEFITS_DATABASE
+from services.catalog_store import CatalogStore, get_catalog_store, run_catalog_query, write_sqlite_catalog
+
+
+@pytest.fixture
+def sqlite_catalog(tmp_path, monkeypatch):
+    """A SQLite catalog as the loaded store"""
+    path = str(tmp_path / "catalog.sqlite3")
+    write_sqlite_catalog(path, BENEFITS_DATABASE, synthetic_offers(500))
+    monkeypatch.setattr(config, "CATALOG_BACKEND", "sqlite")
+    monkeypatch.setattr(config, "CATALOG_PATH", path)
+    previous = catalog_store._store
+    catalog_store.load_catalog()
+    yield path
+    catalog_store._swap(previous)
+
+
+def test_catalog_store_is_abstract():
+    with pytest.raises(TypeError):
+        CatalogStore("nowhere")
+
+
+def test_sqlite_queries_run_off_the_event_loop(sqlite_catalog):
+    async def run():
+        loop_thread = threading.get_ident()
+        threads = await asyncio.gather(*(run_catalog_query(threading.get_ident) for _ in range(4)))
+        offers = await run_catalog_query(lambda: get_catalog_store().offers.query(13.0, 80.2, limit=5))
+        return loop_thread, threads, offers
+
+    loop_thread, threads, offers = asyncio.run(run())
+    assert loop_thread not in threads
+    assert len(offers) == 5
+
+
+def test_replaced_store_closes_after_its_last_query(sqlite_catalog):
+    old = get_catalog_store()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_query():
+        started.set()
+        release.wait(5)
+        # Still the snapshot the query started on, and still open
+        return get_catalog_store() is old, len(get_catalog_store().offers.query(13.0, 80.2, limit=3))
+
+    async def run():
+        query = asyncio.ensure_future(run_catalog_query(slow_query))
+        await asyncio.to_thread(started.wait, 5)
+        catalog_store.load_catalog()
+        assert get_catalog_store() is not old
+        release.set()
+        return await query
+
+    assert asyncio.run(run()) == (True, 3)
+    with pytest.raises(sqlite3.ProgrammingError):
+        old.offers.query(13.0, 80.2, limit=3)
@@ -0,0 +1,62 @@
+import types
+import pytest
+from services import circuit_breaker
+from services.circuit_breaker import CircuitBreaker, CircuitState
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock the test moves by hand"""
+    now = types.SimpleNamespace(value=100.0)
+    monkeypatch.setattr(circuit_breaker, "time", types.SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=3, base_backoff=2.0)
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request() and breaker.short_circuited == 1
+
+    clock.value += 2.0
+    assert breaker.available()
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # Only the one trial goes through while it is in flight
+    assert not breaker.allow_request() and not breaker.available()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED and breaker.consecutive_failures == 0
+    assert breaker.allow_request()
+
+
+def test_failed_trial_doubles_the_open_period(clock):
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=2.0, max_backoff=5.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN and breaker.times_opened == 1
+
+    for backoff in (4.0, 5.0):
+        clock.value += breaker.backoff
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN and breaker.backoff == backoff
+        clock.value += backoff - 0.1
+        assert not breaker.allow_request()
+        clock.value += 0.1
+
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED and breaker.backoff == 2.0
+
+
+def test_probes_trip_and_reopen_the_breaker(clock):
+    breaker = CircuitBreaker(base_backoff=30.0)
+    breaker.trip()
+    assert not breaker.allow_request()
+    breaker.probe_succeeded()
+    assert breaker.allow_request() and breaker.state == CircuitState.HALF_OPEN
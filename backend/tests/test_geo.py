@@ -0,0 +1,59 @@
+import numpy as np
+from services.geo import EARTH_RADIUS_KM, GeoIndex, bounding_box, haversine_km
+
+
+def scattered_points(count=20000, seed=3):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(12.5, 13.5, count), rng.uniform(79.8, 80.8, count)
+
+
+def test_within_matches_a_full_scan():
+    lats, lons = scattered_points()
+    index = GeoIndex(lats, lons)
+    distances = haversine_km(13.0, 80.2, lats, lons)
+    for radius in (0.2, 1.0, 5.0, 60.0):
+        found, found_distances = index.within(13.0, 80.2, radius)
+        assert set(found.tolist()) == set(np.flatnonzero(distances <= radius).tolist())
+        assert np.all(np.diff(found_distances) >= 0)
+
+
+def test_filter_sees_only_candidates_near_the_query():
+    lats, lons = scattered_points()
+    index = GeoIndex(lats, lons)
+    seen = []
+
+    def even(points):
+        seen.append(len(points))
+        return points % 2 == 0
+
+    found, _ = index.nearest(13.0, 80.2, 10, keep=even)
+    distances = haversine_km(13.0, 80.2, lats, lons)
+    evens = np.flatnonzero(np.arange(len(lats)) % 2 == 0)
+    assert found.tolist() == evens[np.argsort(distances[evens], kind="stable")[:10]].tolist()
+    # The filter runs on the grid cells around the point, not the whole column
+    assert max(seen) < len(lats) / 10
+
+
+def destination(lat, lon, bearing_deg, distance_km):
+    """Point distance_km from (lat, lon) along a great circle with the given initial bearing"""
+    angle = distance_km / EARTH_RADIUS_KM
+    lat1, lon1, bearing = np.radians(lat), np.radians(lon), np.radians(bearing_deg)
+    lat2 = np.arcsin(np.sin(lat1) * np.cos(angle) + np.cos(lat1) * np.sin(angle) * np.cos(bearing))
+    lon2 = lon1 + np.arctan2(
+        np.sin(bearing) * np.sin(angle) * np.cos(lat1), np.cos(angle) - np.sin(lat1) * np.sin(lat2)
+    )
+    return np.degrees(lat2), np.degrees(lon2)
+
+
+def test_points_just_inside_the_radius_are_found():
+    for lat, lon in ((13.0, 80.2), (60.0, 10.0)):
+        # A ring just inside the radius reaches the box's edges in every direction
+        lats, lons = destination(lat, lon, np.arange(0.0, 360.0, 0.5), 999.53)
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, 1000)
+        assert np.all((min_lat <= lats) & (lats <= max_lat) & (min_lon <= lons) & (lons <= max_lon))
+
+        index = GeoIndex(lats, lons)
+        found, distances = index.within(lat, lon, 1000)
+        assert len(found) == len(lats) and np.all(distances <= 1000)
+        nearest, _ = index.nearest(lat, lon, 1, max_radius_km=1000)
+        assert len(nearest) == 1
@@ -0,0 +1,9 @@
+import brotli
+from services.http_cache import CachedBody, choose_encoding, json_bytes
+
+
+def test_brotli_is_preferred_and_round_trips():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip;q=1, br;q=0") == "gzip"
+    identity = json_bytes({"offers": [{"id": i, "title": "Dining cashback"} for i in range(50)]})
+    assert brotli.decompress(CachedBody("v1", identity).body("br")) == identity
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import types
+import pytest
+import config
+from services import llm_cache as llm_cache_module
+from services.llm_cache import LLMCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A wall clock the test moves by hand"""
+    now = types.SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(llm_cache_module, "time", types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def statements(cache, prefix):
+    """Threads that ran each SQL statement starting with prefix, recorded from now on"""
+    seen = []
+    cache._connect().set_trace_callback(
+        lambda sql: seen.append(threading.get_ident()) if sql.lstrip().upper().startswith(prefix) else None
+    )
+    return seen
+
+
+def test_entries_expire_after_the_ttl(path, clock):
+    cache = LLMCache(path, ttl_seconds=60)
+    cache.set("key", "answer")
+    clock.value += 60
+    assert cache.get("key") == "answer"
+
+    clock.value += 1
+    assert cache.get("key") is None
+    # Expired on disk as well, not only in memory
+    assert LLMCache(path, ttl_seconds=3600).get("key") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_memory_tier_evicts_least_recently_used_and_falls_back_to_disk(path, clock):
+    cache = LLMCache(path, max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "C")
+    assert list(cache._memory) == ["a", "c"]
+
+    assert cache.get("b") == "B"
+    assert cache.stats()["disk_hits"] == 1 and list(cache._memory) == ["c", "b"]
+
+    # Another worker's memory tier is empty, but the shared disk tier answers
+    other = LLMCache(path)
+    assert other.get("a") == "A" and other.get("a") == "A"
+    assert other.stats()["disk_hits"] == 1 and other.stats()["memory_hits"] == 1
+
+
+def test_changing_the_model_drops_every_entry(path, clock, monkeypatch):
+    cache = LLMCache(path)
+    cache.set("key", "answer")
+    assert cache.get("key") == "answer"
+
+    monkeypatch.setattr(config, "OLLAMA_MODEL", "another-model")
+    assert cache.get("key") is None
+    assert not cache._memory
+    assert LLMCache(path).get("key") is None
+    monkeypatch.undo()
+    assert LLMCache(path).get("key") is None
+
+
+def test_disk_tier_is_trimmed_without_counting_on_every_write(path, clock):
+    cache = LLMCache(path, max_entries=1, max_disk_entries=100)
+    counts = statements(cache, "SELECT COUNT")
+    for i in range(300):
+        clock.value += 1
+        cache.set(f"key{i}", str(i))
+
+    # Each sweep trims to 90% of the limit, so it runs about once per 10 writes
+    assert len(counts) <= 30
+    rows = [key for key, in cache._connect().execute("SELECT key FROM completions ORDER BY accessed_at")]
+    assert 90 <= len(rows) <= 100
+    assert rows == [f"key{i}" for i in range(300 - len(rows), 300)]
+
+
+def test_disk_tier_evicts_least_recently_read_rows(path, clock):
+    cache = LLMCache(path, max_entries=1, max_disk_entries=10)
+    for i in range(10):
+        clock.value += 1
+        cache.set(f"key{i}", str(i))
+    clock.value += 1
+    assert cache.get("key0") == "0"
+    cache.set("key10", "10")
+
+    rows = {key for key, in cache._connect().execute("SELECT key FROM completions")}
+    assert rows == {"key0", *(f"key{i}" for i in range(3, 11))}
+
+
+def test_async_lookups_and_stores_touch_disk_off_the_event_loop(path, clock):
+    cache = LLMCache(path, max_entries=1)
+    disk = statements(cache, "")
+
+    async def run():
+        loop_thread = threading.get_ident()
+        await cache.store("a", "A")
+        await cache.store("b", "B")
+        # "b" is in memory and answered inline; "a" only on disk
+        assert await cache.lookup("b") == "B"
+        assert await cache.lookup("a") == "A"
+        assert await cache.lookup("missing") is None
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+    assert disk and loop_thread not in disk
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
@@ -0,0 +1,93 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from services.metrics import Counter, Histogram, MetricsMiddleware, http_request_duration, http_requests
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    latency = Histogram("test_latency_seconds", "Test latency", ("route",), buckets=(1.0, 0.1))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        latency.observe(value, "/a")
+    latency.observe(0.2, "/b")
+
+    assert latency.count("/a") == 4 and latency.count("/c") == 0
+    assert latency.expose() == [
+        "# HELP test_latency_seconds Test latency",
+        "# TYPE test_latency_seconds histogram",
+        'test_latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'test_latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_latency_seconds_sum{route="/a"} 5.65',
+        'test_latency_seconds_count{route="/a"} 4',
+        'test_latency_seconds_bucket{route="/b",le="0.1"} 0',
+        'test_latency_seconds_bucket{route="/b",le="1.0"} 1',
+        'test_latency_seconds_bucket{route="/b",le="+Inf"} 1',
+        'test_latency_seconds_sum{route="/b"} 0.2',
+        'test_latency_seconds_count{route="/b"} 1',
+    ]
+
+
+def test_counter_exposition_escapes_label_values():
+    requests = Counter("test_requests_total", "Test requests", ("route",))
+    requests.inc('/say "hi"\\')
+    requests.inc("/plain", amount=2.5)
+    assert requests.expose() == [
+        "# HELP test_requests_total Test requests",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{route="/plain"} 2.5',
+        'test_requests_total{route="/say \\"hi\\"\\\\"} 1',
+    ]
+
+
+def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    before = {
+        "items": http_requests.value("/items/{item_id}", "GET", "200"),
+        "broken": http_requests.value("/broken", "GET", "500"),
+        "unmatched": http_requests.value("unmatched", "GET", "404"),
+        "timed": http_request_duration.count("/broken", "GET"),
+    }
+    with TestClient(app, raise_server_exceptions=False) as client:
+        for item_id in ("a", "b", "c"):
+            assert client.get(f"/items/{item_id}").status_code == 200
+        assert client.get("/broken").status_code == 500
+        assert client.get("/no/such/route").status_code == 404
+
+    assert http_requests.value("/items/{item_id}", "GET", "200") - before["items"] == 3
+    assert http_requests.value("/items/a", "GET", "200") == 0
+    # Requests that raise are still counted and timed, as 500s
+    assert http_requests.value("/broken", "GET", "500") - before["broken"] == 1
+    assert http_request_duration.count("/broken", "GET") - before["timed"] == 1
+    assert http_requests.value("unmatched", "GET", "404") - before["unmatched"] == 1
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    # Imported here: main starts the warm-up, which the other tests don't need
+    import main
+
+    with TestClient(main.app) as client:
+        assert client.get("/api/cards/test-cards").status_code == 200
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert "# TYPE http_requests_total counter" in lines
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert any(line.startswith('http_requests_total{route="/api/cards/test-cards",method="GET",status="200"} ')
+               for line in lines)
+    assert any(line.startswith('http_request_duration_seconds_bucket{route="/api/cards/test-cards",method="GET",le="+Inf"} ')
+               for line in lines)
+    # Every sample line is "name{labels} value"
+    for line in lines:
+        if not line.startswith("#"):
+            float(line.rsplit(" ", 1)[1].replace("+Inf", "inf"))
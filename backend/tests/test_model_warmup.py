@@ -0,0 +1,134 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+import httpx
+import config
+from benchmarks.stub_ollama import StubOllama, StubOllamaServer
+from services.model_warmup import ModelWarmer, keep_alive_value
+
+
+@asynccontextmanager
+async def client():
+    async with httpx.AsyncClient() as http:
+        yield http
+
+
+def warmer_for(url, **kwargs):
+    return ModelWarmer(client, url, config.OLLAMA_MODEL, **kwargs)
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_keep_alive_values():
+    assert keep_alive_value("-1") == -1
+    assert keep_alive_value("300") == 300
+    assert keep_alive_value("1.5") == 1.5
+    assert keep_alive_value("30m") == "30m"
+
+
+def test_preload_loads_the_model_with_the_configured_keep_alive():
+    stub = StubOllama(model=config.OLLAMA_MODEL)
+    with StubOllamaServer(stub) as server:
+        warmer = warmer_for(server.url, interval=0)
+
+        async def run():
+            await warmer.start()
+            await wait_for(lambda: warmer.checked_at is not None and warmer.pings == 1)
+            await asyncio.sleep(0.05)
+            await warmer.stop()
+
+        asyncio.run(run())
+
+    assert stub.loaded and stub.loads == 1 and stub.pings == 1 and stub.requests == 0
+    assert stub.keep_alive == keep_alive_value(config.OLLAMA_KEEP_ALIVE)
+    assert warmer.loaded is True and warmer.loads == 1
+    # /api/ps after the load reports the model resident, with its expiry
+    assert warmer.expires_at == "2099-01-01T00:00:00Z"
+
+
+def test_residency_comes_from_api_ps():
+    stub = StubOllama(model=config.OLLAMA_MODEL)
+    with StubOllamaServer(stub) as server:
+        warmer = warmer_for(server.url, preload=False)
+
+        async def run():
+            assert await warmer.refresh() is False
+            assert await warmer.warm()
+            assert await warmer.refresh() is True
+            stub.unload()
+            return await warmer.refresh()
+
+        assert asyncio.run(run()) is False
+    assert warmer.expires_at is None
+
+
+def test_recent_traffic_rewarms_an_unloaded_model_and_idle_lets_it_go():
+    stub = StubOllama(model=config.OLLAMA_MODEL)
+    with StubOllamaServer(stub) as server:
+        warmer = warmer_for(server.url, preload=False, window=60)
+
+        async def run():
+            warmer.note_activity()
+            await warmer.tick()
+            assert stub.loaded and warmer.loads == 1
+
+            # Ollama restarted (or keep_alive ran out) while requests keep coming
+            stub.unload()
+            await warmer.tick()
+            assert stub.loaded and stub.loads == 2 and warmer.loads == 2
+
+            # No request within the window: the loop only checks /api/ps
+            warmer.last_activity = time.time() - 61
+            stub.unload()
+            await warmer.tick()
+
+        asyncio.run(run())
+    assert not stub.loaded and stub.pings == 2 and warmer.loaded is False
+
+
+def test_stop_cancels_the_loop_and_a_slow_preload():
+    stub = StubOllama(model=config.OLLAMA_MODEL, load_delay=30)
+    with StubOllamaServer(stub) as server:
+        warmer = warmer_for(server.url, interval=0.01)
+
+        async def run():
+            await warmer.stop()  # never started: nothing to do
+            await warmer.start()
+            await asyncio.sleep(0.1)
+            started = time.perf_counter()
+            await warmer.stop()
+            return time.perf_counter() - started
+
+        assert asyncio.run(run()) < 1.0
+    assert warmer._task is None and not warmer.pings and not stub.loaded
+
+
+def test_stopped_warmer_pings_no_more():
+    stub = StubOllama(model=config.OLLAMA_MODEL)
+    with StubOllamaServer(stub) as server:
+        warmer = warmer_for(server.url, interval=0.01)
+
+        async def run():
+            await warmer.start()
+            await wait_for(lambda: warmer.pings >= 3)
+            await warmer.stop()
+            pings = stub.pings
+            await asyncio.sleep(0.1)
+            return pings
+
+        assert asyncio.run(run()) == stub.pings
+
+
+def test_unreachable_ollama_counts_as_not_loaded():
+    warmer = warmer_for("http://127.0.0.1:9", preload=False)
+
+    async def run():
+        return await warmer.refresh(), await warmer.warm()
+
+    assert asyncio.run(run()) == (False, False)
+    assert warmer.loaded is False and warmer.last_error.startswith("warm:")
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from services.geo import DEFAULT_LOCATION, haversine_km
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Imported here: main starts the warm-up, which the other tests don't need
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_zero_max_distance_means_no_limit(client):
+    everything = client.get("/api/offers/").json()
+    nearby = client.get("/api/offers/nearby", params={"max_distance": 0}).json()
+    assert nearby["total_offers"] == everything["total_offers"]
+    assert [o["id"] for o in nearby["offers"]] == [o["id"] for o in everything["offers"]]
+    assert client.get("/api/offers/nearby", params={"max_distance": 0.001}).json()["total_offers"] < nearby["total_offers"]
+
+
+def test_echoes_the_point_searched_around(client):
+    default = client.get("/api/offers/nearby").json()
+    assert (default["location"], default["latitude"], default["longitude"]) == ("IIT Chennai Campus", *DEFAULT_LOCATION)
+
+    # Downtown, so the distances show which point was used
+    point = {"lat": 13.0827, "lon": 80.2707, "max_distance": 0}
+    moved = client.get("/api/offers/nearby", params=point).json()
+    assert (moved["location"], moved["latitude"], moved["longitude"]) == (None, 13.0827, 80.2707)
+    nearest = moved["offers"][0]
+    expected = haversine_km(13.0827, 80.2707, np.array([nearest["latitude"]]), np.array([nearest["longitude"]]))[0]
+    assert nearest["distance_km"] == pytest.approx(expected, abs=0.01)
+    from_campus = client.get("/api/offers/nearby", params={"max_distance": 0}).json()["offers"]
+    assert nearest["distance_km"] != next(o for o in from_campus if o["id"] == nearest["id"])["distance_km"]
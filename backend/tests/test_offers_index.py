@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from models.benefits import BenefitCategory
+from services.geo import haversine_km
+from services.offers_service import OFFERS_DATABASE, OffersIndex
+
+
+def synthetic_offers(count=500, seed=7):
+    """Offers around Chennai, with repeated coordinates and a few online ones"""
+    rng = np.random.default_rng(seed)
+    categories = list(BenefitCategory)
+    offers = []
+    for i in range(count):
+        located = i % 25 != 0
+        # Every fourth offer shares its spot with the one before it
+        spot = i - 1 if i % 4 == 3 else i
+        offers.append({
+            "id": f"s{i:04d}",
+            "merchant_name": f"Merchant {i}",
+            "offer_title": f"Offer {i}",
+            "discount": "10% Off",
+            "description": "Synthetic offer",
+            "location": "Chennai",
+            "latitude": float(12.9 + (spot * 7919 % 1000) / 2500) if located else None,
+            "longitude": float(80.1 + (spot * 104729 % 1000) / 2500) if located else None,
+            "valid_until": f"2026-{i % 12 + 1:02d}-28",
+            "terms": "Synthetic terms.",
+            "category": categories[int(rng.integers(len(categories)))],
+        })
+    return offers
+
+
+def reference_ranking(offers, latitude, longitude, category=None, max_distance=None, limit=None):
+    """The list-based ranking: located offers by distance (ties in catalog order), then online ones"""
+    matching = [o for o in offers if not category or o["category"].value == category]
+    located = [o for o in matching if o["latitude"] is not None]
+    distances = [
+        float(haversine_km(latitude, longitude, np.array([o["latitude"]]), np.array([o["longitude"]]))[0])
+        for o in located
+    ]
+    ranked = sorted(zip(distances, range(len(located)), located), key=lambda item: item[:2])
+    ranked = [(o["id"], round(d, 2)) for d, _, o in ranked if max_distance is None or d <= max_distance]
+    if limit is not None:
+        return ranked[:limit]
+    return ranked + [(o["id"], None) for o in matching if o["latitude"] is None]
+
+
+@pytest.mark.parametrize("category", [None, "dining", "travel", "no-such-category"])
+@pytest.mark.parametrize("max_distance, limit", [(None, None), (10.0, None), (None, 15), (5.0, 40)])
+def test_ranking_matches_the_list_based_ranking(category, max_distance, limit):
+    offers = synthetic_offers()
+    index = OffersIndex(offers)
+    found = index.query(13.05, 80.2, category, max_distance, limit)
+    assert [(o.id, o.distance_km) for o in found] == reference_ranking(
+        offers, 13.05, 80.2, category, max_distance, limit
+    )
+
+
+def test_ties_keep_catalog_order_at_the_cut():
+    offers = synthetic_offers(count=40)
+    for offer in offers:
+        if offer["latitude"] is not None:
+            offer["latitude"], offer["longitude"] = 13.0, 80.2
+    located = [o["id"] for o in offers if o["latitude"] is not None]
+    found = OffersIndex(offers).query(13.0, 80.2, limit=5)
+    assert [o.id for o in found] == located[:5]
+
+
+def test_uncapped_queries_return_at_most_max_results():
+    offers = synthetic_offers()
+    index = OffersIndex(offers, max_results=30)
+    found = index.query(13.05, 80.2)
+    assert [(o.id, o.distance_km) for o in found] == reference_ranking(offers, 13.05, 80.2)[:30]
+    # Online offers only fill what the located ones leave
+    mock = OffersIndex(OFFERS_DATABASE, max_results=len(OFFERS_DATABASE))
+    assert mock.query(12.9916, 80.2336)[-1].distance_km is None
@@ -0,0 +1,73 @@
+import asyncio
+import time
+import pytest
+import config
+from benchmarks.stub_ollama import StubOllama, StubOllamaServer
+from services.circuit_breaker import CircuitState
+from services.ollama_pool import BLOCKING, BackendSpec, parse_backends
+
+
+def test_every_replica_serves_the_configured_model(llm):
+    specs = parse_backends("http://a:11434 weight=2, http://b:11434/", "http://x", config.OLLAMA_MODEL)
+    assert specs == [
+        BackendSpec("http://a:11434", config.OLLAMA_MODEL, 2.0),
+        BackendSpec("http://b:11434", config.OLLAMA_MODEL, 1.0),
+    ]
+    with pytest.raises(ValueError, match="Unknown OLLAMA_BACKENDS setting"):
+        parse_backends("http://a:11434, http://b:11434 model=llama3.2:1b", "http://x", config.OLLAMA_MODEL)
+    with pytest.raises(ValueError, match="OLLAMA_MODEL"):
+        llm.ollama_pool.configure([BackendSpec("http://a:11434", "llama3.2:1b")])
+
+
+def test_failing_replica_is_ejected(llm, monkeypatch):
+    monkeypatch.setattr(llm.ollama_pool, "policy", "ewma")
+    stub = StubOllama(model=config.OLLAMA_MODEL, tokens=5)
+    with StubOllamaServer(stub) as server:
+        llm.ollama_pool.configure([
+            BackendSpec(server.url, config.OLLAMA_MODEL),
+            BackendSpec("http://127.0.0.1:9", config.OLLAMA_MODEL),
+        ])
+        live, dead = llm.ollama_pool.backends
+        failovers = llm.ollama_pool.failovers
+
+        async def run():
+            return [await llm.request_completion(f"prompt {i}") for i in range(8)]
+
+        results = asyncio.run(run())
+
+    # Every call was answered, failing over while the dead replica was still picked
+    assert all(result == "token0 token1 token2 token3 token4" for result in results)
+    assert stub.requests == 8
+    assert dead.breaker.state == CircuitState.OPEN
+    assert dead.failures == config.OLLAMA_BREAKER_FAILURES == dead.requests
+    assert llm.ollama_pool.failovers - failovers == dead.failures
+
+
+def test_late_call_is_hedged_to_another_replica(llm, monkeypatch):
+    monkeypatch.setattr(llm.ollama_pool, "policy", "ewma")
+    monkeypatch.setattr(config, "OLLAMA_HEDGE_MIN_DELAY", 0.05)
+    slow = StubOllama(model=config.OLLAMA_MODEL, tokens=5, token_delay=0.3)
+    fast = StubOllama(model=config.OLLAMA_MODEL, tokens=5)
+    with StubOllamaServer(slow) as slow_server, StubOllamaServer(fast) as fast_server:
+        pool = llm.ollama_pool
+        pool.configure([
+            BackendSpec(slow_server.url, config.OLLAMA_MODEL),
+            BackendSpec(fast_server.url, config.OLLAMA_MODEL),
+        ])
+        slow_backend, fast_backend = pool.backends
+        # The slow replica looks fastest, so it gets the call first
+        slow_backend.observe(BLOCKING, 0.01)
+        fast_backend.observe(BLOCKING, 0.02)
+        hedges = pool.hedges
+        # Earlier tests share the pool's counters: leave room in the hedge budget
+        pool.requests = max(pool.requests, int(pool.hedges / config.OLLAMA_HEDGE_BUDGET) + 1)
+
+        started = time.perf_counter()
+        result = asyncio.run(llm.request_completion("hedge me", hedge=True))
+        elapsed = time.perf_counter() - started
+
+    assert result == "token0 token1 token2 token3 token4"
+    assert pool.hedges - hedges == 1
+    assert slow.requests == 1 and fast.requests == 1
+    assert fast_backend.hedge_wins == 1 and slow_backend.hedge_wins == 0
+    assert elapsed < 1.0
@@ -0,0 +1,38 @@
+from datetime import date
+import pytest
+import config
+from services import offers_service, search_service
+from services.offers_service import get_offers_by_location
+from services.search_service import search_catalog
+
+
+class Tomorrow(date):
+    @classmethod
+    def today(cls):
+        return date.fromordinal(date.today().toordinal() + 1)
+
+
+def test_offer_cursor_is_tied_to_the_location_label():
+    first = get_offers_by_location("IIT Chennai", latitude=12.99, longitude=80.23, page_size=1)
+    assert first.next_cursor
+    with pytest.raises(ValueError, match="different query"):
+        get_offers_by_location("IIT Chennai Campus", latitude=12.99, longitude=80.23, page_size=1,
+                               cursor=first.next_cursor)
+
+
+def test_offer_cursor_expires_with_the_day_it_hid_offers_on(monkeypatch):
+    monkeypatch.setattr(config, "CATALOG_HIDE_EXPIRED", True)
+    first = get_offers_by_location(page_size=1)
+    assert first.next_cursor
+    monkeypatch.setattr(offers_service, "date", Tomorrow)
+    with pytest.raises(ValueError, match="different query"):
+        get_offers_by_location(page_size=1, cursor=first.next_cursor)
+
+
+def test_search_cursor_expires_with_the_day_it_hid_offers_on(monkeypatch):
+    monkeypatch.setattr(config, "CATALOG_HIDE_EXPIRED", True)
+    first = search_catalog("cashback", page_size=1)
+    assert first.next_cursor
+    monkeypatch.setattr(search_service, "date", Tomorrow)
+    with pytest.raises(ValueError, match="different query"):
+        search_catalog("cashback", page_size=1, cursor=first.next_cursor)
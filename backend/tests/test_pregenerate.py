@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from benchmarks.run import LONG_TERMS
+from jobs import pregenerate as job
+from services.llm_artifact import load_artifact_into_cache, read_artifact
+from services.prompt_budget import BUDGETS, Budget
+
+TERMS = ["Cashback of Rs 100 on bills above Rs 500.", LONG_TERMS]
+
+
+@pytest.fixture
+def catalog(llm, monkeypatch, tmp_path):
+    """A two-T&C catalog, and the artifact path the job writes"""
+    monkeypatch.setattr(job, "catalog_terms", lambda: list(TERMS))
+    # The job lifts the admission limits for itself
+    for limit in ("max_concurrency", "max_queue", "queue_timeout"):
+        monkeypatch.setattr(llm.llm_admission, limit, getattr(llm.llm_admission, limit))
+    return str(tmp_path / "artifact.json")
+
+
+def run_job(path):
+    return asyncio.run(job.pregenerate(path, parallelism=4, checkpoint_every=2))
+
+
+def test_api_answers_pregenerated_entries_from_the_cache(llm, stub_ollama, catalog):
+    counts = run_job(catalog)
+    assert counts == {"total": 6, "skipped": 0, "generated": 6, "failed": 0}
+    assert len(read_artifact(catalog)["entries"]) == 6
+
+    # A fresh API process: empty cache seeded from the artifact
+    llm.llm_cache.clear()
+    assert load_artifact_into_cache(catalog) == 6
+    requests = stub_ollama.requests
+
+    async def serve():
+        results = []
+        for text in TERMS:
+            results += [
+                await llm.summarize_terms(text, "en"),
+                await llm.summarize_terms(text, "ta"),
+                await llm.translate_to_tamil(text),
+            ]
+        return results
+
+    assert all(source == "cache" for _, source in asyncio.run(serve()))
+    assert stub_ollama.requests == requests
+
+
+def test_rerun_skips_done_entries_and_redoes_those_a_budget_change_invalidated(llm, stub_ollama, catalog, monkeypatch):
+    run_job(catalog)
+    requests = stub_ollama.requests
+    assert run_job(catalog) == {"total": 6, "skipped": 6, "generated": 0, "failed": 0}
+    assert stub_ollama.requests == requests
+
+    # num_predict is part of the summary cache key, so summaries made under the old budget no longer match
+    summarize = BUDGETS["summarize"]
+    monkeypatch.setitem(BUDGETS, "summarize", Budget(summarize.num_predict + 1, summarize.chunk_tokens))
+    assert run_job(catalog) == {"total": 6, "skipped": 2, "generated": 4, "failed": 0}
+    assert set(read_artifact(catalog)["entries"]) == {task.key for task in job.build_tasks(TERMS)}
+
+
+def test_failures_are_counted_and_not_stored(llm, no_ollama, catalog):
+    assert run_job(catalog) == {"total": 6, "skipped": 0, "generated": 0, "failed": 6}
+    assert read_artifact(catalog)["entries"] == {}
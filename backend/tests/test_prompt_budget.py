@@ -0,0 +1,94 @@
+import asyncio
+import random
+import re
+import pytest
+from services.prompt_budget import BUDGETS, Budget, count_tokens, split_text
+
+
+def terms(count, seed=5):
+    """T&C-like text: numbered clauses of varying length"""
+    rng = random.Random(seed)
+    words = "cashback offer valid purchases minimum amount card holder merchant excluded".split()
+    return " ".join(
+        f"Clause {n} says {' '.join(rng.choice(words) for _ in range(rng.randint(3, 40)))}."
+        for n in range(1, count + 1)
+    )
+
+
+@pytest.mark.parametrize("max_tokens", [8, 20, 64, 300])
+def test_chunks_stay_within_the_budget_and_keep_the_text(max_tokens):
+    text = terms(60)
+    chunks = split_text(text, max_tokens)
+    assert all(count_tokens(chunk) <= max_tokens for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_chunks_end_at_sentence_boundaries_when_sentences_fit():
+    text = terms(60)
+    assert max(count_tokens(sentence) for sentence in re.findall(r"Clause[^.]*\.", text)) <= 200
+    chunks = split_text(text, 200)
+    assert len(chunks) > 1
+    assert all(chunk.rstrip().endswith(".") for chunk in chunks)
+
+
+def test_text_without_sentence_breaks_splits_between_words():
+    text = " ".join(f"word{n}" for n in range(500))
+    chunks = split_text(text, 16)
+    assert all(count_tokens(chunk) <= 16 for chunk in chunks)
+    assert "".join(chunks) == text
+    assert all(re.fullmatch(r"(word\d+ ?)+", chunk) for chunk in chunks)
+
+
+@pytest.mark.parametrize("word", ["x" * 1000, "தமிழ்" * 100])
+def test_a_single_overlong_word_is_sliced(word):
+    text = f"Short opener. {word} tail."
+    chunks = split_text(text, 16)
+    assert all(count_tokens(chunk) <= 16 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_short_text_is_one_chunk_and_empty_text_none():
+    assert split_text("One clause only.", 64) == ["One clause only."]
+    assert split_text("   \n", 64) == []
+
+
+@pytest.fixture
+def fake_completions(llm, monkeypatch):
+    """complete() answering with the clause numbers its prompt covers, in whatever order tasks finish"""
+    monkeypatch.setitem(BUDGETS, "summarize", Budget(num_predict=200, chunk_tokens=40))
+    prompts = []
+
+    async def complete(prompt, system_prompt=None, **kwargs):
+        prompts.append(prompt)
+        await asyncio.sleep(random.random() / 100)
+        if prompt.startswith("Please summarize"):
+            numbers = re.findall(r"Clause (\d+)", prompt)
+        else:
+            numbers = re.findall(r"\bc(\d+)\b", prompt)
+        # Long enough that a merge round can only combine a few summaries
+        return " ".join(f"c{n}" for n in numbers) + " covered" + " and more" * 8, "llm"
+
+    monkeypatch.setattr(llm, "complete", complete)
+    return prompts
+
+
+def test_map_reduce_keeps_the_document_order(llm, fake_completions):
+    text = terms(30)
+    assert count_tokens(text) > BUDGETS["summarize"].chunk_tokens
+
+    result, source = asyncio.run(llm.summarize_terms(text))
+    assert source == "llm"
+    assert re.findall(r"\bc(\d+)\b", result) == [str(n) for n in range(1, 31)]
+    # Chunks were summarized, then merged over more than one round
+    merges = [prompt for prompt in fake_completions if prompt.startswith("These are summaries")]
+    assert len(merges) > 1
+    assert all(re.findall(r"Part (\d+)", prompt) == [str(n) for n in range(1, prompt.count("Part ") + 1)]
+               for prompt in merges)
+
+
+def test_short_text_skips_map_reduce(llm, fake_completions):
+    chunked = llm.llm_chunked_requests.value("summarize")
+    result, _ = asyncio.run(llm.summarize_terms("Clause 1 says cashback."))
+    assert fake_completions == [llm.build_summarize_prompt("Clause 1 says cashback.")[0]]
+    assert result.startswith("c1 covered")
+    assert llm.llm_chunked_requests.value("summarize") == chunked
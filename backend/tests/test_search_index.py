@@ -0,0 +1,20 @@
+import numpy as np
+from benchmarks.bench_catalog import synthetic_offers
+from services.search_service import SearchIndex, tokenize
+
+
+def test_reload_drops_terms_of_removed_documents_and_ranks_like_a_fresh_build():
+    offers = list(synthetic_offers(300))
+    first = SearchIndex({}, offers, 50)
+    assert "299" in first.vocabulary
+
+    kept = offers[:200] + [dict(offers[200], terms="Renamed terms wording.")]
+    reloaded = SearchIndex({}, kept, 50, previous=first)
+    fresh = SearchIndex({}, kept, 50)
+
+    assert reloaded.reused == 200
+    assert "299" not in reloaded.vocabulary and "variant" in reloaded.vocabulary
+    assert reloaded.vocabulary == fresh.vocabulary
+    for query in ("offer 150", "renamed wording", "merchant variant"):
+        got, want = reloaded.search(tokenize(query)), fresh.search(tokenize(query))
+        assert np.array_equal(got.refs, want.refs) and np.allclose(got.scores, want.scores)
@@ -0,0 +1,27 @@
+from services.semantic_cache import SemanticCache
+
+
+def test_entries_are_capped_across_partitions():
+    cache = SemanticCache("test", threshold=0.9, max_entries=4)
+    for lifestyle in ("student", "professional", "retired"):
+        cache.store(lifestyle, "recommend benefits for dining", f"{lifestyle} answer")
+        cache.store(lifestyle, "recommend benefits for travel", f"{lifestyle} travel")
+    # Touching a partition keeps it ahead of older ones
+    assert cache.lookup("professional", "recommend benefits for dining") == "professional answer"
+    cache.store("gamer", "recommend benefits for dining", "gamer answer")
+
+    stats = cache.stats()
+    assert stats["entries"] <= 4 and stats["partitions"] == 2 and stats["evicted"] == 4
+    assert cache.lookup("student", "recommend benefits for dining") is None
+    assert cache.lookup("retired", "recommend benefits for dining") is None
+    assert cache.lookup("professional", "recommend benefits for travel") == "professional travel"
+    assert cache.lookup("gamer", "recommend benefits for dining") == "gamer answer"
+
+
+def test_one_partition_keeps_its_newest_entries():
+    cache = SemanticCache("test", threshold=0.99, max_entries=2)
+    for topic in ("dining", "travel", "shopping"):
+        cache.store("student", f"recommend benefits for {topic}", topic)
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("student", "recommend benefits for dining") is None
+    assert cache.lookup("student", "recommend benefits for shopping") == "shopping"
@@ -0,0 +1,23 @@
+import asyncio
+import time
+import config
+from services.llm_cache import make_cache_key
+from services.shared_state import SharedState
+from services.singleflight import SharedFlight
+
+
+def test_uncached_completions_skip_the_cross_worker_flight(llm, stub_ollama, tmp_path, monkeypatch):
+    shared = SharedFlight(SharedState(str(tmp_path / "shared.sqlite3")), wait_timeout=5.0, poll_interval=0.01)
+    monkeypatch.setattr(llm, "shared_flights", shared)
+    llm.llm_cache.enabled = False
+
+    # Another worker holds the lease for this prompt; its result could never reach us through the cache
+    other = SharedState(shared.shared.path)
+    other.owner = "other-worker"
+    key = make_cache_key(config.OLLAMA_MODEL, None, "Hello", llm.DEFAULT_OPTIONS)
+    assert other.claim(f"flight:{key}", 60)
+
+    started = time.perf_counter()
+    assert asyncio.run(llm.complete("Hello"))[1] == "llm"
+    assert time.perf_counter() - started < 1.0
+    assert shared.followers == 0
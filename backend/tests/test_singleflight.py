@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from services.singleflight import SingleFlight
+
+
+def test_leader_errors_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("ollama exploded")
+
+    async def succeeding():
+        return "ok"
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("key", failing) for _ in range(5)), return_exceptions=True)
+        return results, await flight.do("key", succeeding)
+
+    results, retried = asyncio.run(run())
+    assert calls == 1 and flight.coalesced == 4
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == "ok"
+
+
+def test_a_follower_leaving_does_not_cancel_the_leader():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", slow))
+        follower = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(run()) == "done"
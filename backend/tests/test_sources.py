@@ -0,0 +1,29 @@
+import asyncio
+from routers.ai import RecommendRequest, SummarizeRequest, get_recommendations, summarize_tc
+
+
+def test_ranked_fallback_recommendations_are_labelled_fallback(llm, no_ollama):
+    response = asyncio.run(get_recommendations(RecommendRequest(card_type="signature")))
+    assert response.source == "fallback"
+    assert "Error" not in response.result
+
+
+def test_summaries_report_llm_then_cache(llm, stub_ollama):
+    request = SummarizeRequest(text="Cashback of Rs 100 within 30 days.")
+    assert asyncio.run(summarize_tc(request)).source == "llm"
+    assert asyncio.run(summarize_tc(request)).source == "cache"
+
+
+def test_fallback_summary_is_labelled_fallback(llm, no_ollama):
+    request = SummarizeRequest(text="Cashback of Rs 100 within 30 days.")
+    assert asyncio.run(summarize_tc(request)).source == "fallback"
+
+
+def test_batch_reports_each_source(llm, stub_ollama):
+    async def run(texts):
+        return {text: source async for text, _, source in llm.summarize_batch(texts)}
+
+    assert asyncio.run(run(["Offer A valid once.", "Offer B valid twice."])) == {
+        "Offer A valid once.": "llm", "Offer B valid twice.": "llm"
+    }
+    assert asyncio.run(run(["Offer A valid once."])) == {"Offer A valid once.": "cache"}
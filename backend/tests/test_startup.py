@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+import config
+from services import startup
+
+
+@pytest.fixture
+def app():
+    # Imported here: main starts the warm-up, which the other tests don't need
+    import main
+    return main.app
+
+
+def wait_until_ready(client, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while (response := client.get("/api/ready")).status_code != 200:
+        assert time.monotonic() < deadline, response.json()
+        time.sleep(0.02)
+    return response
+
+
+def test_routes_wait_for_their_warm_up_step(app, monkeypatch):
+    monkeypatch.setattr(config, "STARTUP_WAIT_TIMEOUT", 0.1)
+    release = threading.Event()
+    load_catalog = startup._load_catalog
+
+    async def slow_catalog():
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        await load_catalog()
+
+    monkeypatch.setattr(startup, "_load_catalog", slow_catalog)
+    with TestClient(app) as client:
+        response = client.get("/api/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False and response.json()["steps"]["catalog"] == "pending"
+
+        # Liveness and card validation don't wait for the warm-up
+        assert client.get("/api/health").status_code == 200
+        assert client.post("/api/cards/validate", json={"card_number": "4000000000001000"}).status_code == 200
+
+        gated = client.get("/api/benefits/gold")
+        assert gated.status_code == 503 and gated.headers["retry-after"] == "1"
+
+        release.set()
+        ready = wait_until_ready(client).json()
+        assert all(state == "ready" for state in ready["steps"].values())
+        assert set(ready["seconds"]) == set(startup.STEPS) and not ready["errors"]
+        assert client.get("/api/benefits/gold").status_code == 200
+
+
+def test_failed_warm_up_step_is_reported(app, monkeypatch):
+    async def broken_catalog():
+        raise ValueError("catalog.json: offer 'o7' is missing 'id'")
+
+    monkeypatch.setattr(startup, "_load_catalog", broken_catalog)
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 10.0
+        while "llm" not in (state := client.get("/api/ready").json())["seconds"]:
+            assert time.monotonic() < deadline, state
+            time.sleep(0.02)
+
+        response = client.get("/api/ready")
+        assert response.status_code == 503
+        body = response.json()
+        assert body["steps"] == {"imports": "ready", "catalog": "failed", "llm": "ready"}
+        assert body["errors"]["catalog"] == "ValueError: catalog.json: offer 'o7' is missing 'id'"
+
+        gated = client.get("/api/offers/")
+        assert gated.status_code == 503 and "'catalog' failed" in gated.json()["detail"]
@@ -0,0 +1,81 @@
+import asyncio
+from tests.test_streaming import text_of
+
+
+def test_identical_streams_share_one_generation(llm, stub_ollama):
+    stub_ollama.token_delay = 0.02
+    coalesced = llm.stream_flights.coalesced
+
+    async def run():
+        async def one():
+            return [event async for event in llm.stream_summarize_terms("Cashback of Rs 100 within 30 days.")]
+        return await asyncio.gather(*(one() for _ in range(10)))
+
+    streams = asyncio.run(run())
+    assert stub_ollama.requests == 1
+    assert llm.stream_flights.coalesced - coalesced == 9
+    assert all(events == streams[0] for events in streams)
+    assert streams[0][-1] == {"done": True, "source": "llm"}
+    assert text_of(streams[0])
+
+
+def test_followers_keep_streaming_after_the_leader_leaves(llm, stub_ollama):
+    stub_ollama.token_delay = 0.02
+
+    async def drain(events):
+        return [event async for event in events]
+
+    async def run():
+        coalesced = llm.stream_flights.coalesced
+        leader = llm.stream_completion("Same prompt")
+        await leader.__anext__()
+        follower = asyncio.ensure_future(drain(llm.stream_completion("Same prompt")))
+        while llm.stream_flights.coalesced == coalesced:
+            await asyncio.sleep(0.001)
+        await leader.aclose()
+        return await follower
+
+    events = asyncio.run(run())
+    assert events[-1] == {"done": True, "source": "llm"}
+    assert stub_ollama.requests == 1
+
+
+def test_stream_errors_reach_every_subscriber():
+    from services.singleflight import StreamFlight
+    flight = StreamFlight()
+
+    async def failing():
+        yield 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        async def one():
+            return [event async for event in flight.stream("key", failing)]
+        return await asyncio.gather(one(), one(), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert flight.coalesced == 1
+
+
+def test_callers_after_the_last_subscriber_left_start_a_new_stream():
+    from services.singleflight import StreamFlight
+    flight = StreamFlight()
+    started = 0
+
+    async def events():
+        nonlocal started
+        started += 1
+        for i in range(3):
+            yield i
+            await asyncio.sleep(0.01)
+
+    async def run():
+        first = flight.stream("key", events)
+        assert await first.__anext__() == 0
+        await first.aclose()
+        return [event async for event in flight.stream("key", events)]
+
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert started == 2 and flight.coalesced == 0
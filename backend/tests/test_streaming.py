@@ -0,0 +1,44 @@
+import asyncio
+from benchmarks.run import LONG_TERMS
+
+
+def collect(events):
+    """Every event of a completion stream"""
+    async def run():
+        return [event async for event in events]
+    return asyncio.run(run())
+
+
+def text_of(events):
+    return "".join(event.get("delta", "") for event in events)
+
+
+def test_cached_stream_replays_with_cache_source(llm, stub_ollama):
+    first = collect(llm.stream_summarize_terms("Cashback of Rs 100 within 30 days."))
+    assert first[-1] == {"done": True, "source": "llm"}
+
+    replay = collect(llm.stream_summarize_terms("Cashback of Rs 100 within 30 days."))
+    assert replay[-1] == {"done": True, "source": "cache"}
+    assert text_of(replay) == text_of(first)
+    assert stub_ollama.requests == 1
+
+
+def test_cached_map_reduce_stream_replays_with_cache_source(llm, stub_ollama):
+    first = collect(llm.stream_summarize_terms(LONG_TERMS))
+    assert first[-1]["source"] == "llm"
+    calls = stub_ollama.requests
+
+    replay = collect(llm.stream_summarize_terms(LONG_TERMS))
+    assert replay[-1] == {"done": True, "source": "cache"}
+    assert text_of(replay) == text_of(first)
+    assert stub_ollama.requests == calls
+
+
+def test_cached_chunked_translation_stream_replays_with_cache_source(llm, stub_ollama):
+    text = "Cashback is credited within thirty days of a qualifying purchase. " * 60
+    first = collect(llm.stream_translate_to_tamil(text))
+    assert first[-1]["source"] == "llm"
+
+    replay = collect(llm.stream_translate_to_tamil(text))
+    assert replay[-1] == {"done": True, "source": "cache"}
+    assert text_of(replay) == text_of(first)
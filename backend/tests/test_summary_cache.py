@@ -0,0 +1,17 @@
+import asyncio
+import pytest
+from tests.test_streaming import collect
+
+VARIANTS = [
+    ("Get cashback up to ₹50,000 on annual spends.", "Get cashback up to ₹5,00,000 on annual spends."),
+    ("Refunds are credited within 90 days of the purchase.", "Refunds are credited within 30 days of the purchase."),
+    ("Flat ₹100 off on orders above ₹999.", "Flat ₹150 off on orders above ₹999."),
+]
+
+
+@pytest.mark.parametrize("first, second", VARIANTS)
+def test_amount_only_variants_get_their_own_summary(llm, stub_ollama, first, second):
+    assert asyncio.run(llm.summarize_terms(first))[1] == "llm"
+    assert asyncio.run(llm.summarize_terms(second))[1] == "llm"
+    assert collect(llm.stream_summarize_terms(second))[-1]["source"] == "cache"
+    assert stub_ollama.requests == 2
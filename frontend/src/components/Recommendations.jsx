@@ -53,7 +53,7 @@ function Recommendations({ cardInfo, userContext }) {
                     </h2>
                     <p className="section-subtitle">{t('personalized')}</p>
                 </div>
-                {aiSource === 'llm' && (
+                {(aiSource === 'llm' || aiSource === 'cache') && (
                     <div className="powered-badge">
                         <span className="badge-icon">🤖</span>
                         Llama AI
@@ -12,9 +12,15 @@ function TCModal({ benefit, onClose }) {
     const handleSummarize = async () => {
         setIsLoading(true);
         try {
-            const result = await aiAPI.summarize(benefit.terms_and_conditions, language);
-            setSummary(result.result);
-            setSummarySource(result.source);
+            // Show tokens as they arrive instead of waiting for the full summary
+            await aiAPI.summarizeStream(benefit.terms_and_conditions, language, (event) => {
+                if (event.delta) {
+                    setSummary((previous) => previous + event.delta);
+                }
+                if (event.done) {
+                    setSummarySource(event.source);
+                }
+            });
         } catch (error) {
             setSummary('Unable to generate summary. Please try again.');
             setSummarySource('error');
@@ -92,7 +98,7 @@ function TCModal({ benefit, onClose }) {
 
                         {summary && (
                             <div className={`summary-result ${summarySource}`}>
-                                {summarySource === 'llm' && (
+                                {(summarySource === 'llm' || summarySource === 'cache') && (
                                     <div className="ai-badge">
                                         <span className="ai-icon">🤖</span>
                                         Powered by Llama AI
@@ -24,6 +24,38 @@ async function fetchAPI(endpoint, options = {}) {
     }
 }
 
+// Streaming POST that parses Server-Sent Events and reports each event
+async function streamAPI(endpoint, body, onEvent) {
+    const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body),
+    });
+
+    if (!response.ok || !response.body) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const dataLine = rawEvent.split('\n').find((line) => line.startsWith('data: '));
+            if (dataLine) onEvent(JSON.parse(dataLine.slice(6)));
+        }
+    }
+}
+
 // Card APIs
 export const cardAPI = {
     validate: (cardNumber) =>
@@ -67,18 +99,27 @@ export const aiAPI = {
             body: JSON.stringify({ text, language }),
         }),
 
+    summarizeStream: (text, language = 'en', onEvent) =>
+        streamAPI('/ai/summarize/stream', { text, language }, onEvent),
+
     translate: (text) =>
         fetchAPI('/ai/translate', {
             method: 'POST',
             body: JSON.stringify({ text }),
         }),
 
+    translateStream: (text, onEvent) =>
+        streamAPI('/ai/translate/stream', { text }, onEvent),
+
     recommend: (cardType, location = 'IIT Chennai', lifestyle = 'student', interests = []) =>
         fetchAPI('/ai/recommend', {
             method: 'POST',
             body: JSON.stringify({ card_type: cardType, location, lifestyle, interests }),
         }),
 
+    recommendStream: (cardType, location = 'IIT Chennai', lifestyle = 'student', interests = [], onEvent) =>
+        streamAPI('/ai/recommend/stream', { card_type: cardType, location, lifestyle, interests }, onEvent),
+
     getStatus: () => fetchAPI('/ai/status'),
 };
 